@@ -21,6 +21,71 @@ class Config:
     # App specific config
     YFINANCE_TICKERS = os.environ.get('YFINANCE_TICKERS', "SPY QQQ").split()
 
+    # Option chain source for backtests: 'sql' (option_data table) or 'parquet'
+    CHAIN_DATA_SOURCE = os.environ.get('CHAIN_DATA_SOURCE', 'sql')
+    CHAIN_STORE_PATH = os.environ.get('CHAIN_STORE_PATH', os.path.join(basedir, '..', 'instance', 'chain_store'))
+    # Memory-mapped chain cache shared by workers on the same host (disabled if unset)
+    CHAIN_CACHE_PATH = os.environ.get('CHAIN_CACHE_PATH')
+    # Processes used to shard a single backtest (1 runs it in the task's own process)
+    BACKTEST_WORKERS = int(os.environ.get('BACKTEST_WORKERS', 1))
+    # Estimated-cost bounds (trading days x legs x contracts x combinations) routing
+    # runs to the backtests_interactive, backtests and backtests_bulk queues
+    BACKTEST_INTERACTIVE_MAX_COST = int(os.environ.get('BACKTEST_INTERACTIVE_MAX_COST', 2000000))
+    BACKTEST_BULK_MIN_COST = int(os.environ.get('BACKTEST_BULK_MIN_COST', 20000000))
+    # Seconds after which a still pending or running backtest is presumed lost
+    # (e.g. its worker died): identical launches start a new run instead of attaching
+    BACKTEST_ATTACH_TIMEOUT = int(os.environ.get('BACKTEST_ATTACH_TIMEOUT', 6 * 3600))
+
+    # Processes simulating the path chunks of one Monte Carlo run, paths per
+    # chunk (bounds memory), and the estimated cost (paths x steps x legs) at
+    # which a run goes to the backtests_bulk queue
+    SIMULATION_WORKERS = int(os.environ.get('SIMULATION_WORKERS', 1))
+    SIMULATION_CHUNK_PATHS = int(os.environ.get('SIMULATION_CHUNK_PATHS', 10000))
+    SIMULATION_BULK_MIN_COST = int(os.environ.get('SIMULATION_BULK_MIN_COST', 50000000))
+
+    # Per-process caches of the risk endpoints: prepared chains with their
+    # volatility surfaces per (ticker, date), and strategy risk results
+    RISK_SNAPSHOT_CACHE_SIZE = int(os.environ.get('RISK_SNAPSHOT_CACHE_SIZE', 32))
+    RISK_RESULT_CACHE_SIZE = int(os.environ.get('RISK_RESULT_CACHE_SIZE', 1024))
+    RISK_CACHE_TTL = int(os.environ.get('RISK_CACHE_TTL', 3600))
+
+    # bcrypt work factor (Flask-Bcrypt); each step doubles the cost of a login
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # Threads per process running bcrypt, and further calls that may wait for
+    # one before logins and registrations fail fast with 503. Every running
+    # or waiting call holds a request thread, as does every progress stream:
+    # PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUED +
+    # PROGRESS_STREAMS_PER_PROCESS must stay below the web service's gunicorn
+    # --threads (6 in docker-compose) for other API calls to keep a thread.
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 1))
+    PASSWORD_HASH_MAX_QUEUED = int(os.environ.get('PASSWORD_HASH_MAX_QUEUED', 1))
+
+    # Seconds a validated auth token is trusted without re-decoding it or
+    # re-checking its user (0 disables); user changes invalidate it at once
+    AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 60))
+    # How user changes reach the per-process change counters: 'redis'
+    # (pub/sub, so every web process sees them; counters stay in-process and
+    # a cached token costs no round trip) or 'local' (single process only)
+    AUTH_GENERATIONS = os.environ.get('AUTH_GENERATIONS', 'redis')
+    AUTH_REDIS_URL = os.environ.get('AUTH_REDIS_URL', CELERY_BROKER_URL)
+    AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 4096))
+
+    # Per-process cache of serialized /data/option-chain responses
+    CHAIN_RESPONSE_CACHE_SIZE = int(os.environ.get('CHAIN_RESPONSE_CACHE_SIZE', 256))
+    CHAIN_RESPONSE_CACHE_TTL = int(os.environ.get('CHAIN_RESPONSE_CACHE_TTL', 3600))
+    CHAIN_RESPONSE_GZIP = os.environ.get('CHAIN_RESPONSE_GZIP', 'true').lower() == 'true'
+
+    # Backtest progress pub/sub: 'redis' or 'local' (in-process, single-process setups only)
+    PROGRESS_BROKER = os.environ.get('PROGRESS_BROKER', 'redis')
+    PROGRESS_REDIS_URL = os.environ.get('PROGRESS_REDIS_URL', CELERY_BROKER_URL)
+    # Seconds between keep-alives and before a progress stream is closed for the client to reconnect
+    PROGRESS_STREAM_HEARTBEAT = 15
+    PROGRESS_STREAM_TIMEOUT = 600
+    # Open streams per web process; each holds a gunicorn thread and counts
+    # toward the thread budget above (see PASSWORD_HASH_WORKERS). Further
+    # clients fall back to polling.
+    PROGRESS_STREAMS_PER_PROCESS = int(os.environ.get('PROGRESS_STREAMS_PER_PROCESS', 2))
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -36,6 +101,9 @@ class TestingConfig(Config):
     WTF_CSRF_ENABLED = False
     SECRET_KEY = 'test-secret-key'
     CELERY_TASK_ALWAYS_EAGER = True # Run tasks synchronously for tests
+    BCRYPT_LOG_ROUNDS = 4 # bcrypt's minimum; keeps user fixtures fast
+    PROGRESS_BROKER = 'local'
+    AUTH_GENERATIONS = 'local'
 
 
 class ProductionConfig(Config):
@@ -0,0 +1,53 @@
+"""option_data composite covering index
+
+Drops the single-column ticker index: _unique_option_contract already leads
+with the ticker and serves both the engine's ticker + date range scan and the
+chain lookup in expiry/strike order. On PostgreSQL, adds a covering index with
+the engine's price columns INCLUDEd, so that scan becomes index-only.
+
+Databases created with db.create_all() before this revision have no Alembic
+history; the steps below check the live schema, so `flask db upgrade` works on
+those as well as on fresh ones.
+
+Revision ID: 3f2a9c1d7e41
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7e41'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COVERING_INDEX = 'ix_option_data_engine_covering'
+COVERING_COLUMNS = ['underlying_ticker', 'data_date', 'expiration_date', 'strike_price', 'option_type']
+COVERING_INCLUDE = ['bid', 'ask', 'last_price', 'implied_volatility', 'delta']
+TICKER_INDEX = 'ix_option_data_underlying_ticker'
+
+
+def _indexes():
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('option_data')}
+
+
+def upgrade():
+    existing = _indexes()
+    if TICKER_INDEX in existing:
+        op.drop_index(TICKER_INDEX, table_name='option_data')
+    if op.get_bind().dialect.name == 'postgresql':
+        if COVERING_INDEX not in existing:
+            op.create_index(COVERING_INDEX, 'option_data', COVERING_COLUMNS, postgresql_include=COVERING_INCLUDE)
+        # Fresh statistics so the planner picks the new index right away
+        op.execute('ANALYZE option_data')
+
+
+def downgrade():
+    existing = _indexes()
+    if TICKER_INDEX not in existing:
+        op.create_index(TICKER_INDEX, 'option_data', ['underlying_ticker'])
+    if COVERING_INDEX in existing:
+        op.drop_index(COVERING_INDEX, table_name='option_data')
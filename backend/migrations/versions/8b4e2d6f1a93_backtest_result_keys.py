@@ -0,0 +1,41 @@
+"""backtest result keys and chain data versions
+
+Adds backtests.result_key, the content hash used to reuse or attach to
+identical backtests, and the chain_data_versions counters it includes.
+
+Revision ID: 8b4e2d6f1a93
+Revises: 3f2a9c1d7e41
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e2d6f1a93'
+down_revision = '3f2a9c1d7e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'result_key' not in {column['name'] for column in inspector.get_columns('backtests')}:
+        with op.batch_alter_table('backtests') as batch_op:
+            batch_op.add_column(sa.Column('result_key', sa.String(length=64), nullable=True))
+            batch_op.create_index('ix_backtests_result_key', ['result_key'])
+    if not inspector.has_table('chain_data_versions'):
+        op.create_table(
+            'chain_data_versions',
+            sa.Column('underlying_ticker', sa.String(length=10), primary_key=True),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True)
+        )
+
+
+def downgrade():
+    op.drop_table('chain_data_versions')
+    with op.batch_alter_table('backtests') as batch_op:
+        batch_op.drop_index('ix_backtests_result_key')
+        batch_op.drop_column('result_key')
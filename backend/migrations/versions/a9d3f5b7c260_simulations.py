@@ -0,0 +1,40 @@
+"""simulations
+
+Adds simulations, the Monte Carlo risk runs of strategies.
+
+Revision ID: a9d3f5b7c260
+Revises: e2a7c4f9b315
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3f5b7c260'
+down_revision = 'e2a7c4f9b315'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('simulations'):
+        op.create_table(
+            'simulations',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('strategy_id', sa.Integer(), sa.ForeignKey('strategies.id'), nullable=False),
+            sa.Column('as_of_date', sa.Date(), nullable=False),
+            sa.Column('parameters', sa.JSON(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('celery_task_id', sa.String(length=100), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.Column('results', sa.JSON(), nullable=True)
+        )
+        op.create_index('ix_simulations_strategy_id', 'simulations', ['strategy_id'])
+
+
+def downgrade():
+    op.drop_index('ix_simulations_strategy_id', table_name='simulations')
+    op.drop_table('simulations')
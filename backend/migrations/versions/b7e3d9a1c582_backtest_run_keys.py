@@ -0,0 +1,33 @@
+"""backtest run keys
+
+Adds backtests.run_key, the result key of a run while it is in flight.
+Its unique index lets only one of several concurrent identical launches
+start a run; the others attach to it.
+
+Revision ID: b7e3d9a1c582
+Revises: f1c6b8d2e457
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d9a1c582'
+down_revision = 'f1c6b8d2e457'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'run_key' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('backtests')}:
+        with op.batch_alter_table('backtests') as batch_op:
+            batch_op.add_column(sa.Column('run_key', sa.String(length=64), nullable=True))
+            batch_op.create_unique_constraint('uq_backtests_run_key', ['run_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('backtests') as batch_op:
+        batch_op.drop_constraint('uq_backtests_run_key', type_='unique')
+        batch_op.drop_column('run_key')
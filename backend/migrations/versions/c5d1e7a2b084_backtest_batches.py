@@ -0,0 +1,45 @@
+"""backtest batches
+
+Adds backtest_batches and backtests.batch_id, grouping backtests submitted
+together through POST /backtests/batch.
+
+Revision ID: c5d1e7a2b084
+Revises: 8b4e2d6f1a93
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d1e7a2b084'
+down_revision = '8b4e2d6f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('backtest_batches'):
+        op.create_table(
+            'backtest_batches',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True)
+        )
+        op.create_index('ix_backtest_batches_user_id', 'backtest_batches', ['user_id'])
+    if 'batch_id' not in {column['name'] for column in inspector.get_columns('backtests')}:
+        with op.batch_alter_table('backtests') as batch_op:
+            batch_op.add_column(sa.Column('batch_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_backtests_batch_id', 'backtest_batches', ['batch_id'], ['id'])
+            batch_op.create_index('ix_backtests_batch_id', ['batch_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('backtests') as batch_op:
+        batch_op.drop_index('ix_backtests_batch_id')
+        batch_op.drop_constraint('fk_backtests_batch_id', type_='foreignkey')
+        batch_op.drop_column('batch_id')
+    op.drop_index('ix_backtest_batches_user_id', table_name='backtest_batches')
+    op.drop_table('backtest_batches')
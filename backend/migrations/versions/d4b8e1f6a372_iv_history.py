@@ -0,0 +1,38 @@
+"""iv history
+
+Adds iv_history, the daily ATM/30-day implied volatility of each ticker
+with its trailing 252-day rank and percentile.
+
+Revision ID: d4b8e1f6a372
+Revises: a9d3f5b7c260
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b8e1f6a372'
+down_revision = 'a9d3f5b7c260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('iv_history'):
+        op.create_table(
+            'iv_history',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('underlying_ticker', sa.String(length=10), nullable=False),
+            sa.Column('data_date', sa.Date(), nullable=False),
+            sa.Column('atm_iv', sa.Float(), nullable=True),
+            sa.Column('iv_30d', sa.Float(), nullable=True),
+            sa.Column('iv_rank', sa.Float(), nullable=True),
+            sa.Column('iv_percentile', sa.Float(), nullable=True),
+            sa.UniqueConstraint('underlying_ticker', 'data_date', name='_unique_iv_history_day')
+        )
+
+
+def downgrade():
+    op.drop_table('iv_history')
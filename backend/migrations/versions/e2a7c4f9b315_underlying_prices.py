@@ -0,0 +1,39 @@
+"""underlying prices
+
+Adds underlying_prices, the daily OHLCV bars whose closes the backtest
+engine uses as the underlying's spot.
+
+Revision ID: e2a7c4f9b315
+Revises: c5d1e7a2b084
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c4f9b315'
+down_revision = 'c5d1e7a2b084'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('underlying_prices'):
+        op.create_table(
+            'underlying_prices',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('underlying_ticker', sa.String(length=10), nullable=False),
+            sa.Column('data_date', sa.Date(), nullable=False),
+            sa.Column('open', sa.Float(), nullable=True),
+            sa.Column('high', sa.Float(), nullable=True),
+            sa.Column('low', sa.Float(), nullable=True),
+            sa.Column('close', sa.Float(), nullable=False),
+            sa.Column('volume', sa.BigInteger(), nullable=True),
+            sa.UniqueConstraint('underlying_ticker', 'data_date', name='_unique_underlying_bar')
+        )
+
+
+def downgrade():
+    op.drop_table('underlying_prices')
@@ -0,0 +1,36 @@
+"""backtest series
+
+Adds backtest_series, the compressed columnar daily series of completed
+backtests. Backtests completed before it keep their series inline in
+backtests.results.
+
+Revision ID: f1c6b8d2e457
+Revises: d4b8e1f6a372
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c6b8d2e457'
+down_revision = 'd4b8e1f6a372'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('backtest_series'):
+        op.create_table(
+            'backtest_series',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('backtest_id', sa.Integer(), sa.ForeignKey('backtests.id'), nullable=False),
+            sa.Column('data', sa.LargeBinary(), nullable=False)
+        )
+        op.create_index('ix_backtest_series_backtest_id', 'backtest_series', ['backtest_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_backtest_series_backtest_id', table_name='backtest_series')
+    op.drop_table('backtest_series')
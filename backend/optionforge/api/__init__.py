@@ -5,4 +5,4 @@ from flask import Blueprint
 api_bp = Blueprint('api', __name__)
 
 # Import routes to register them with the blueprint
-from . import auth, strategies, backtests, data
+from . import auth, strategies, backtests, data, simulations, risk
@@ -4,6 +4,14 @@ from flask import request, jsonify
 from . import api_bp
 from optionforge.models import User
 from optionforge import db
+from optionforge.passwords import PasswordHasherBusy
+
+
+def _busy_response():
+    """503 returned when the password hashing queue is full."""
+    response = jsonify({'message': 'Too many authentication requests. Please retry shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @api_bp.route('/auth/register', methods=['POST'])
 def register():
@@ -27,6 +35,8 @@ def register():
             'auth_token': auth_token
         }
         return jsonify(response), 201
+    except PasswordHasherBusy:
+        return _busy_response()
     except Exception as e:
         response = {
             'status': 'fail',
@@ -55,5 +65,7 @@ def login():
                 return jsonify(response), 200
         else:
             return jsonify({'message': 'Invalid credentials'}), 404
+    except PasswordHasherBusy:
+        return _busy_response()
     except Exception as e:
         return jsonify({'message': 'Login failed. Please try again.'}), 500
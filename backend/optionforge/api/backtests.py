@@ -1,18 +1,35 @@
 # backend/optionforge/api/backtests.py
 
-from flask import request, jsonify, url_for
+import json
+import math
+import threading
+import time
+import uuid
+from celery import group
+from flask import request, jsonify, url_for, current_app, Response
+from sqlalchemy.exc import IntegrityError
 from . import api_bp
-from optionforge.models import Backtest, Strategy
+from optionforge.models import Backtest, BacktestBatch, Strategy
 from optionforge import db
-from .utils import token_required
-from optionforge.tasks import run_backtest_task
+from .utils import token_user_id_required
+from optionforge.tasks import run_backtest_task, run_sweep_task
+from optionforge.backtester.sweep import expand_parameter_grid
+from optionforge.results import SERIES_FIELDS, load_series, slice_series, series_to_json, result_key, copy_results
+from optionforge.ingest import chain_data_version
+from optionforge.progress import progress_broker, backtest_channel, TERMINAL_STATES
+from optionforge.scheduling import backtest_queue
 import datetime
 
+# Upper bound on the number of backtests in one batch submission
+MAX_BATCH_BACKTESTS = 200
+
+IN_FLIGHT_STATES = ('PENDING', 'RUNNING')
+
 @api_bp.route('/strategies/<int:strategy_id>/backtests', methods=['POST'])
-@token_required
-def launch_backtest(current_user, strategy_id):
+@token_user_id_required
+def launch_backtest(current_user_id, strategy_id):
     """Launches a new backtest for a given strategy."""
-    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user.id).first()
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
     if not strategy:
         return jsonify({'message': 'Strategy not found'}), 404
 
@@ -26,7 +43,391 @@ def launch_backtest(current_user, strategy_id):
     except ValueError:
         return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
 
-    # Create a new backtest record in the database
+    # Identical requests (same definition, dates, engine and data) share one run
+    key = _result_key(strategy, start_date, end_date)
+    new_backtest = None
+    reusable = _reusable_backtest(key)
+    if not reusable:
+        new_backtest, reusable = _reserve_run(strategy, start_date, end_date, key)
+    if reusable:
+        backtest = _attach_backtest(strategy, reusable, start_date, end_date, key)
+        db.session.commit()
+        if _settle_attached(backtest, reusable):
+            db.session.commit()
+        return _reuse_response(backtest)
+    if new_backtest is None:
+        return jsonify({'message': 'An identical backtest changed state while launching; please retry.'}), 409
+
+    # Launch the background task on the queue matching its size, under the reserved id
+    queue = backtest_queue(strategy.definition, start_date, end_date, current_app.config)
+    try:
+        task = run_backtest_task.apply_async(args=[new_backtest.id], queue=queue, task_id=new_backtest.celery_task_id)
+    except Exception:
+        _abandon_runs([new_backtest])
+        return jsonify({'message': 'The task queue is unavailable; please retry.'}), 503
+
+    status_url = url_for('api.get_backtest_status', backtest_id=new_backtest.id, _external=True)
+
+    return jsonify({
+        'message': 'Backtest launched successfully.',
+        'backtest_id': new_backtest.id,
+        'task_id': task.id,
+        'queue': queue,
+        'status_url': status_url
+    }), 202
+
+
+def _result_key(strategy, start_date, end_date, data_versions=None):
+    """Result key of a strategy over a date range; `data_versions` memoizes versions by ticker."""
+    ticker = strategy.definition.get('underlying_ticker', 'SPY')
+    data_versions = {} if data_versions is None else data_versions
+    if ticker not in data_versions:
+        data_versions[ticker] = chain_data_version(ticker)
+    return result_key(strategy.definition, start_date, end_date, data_versions[ticker])
+
+
+def _stale_run(backtest):
+    """
+    Whether a pending or running backtest will never finish on its own.
+
+    That is the case once its task failed or was revoked (e.g. its worker
+    died), or after BACKTEST_ATTACH_TIMEOUT seconds; Celery reports unknown
+    task ids as PENDING, so the age bounds runs lost before they started.
+    """
+    if backtest.status not in IN_FLIGHT_STATES:
+        return False
+    timeout = datetime.timedelta(seconds=current_app.config.get('BACKTEST_ATTACH_TIMEOUT', 6 * 3600))
+    if backtest.created_at and datetime.datetime.utcnow() - backtest.created_at > timeout:
+        return True
+    return run_backtest_task.AsyncResult(backtest.celery_task_id).state in ('FAILURE', 'REVOKED')
+
+
+def _reusable_backtest(key):
+    """
+    The latest completed, or live pending/running, backtest with this result key, if any.
+
+    Stale runs (see `_stale_run`) are skipped and give up their run key, so
+    a new run can be reserved in their place.
+    """
+    candidates = Backtest.query.filter(
+        Backtest.result_key == key,
+        Backtest.status != 'FAILED',
+        Backtest.celery_task_id.isnot(None)
+    ).order_by(Backtest.created_at.desc()).limit(10)
+    for candidate in candidates:
+        if not _stale_run(candidate):
+            return candidate
+        if candidate.run_key is not None:
+            candidate.run_key = None
+            db.session.flush()
+    return None
+
+
+def _reserve_run(strategy, start_date, end_date, key):
+    """
+    Commits the row of a new run, with its task id, before the task is enqueued.
+
+    The row holds the unique `run_key`, so of concurrent identical launches
+    only one commits; the others get the in-flight run back to attach to.
+
+    :return: (new backtest, None), or (None, the backtest to attach to; None
+             if the winning run already finished and failed).
+    """
+    backtest = Backtest(
+        strategy_id=strategy.id,
+        start_date=start_date,
+        end_date=end_date,
+        status='PENDING',
+        celery_task_id=str(uuid.uuid4()),
+        result_key=key,
+        run_key=key
+    )
+    db.session.add(backtest)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None, Backtest.query.filter_by(run_key=key).first() or _reusable_backtest(key)
+    return backtest, None
+
+
+def _abandon_runs(backtests):
+    """
+    Fails reserved runs whose tasks could not be enqueued, with every row attached to them.
+
+    Their run keys are released, so the next identical launch starts a new
+    run rather than attaching to one Celery would report as PENDING forever.
+    """
+    task_ids = [backtest.celery_task_id for backtest in backtests]
+    db.session.rollback()
+    for backtest in Backtest.query.filter(Backtest.celery_task_id.in_(task_ids),
+                                          Backtest.status.in_(IN_FLIGHT_STATES)):
+        backtest.status = 'FAILED'
+        backtest.run_key = None
+    db.session.commit()
+
+
+def _attach_backtest(strategy, reusable, start_date, end_date, key, batch=None):
+    """
+    Returns the row that answers a launch from an identical earlier backtest.
+
+    A completed backtest lends its results; a pending or running one is
+    attached to, and its task completes this row when it finishes. A backtest
+    of the same strategy is returned as is unless the launch belongs to a
+    batch; others are mirrored into a new (uncommitted) row.
+    """
+    if reusable.strategy_id == strategy.id and batch is None:
+        return reusable
+    backtest = Backtest(
+        strategy_id=strategy.id,
+        start_date=start_date,
+        end_date=end_date,
+        status=reusable.status,
+        celery_task_id=reusable.celery_task_id,
+        result_key=key,
+        batch=batch
+    )
+    db.session.add(backtest)
+    if reusable.status == 'COMPLETED':
+        copy_results(backtest, reusable)
+    return backtest
+
+
+def _settle_attached(backtest, reusable):
+    """
+    Completes or fails an attached row whose run finished before the row was committed.
+
+    :return: True if the row changed and needs a commit.
+    """
+    if backtest is reusable or backtest.status == 'COMPLETED':
+        return False
+    db.session.refresh(reusable)
+    if reusable.status == 'COMPLETED':
+        copy_results(backtest, reusable)
+        return True
+    if reusable.status == 'FAILED':
+        backtest.status = 'FAILED'
+        return True
+    return False
+
+
+def _reuse_response(backtest):
+    response = {
+        'backtest_id': backtest.id,
+        'task_id': backtest.celery_task_id,
+        'status_url': url_for('api.get_backtest_status', backtest_id=backtest.id, _external=True)
+    }
+    if backtest.status == 'COMPLETED':
+        response['message'] = 'An identical backtest already completed; returning its results.'
+        response['results_url'] = url_for('api.get_backtest_results', backtest_id=backtest.id, _external=True)
+        return jsonify(response), 200
+    response['message'] = 'An identical backtest is already running; attached to it.'
+    return jsonify(response), 202
+
+
+def _build_batch(user_id, entries):
+    """
+    Adds a batch's rows to the session: new runs, and rows attached to earlier identical ones.
+
+    Task ids and run keys are assigned up front so the rows need only one commit.
+
+    :return: (batch, attached (row, reused run) pairs, launches (row, queue),
+              rows (row, queue or None) in entry order).
+    """
+    batch = BacktestBatch(user_id=user_id)
+    db.session.add(batch)
+    data_versions, leaders, attached, launches, rows = {}, {}, [], [], []
+    for strategy, start_date, end_date in entries:
+        key = _result_key(strategy, start_date, end_date, data_versions)
+        reusable = leaders.get(key) or _reusable_backtest(key)
+        if reusable:
+            backtest = _attach_backtest(strategy, reusable, start_date, end_date, key, batch=batch)
+            attached.append((backtest, reusable))
+            rows.append((backtest, None))
+            continue
+
+        queue = backtest_queue(strategy.definition, start_date, end_date, current_app.config)
+        backtest = Backtest(
+            strategy_id=strategy.id,
+            start_date=start_date,
+            end_date=end_date,
+            status='PENDING',
+            celery_task_id=str(uuid.uuid4()),
+            result_key=key,
+            run_key=key,
+            batch=batch
+        )
+        db.session.add(backtest)
+        leaders[key] = backtest
+        launches.append((backtest, queue))
+        rows.append((backtest, queue))
+    return batch, attached, launches, rows
+
+
+@api_bp.route('/backtests/batch', methods=['POST'])
+@token_user_id_required
+def launch_backtest_batch(current_user_id):
+    """
+    Launches many backtests in one request.
+
+    Body: {"backtests": [{"strategy_id": 1, "start_date": "2022-01-01", "end_date": "2022-12-31"}, ...]}
+
+    All rows are inserted in one transaction and the new runs are enqueued
+    as one Celery group, each on the queue matching its estimated cost.
+    Entries identical to an earlier backtest, or to another entry of the
+    batch, reuse or attach to that run as in launch_backtest.
+    """
+    data = request.get_json()
+    items = data.get('backtests') if data else None
+    if not items or not isinstance(items, list):
+        return jsonify({'message': 'A non-empty backtests list is required'}), 400
+    if len(items) > MAX_BATCH_BACKTESTS:
+        return jsonify({'message': f'A batch holds at most {MAX_BATCH_BACKTESTS} backtests'}), 400
+
+    strategy_ids = {item.get('strategy_id') for item in items if isinstance(item, dict)}
+    strategies = {
+        strategy.id: strategy
+        for strategy in Strategy.query.filter(Strategy.user_id == current_user_id, Strategy.id.in_(strategy_ids))
+    }
+    entries, invalid = [], []
+    for i, item in enumerate(items):
+        try:
+            entries.append((
+                strategies[item['strategy_id']],
+                datetime.datetime.strptime(item['start_date'], '%Y-%m-%d').date(),
+                datetime.datetime.strptime(item['end_date'], '%Y-%m-%d').date()
+            ))
+        except (KeyError, TypeError, ValueError):
+            invalid.append(i)
+    if invalid:
+        return jsonify({
+            'message': 'Some entries have an unknown strategy or invalid dates (YYYY-MM-DD).',
+            'invalid_entries': invalid
+        }), 400
+
+    # A concurrent launch may reserve one of the new runs' keys first; the
+    # retry then finds that run and attaches to it
+    for attempt in range(2):
+        batch, attached, launches, rows = _build_batch(current_user_id, entries)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+    else:
+        return jsonify({'message': 'Identical backtests were launched concurrently; please retry.'}), 409
+
+    # Runs launched by this batch cannot have finished yet; only earlier ones need settling
+    launched = {backtest.id for backtest, _ in launches}
+    if any([_settle_attached(backtest, reusable) for backtest, reusable in attached if reusable.id not in launched]):
+        db.session.commit()
+
+    if launches:
+        try:
+            group(
+                run_backtest_task.signature((backtest.id,), task_id=backtest.celery_task_id, queue=queue)
+                for backtest, queue in launches
+            ).apply_async()
+        except Exception:
+            _abandon_runs([backtest for backtest, _ in launches])
+            return jsonify({'message': 'The task queue is unavailable; please retry.', 'batch_id': batch.id}), 503
+
+    return jsonify({
+        'message': f'Batch launched: {len(launches)} new runs, {len(attached)} reused.',
+        'batch_id': batch.id,
+        'status_url': url_for('api.get_backtest_batch_status', batch_id=batch.id, _external=True),
+        'backtests': [
+            {
+                'backtest_id': backtest.id,
+                'strategy_id': backtest.strategy_id,
+                'task_id': backtest.celery_task_id,
+                'status': backtest.status,
+                'queue': queue
+            }
+            for backtest, queue in rows
+        ]
+    }), 202
+
+
+@api_bp.route('/backtests/batch/<int:batch_id>', methods=['GET'])
+@token_user_id_required
+def get_backtest_batch_status(current_user_id, batch_id):
+    """
+    Aggregate status of a batch: counts per status, overall progress and each backtest's state.
+
+    The batch state is PENDING, RUNNING, COMPLETED, or PARTIALLY_FAILED once
+    every run has finished and at least one failed.
+    """
+    batch = BacktestBatch.query.get_or_404(batch_id)
+    if batch.user_id != current_user_id:
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    backtests = db.session.query(Backtest.id, Backtest.strategy_id, Backtest.status).filter(
+        Backtest.batch_id == batch.id
+    ).order_by(Backtest.id).all()
+
+    counts = {status: 0 for status in ('PENDING', 'RUNNING', 'COMPLETED', 'FAILED')}
+    for backtest in backtests:
+        counts[backtest.status] = counts.get(backtest.status, 0) + 1
+    finished = counts['COMPLETED'] + counts['FAILED']
+
+    if finished == len(backtests):
+        state = 'PARTIALLY_FAILED' if counts['FAILED'] else 'COMPLETED'
+    elif counts['RUNNING'] or finished:
+        state = 'RUNNING'
+    else:
+        state = 'PENDING'
+
+    return jsonify({
+        'batch_id': batch.id,
+        'state': state,
+        'total': len(backtests),
+        'counts': counts,
+        'progress': round(100 * finished / len(backtests)) if backtests else 100,
+        'backtests': [
+            {
+                'backtest_id': backtest.id,
+                'strategy_id': backtest.strategy_id,
+                'status': backtest.status,
+                'results_url': url_for('api.get_backtest_results', backtest_id=backtest.id, _external=True)
+                if backtest.status == 'COMPLETED' else None
+            }
+            for backtest in backtests
+        ]
+    })
+
+
+@api_bp.route('/strategies/<int:strategy_id>/sweeps', methods=['POST'])
+@token_user_id_required
+def launch_sweep(current_user_id, strategy_id):
+    """
+    Launches a parameter sweep of a strategy.
+
+    The strategy's definition is the template; `parameters` maps dotted paths
+    (e.g. 'legs.0.delta', 'legs.*.dte', 'exit_rules.profit_target_pct') to
+    lists of values. Every combination is evaluated in one task and the
+    results are ranked by `rank_by` (default 'sharpe_ratio').
+    """
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
+    if not strategy:
+        return jsonify({'message': 'Strategy not found'}), 404
+
+    data = request.get_json()
+    if not data or not data.get('start_date') or not data.get('end_date') or not data.get('parameters'):
+        return jsonify({'message': 'Start date, end date and parameters are required'}), 400
+
+    try:
+        start_date = datetime.datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    # Reject bad paths, oversized grids or mixed tickers before queueing any work
+    try:
+        n_combinations = len(expand_parameter_grid(strategy.definition, data['parameters']))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
     new_backtest = Backtest(
         strategy_id=strategy.id,
         start_date=start_date,
@@ -36,30 +437,33 @@ def launch_backtest(current_user, strategy_id):
     db.session.add(new_backtest)
     db.session.commit()
 
-    # Launch the background task
-    task = run_backtest_task.delay(new_backtest.id)
+    queue = backtest_queue(strategy.definition, start_date, end_date, current_app.config, combinations=n_combinations)
+    task = run_sweep_task.apply_async(
+        args=[new_backtest.id, data['parameters'], data.get('rank_by', 'sharpe_ratio')], queue=queue
+    )
 
-    # Store the Celery task ID
     new_backtest.celery_task_id = task.id
     db.session.commit()
 
     status_url = url_for('api.get_backtest_status', backtest_id=new_backtest.id, _external=True)
 
     return jsonify({
-        'message': 'Backtest launched successfully.',
+        'message': 'Sweep launched successfully.',
         'backtest_id': new_backtest.id,
         'task_id': task.id,
+        'combinations': n_combinations,
+        'queue': queue,
         'status_url': status_url
     }), 202
 
 @api_bp.route('/backtests/<int:backtest_id>/status', methods=['GET'])
-@token_required
-def get_backtest_status(current_user, backtest_id):
+@token_user_id_required
+def get_backtest_status(current_user_id, backtest_id):
     """Checks the status of a backtest."""
     backtest = Backtest.query.get_or_404(backtest_id)
     strategy = Strategy.query.get_or_404(backtest.strategy_id)
 
-    if strategy.user_id != current_user.id:
+    if strategy.user_id != current_user_id:
         return jsonify({'message': 'Unauthorized'}), 403
 
     task = run_backtest_task.AsyncResult(backtest.celery_task_id)
@@ -82,21 +486,160 @@ def get_backtest_status(current_user, backtest_id):
     else: # Failure case
         response['info'] = str(task.info) # Exception info
 
+    # Results reused from an identical run are ready whatever the task's state
+    if backtest.status == 'COMPLETED' and 'results_url' not in response:
+        response['results_url'] = url_for('api.get_backtest_results', backtest_id=backtest.id, _external=True)
+
     return jsonify(response)
 
 
+def _json_finite(value):
+    """Replaces NaN and infinities (e.g. a Sharpe ratio of one return) with None, which JSON.parse accepts."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_finite(item) for item in value]
+    return value
+
+
+def _sse_event(message):
+    return f"event: progress\ndata: {json.dumps(_json_finite(message), allow_nan=False)}\n\n"
+
+
+def _stream_slots():
+    """
+    The process's semaphore of concurrent progress streams.
+
+    Each open stream holds a request thread (gunicorn gthread) for up to
+    PROGRESS_STREAM_TIMEOUT, so PROGRESS_STREAMS_PER_PROCESS plus the password
+    hashing bound (PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUED) must stay
+    below the web service's --threads to leave threads for the rest of the API.
+    """
+    slots = current_app.extensions.get('progress_stream_slots')
+    if slots is None:
+        slots = current_app.extensions.setdefault('progress_stream_slots', threading.BoundedSemaphore(
+            current_app.config.get('PROGRESS_STREAMS_PER_PROCESS', 2)
+        ))
+    return slots
+
+
+@api_bp.route('/backtests/<int:backtest_id>/events', methods=['GET'])
+@token_user_id_required
+def stream_backtest_progress(current_user_id, backtest_id):
+    """
+    Streams a backtest's progress as server-sent events.
+
+    Each `progress` event carries {backtest_id, state, current, total, status,
+    metrics}, where metrics are the live performance figures while the engine
+    runs. The stream opens with the latest known state and ends after a
+    COMPLETED or FAILED event. It closes after PROGRESS_STREAM_TIMEOUT seconds
+    otherwise, and EventSource reconnects on its own. Browsers pass the JWT
+    as ?token=.
+
+    At most PROGRESS_STREAMS_PER_PROCESS streams are open per web process;
+    beyond that the request gets a 503 and the client polls /status instead.
+    """
+    backtest = Backtest.query.get_or_404(backtest_id)
+    strategy = Strategy.query.get_or_404(backtest.strategy_id)
+
+    if strategy.user_id != current_user_id:
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    config = current_app.config
+    slots = _stream_slots()
+    if not slots.acquire(blocking=False):
+        return jsonify({'message': 'Too many open progress streams; poll the status endpoint instead.',
+                        'status_url': url_for('api.get_backtest_status', backtest_id=backtest.id, _external=True)}), 503
+    try:
+        broker = progress_broker(current_app)
+        channel = backtest_channel(backtest.celery_task_id)
+        heartbeat = config.get('PROGRESS_STREAM_HEARTBEAT', 15)
+        deadline = time.monotonic() + config.get('PROGRESS_STREAM_TIMEOUT', 600)
+
+        if backtest.status in TERMINAL_STATES:
+            first, messages = {'backtest_id': backtest.id, 'state': backtest.status, 'total': 100}, None
+        else:
+            # Subscribe before reading the latest state so no update falls in between
+            messages = broker.listen(channel, heartbeat)
+            first = broker.latest(channel) or {
+                'backtest_id': backtest.id, 'state': backtest.status, 'current': 0, 'total': 100
+            }
+    except Exception:
+        slots.release()
+        raise
+
+    def stream():
+        yield _sse_event(first)
+        if messages is None or first['state'] in TERMINAL_STATES:
+            return
+        try:
+            for message in messages:
+                if message is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield _sse_event(message)
+                    if message['state'] in TERMINAL_STATES:
+                        return
+                if time.monotonic() > deadline:
+                    return
+        finally:
+            messages.close()
+
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop reverse proxies from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, even if the stream never started
+    response.call_on_close(slots.release)
+    return response
+
+
 @api_bp.route('/backtests/<int:backtest_id>/results', methods=['GET'])
-@token_required
-def get_backtest_results(current_user, backtest_id):
-    """Retrieves the results of a completed backtest."""
+@token_user_id_required
+def get_backtest_results(current_user_id, backtest_id):
+    """
+    Retrieves the results of a completed backtest.
+
+    Optional query parameters:
+    - fields: comma-separated result keys to return (default: all)
+    - start_date, end_date: restrict daily series to a date range (YYYY-MM-DD)
+    - max_points: downsample daily series to at most this many points
+    - format: 'columns' returns daily series as parallel arrays instead of records
+    """
     backtest = Backtest.query.get_or_404(backtest_id)
     strategy = Strategy.query.get_or_404(backtest.strategy_id)
 
-    if strategy.user_id != current_user.id:
+    if strategy.user_id != current_user_id:
         return jsonify({'message': 'Unauthorized'}), 403
 
     if backtest.status != 'COMPLETED':
         return jsonify({'message': 'Backtest is not yet complete.'}), 404
 
-    return jsonify(backtest.results)
+    try:
+        start_date = datetime.datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() if request.args.get('start_date') else None
+        end_date = datetime.datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() if request.args.get('end_date') else None
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+    max_points = request.args.get('max_points', type=int)
+    if max_points is not None and max_points < 1:
+        return jsonify({'message': 'max_points must be a positive integer.'}), 400
 
+    summary = {key: value for key, value in (backtest.results or {}).items() if key not in SERIES_FIELDS}
+    fields = request.args.get('fields')
+    requested = fields.split(',') if fields else list(summary) + list(SERIES_FIELDS)
+
+    response = {key: summary[key] for key in requested if key in summary}
+    series_names = [name for name in requested if name in SERIES_FIELDS]
+    if series_names:
+        series = load_series(backtest)
+        if series is None:
+            # Legacy inline records that cannot be sliced are returned as stored
+            response.update({name: backtest.results.get(name, []) for name in series_names})
+        else:
+            series = slice_series(series, start_date, end_date, max_points)
+            response.update(series_to_json(series, series_names, columnar=request.args.get('format') == 'columns'))
+
+    return jsonify(response)
@@ -1,17 +1,166 @@
 # backend/optionforge/api/data.py
 
-from flask import request, jsonify
+import datetime
+import gzip
+import hashlib
+import pandas as pd
+from flask import request, jsonify, current_app, Response
 from . import api_bp
+from optionforge import db
 from optionforge.models import OptionData
-from .utils import token_required
-import datetime
+from optionforge.caching import TTLCache
+from optionforge.ingest import mid_prices, underlying_prices_by_date, chain_data_version
+from optionforge.backtester.datasource import load_underlying_prices
+from .utils import token_user_id_required
+
+# Response field name of each option_data column in a chain listing
+CHAIN_FIELDS = {
+    'strike_price': 'strike',
+    'last_price': 'lastPrice',
+    'bid': 'bid',
+    'ask': 'ask',
+    'volume': 'volume',
+    'open_interest': 'openInterest',
+    'implied_volatility': 'iv',
+    'delta': 'delta',
+    'gamma': 'gamma',
+    'theta': 'theta',
+    'vega': 'vega',
+}
+
+
+def _response_cache():
+    """The per-process cache of serialized chain responses."""
+    cache = current_app.extensions.get('chain_response_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('chain_response_cache', TTLCache(
+            max_entries=current_app.config.get('CHAIN_RESPONSE_CACHE_SIZE', 256),
+            ttl=current_app.config.get('CHAIN_RESPONSE_CACHE_TTL', 3600)
+        ))
+    return cache
+
+
+def _parse_filters(args, data_date):
+    """
+    Reads the optional chain filters from the query string.
+
+    DTE bounds are turned into expiry dates, so equivalent requests share a cache key.
+    :raises ValueError: On a malformed value.
+    """
+    def number(name, cast=float):
+        value = args.get(name)
+        return cast(value) if value not in (None, '') else None
+
+    expirations = args.get('expiration')
+    filters = {
+        'expirations': tuple(sorted(
+            datetime.datetime.strptime(e.strip(), '%Y-%m-%d').date() for e in expirations.split(',') if e.strip()
+        )) if expirations else None,
+        'min_expiration': None,
+        'max_expiration': None,
+        'min_strike': number('min_strike'),
+        'max_strike': number('max_strike'),
+        'min_moneyness': number('min_moneyness'),
+        'max_moneyness': number('max_moneyness'),
+    }
+    min_dte, max_dte = number('min_dte', int), number('max_dte', int)
+    if min_dte is not None:
+        filters['min_expiration'] = data_date + datetime.timedelta(days=min_dte)
+    if max_dte is not None:
+        filters['max_expiration'] = data_date + datetime.timedelta(days=max_dte)
+    return filters
+
+
+def _load_chain(ticker, data_date, filters):
+    """
+    Loads one day's chain with a column-only query, in expiry/strike order.
+
+    Expiry and strike filters run in SQL. Moneyness (strike / spot) uses the
+    stored close, or else needs the whole day's strikes to imply the spot from
+    put-call parity, so it is applied afterwards and strike bounds are applied
+    together with it.
+    """
+    query = db.session.query(
+        OptionData.expiration_date, OptionData.option_type,
+        *(getattr(OptionData, column) for column in CHAIN_FIELDS)
+    ).filter(
+        OptionData.underlying_ticker == ticker,
+        OptionData.data_date == data_date
+    )
+    if filters['expirations']:
+        query = query.filter(OptionData.expiration_date.in_(filters['expirations']))
+    if filters['min_expiration']:
+        query = query.filter(OptionData.expiration_date >= filters['min_expiration'])
+    if filters['max_expiration']:
+        query = query.filter(OptionData.expiration_date <= filters['max_expiration'])
+
+    by_moneyness = filters['min_moneyness'] is not None or filters['max_moneyness'] is not None
+    if not by_moneyness:
+        if filters['min_strike'] is not None:
+            query = query.filter(OptionData.strike_price >= filters['min_strike'])
+        if filters['max_strike'] is not None:
+            query = query.filter(OptionData.strike_price <= filters['max_strike'])
+
+    chain = pd.read_sql(query.order_by(OptionData.expiration_date, OptionData.strike_price).statement, db.session.bind)
+    if chain.empty or not by_moneyness:
+        return chain
+
+    chain['data_date'] = pd.Timestamp(data_date)
+    chain['expiration_date'] = pd.to_datetime(chain['expiration_date'])
+    chain['T'] = (chain['expiration_date'] - chain['data_date']).dt.days / 365.0
+    chain['mid'] = mid_prices(chain)
+    spot = underlying_prices_by_date(chain, load_underlying_prices(ticker, data_date, data_date)).dropna()
+    if spot.empty:
+        return chain.iloc[0:0]
+
+    keep = pd.Series(True, index=chain.index)
+    moneyness = chain['strike_price'] / spot.iloc[0]
+    if filters['min_moneyness'] is not None:
+        keep &= moneyness >= filters['min_moneyness']
+    if filters['max_moneyness'] is not None:
+        keep &= moneyness <= filters['max_moneyness']
+    if filters['min_strike'] is not None:
+        keep &= chain['strike_price'] >= filters['min_strike']
+    if filters['max_strike'] is not None:
+        keep &= chain['strike_price'] <= filters['max_strike']
+    return chain[keep]
+
+
+def _serialize_chain(chain):
+    """
+    Encodes a chain as {expiration: {'calls': [...], 'puts': [...]}} JSON bytes.
+
+    Each side is written with pandas' C JSON encoder rather than built up as
+    Python dicts; missing values become null.
+    """
+    chain = chain.assign(expiration_date=pd.to_datetime(chain['expiration_date']).dt.strftime('%Y-%m-%d'))
+    fields = chain[list(CHAIN_FIELDS)].rename(columns=CHAIN_FIELDS)
+    parts = []
+    for expiration, rows in chain.groupby('expiration_date', sort=True):
+        is_call = rows['option_type'] == 'call'
+        calls = fields.loc[rows.index[is_call]].to_json(orient='records')
+        puts = fields.loc[rows.index[~is_call]].to_json(orient='records')
+        parts.append(f'"{expiration}":{{"calls":{calls},"puts":{puts}}}')
+    return ('{' + ','.join(parts) + '}').encode()
+
 
 @api_bp.route('/data/option-chain', methods=['GET'])
-@token_required
-def get_option_chain(current_user):
+@token_user_id_required
+def get_option_chain(current_user_id):
     """
     Fetches the option chain for a given underlying and date.
     /api/data/option-chain?ticker=SPY&date=2023-01-20
+
+    Optional filters:
+    - expiration: one or more comma-separated expiry dates (YYYY-MM-DD)
+    - min_dte / max_dte: days-to-expiry window
+    - min_strike / max_strike: strike window
+    - min_moneyness / max_moneyness: strike / underlying price window, e.g. 0.9 and 1.1
+
+    Responses are cached per ticker, data version, date and filters as
+    serialized (gzip) bytes and carry an ETag; a matching If-None-Match
+    returns 304. Re-ingested data, backfilled Greeks and new underlying bars
+    bump the version, so no process serves the old body.
     """
     ticker = request.args.get('ticker')
     date_str = request.args.get('date')
@@ -24,38 +173,39 @@ def get_option_chain(current_user):
     except ValueError:
         return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
 
-    chain_data = OptionData.query.filter_by(
-        underlying_ticker=ticker.upper(),
-        data_date=data_date
-    ).order_by(OptionData.expiration_date, OptionData.strike_price).all()
-
-    if not chain_data:
-        return jsonify({'message': f'No data found for {ticker} on {date_str}'}), 404
-
-    # Group by expiration date
-    expirations = {}
-    for option in chain_data:
-        exp_date_str = option.expiration_date.strftime('%Y-%m-%d')
-        if exp_date_str not in expirations:
-            expirations[exp_date_str] = {'calls': [], 'puts': []}
-        
-        option_info = {
-            'strike': option.strike_price,
-            'lastPrice': option.last_price,
-            'bid': option.bid,
-            'ask': option.ask,
-            'volume': option.volume,
-            'openInterest': option.open_interest,
-            'iv': option.implied_volatility,
-            'delta': option.delta,
-            'gamma': option.gamma,
-            'theta': option.theta,
-            'vega': option.vega,
-        }
-
-        if option.option_type == 'call':
-            expirations[exp_date_str]['calls'].append(option_info)
+    try:
+        filters = _parse_filters(request.args, data_date)
+    except ValueError:
+        return jsonify({'message': 'Invalid filter value.'}), 400
+
+    ticker = ticker.upper()
+    cache = _response_cache()
+    cache_key = (ticker, chain_data_version(ticker), data_date, tuple(sorted(filters.items())))
+    entry = cache.get(cache_key)
+    if entry is None:
+        chain = _load_chain(ticker, data_date, filters)
+        if chain.empty:
+            return jsonify({'message': f'No data found for {ticker} on {date_str}'}), 404
+
+        body = _serialize_chain(chain)
+        etag = hashlib.sha1(body).hexdigest()
+        if current_app.config.get('CHAIN_RESPONSE_GZIP', True):
+            entry = (etag, gzip.compress(body, compresslevel=6), True)
         else:
-            expirations[exp_date_str]['puts'].append(option_info)
+            entry = (etag, body, False)
+        cache.set(cache_key, entry)
+
+    etag, body, compressed = entry
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif compressed and 'gzip' in request.accept_encodings:
+        response = Response(body, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(gzip.decompress(body) if compressed else body, mimetype='application/json')
 
-    return jsonify(expirations)
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Let clients keep the body but revalidate with If-None-Match
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
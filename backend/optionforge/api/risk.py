@@ -0,0 +1,151 @@
+# backend/optionforge/api/risk.py
+
+import datetime
+import hashlib
+import json
+from flask import request, jsonify, current_app
+from . import api_bp
+from optionforge.models import Strategy
+from optionforge.caching import TTLCache
+from optionforge.ingest import chain_data_version
+from optionforge.backtester.datasource import chain_source_from_config
+from optionforge.backtester.risk import (load_market_snapshot, strategy_risk, aggregate_risk,
+                                         DEFAULT_SPOT_SHOCKS, DEFAULT_VOL_SHOCKS, MAX_SHOCKS)
+from .utils import token_user_id_required
+
+
+def _cache(name, size_key, default_size):
+    cache = current_app.extensions.get(name)
+    if cache is None:
+        cache = current_app.extensions.setdefault(name, TTLCache(
+            max_entries=current_app.config.get(size_key, default_size),
+            ttl=current_app.config.get('RISK_CACHE_TTL', 3600)
+        ))
+    return cache
+
+
+def _market_snapshot(ticker, date, version, risk_free_rate):
+    """
+    The prepared chain and volatility surface of a (ticker, date, rate), cached per process.
+
+    Keyed on the ticker's data version, so re-ingested data is never served stale.
+    """
+    cache = _cache('market_snapshot_cache', 'RISK_SNAPSHOT_CACHE_SIZE', 32)
+    key = (ticker, date, version, risk_free_rate)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = load_market_snapshot(ticker, date, chain_source_from_config(current_app.config), risk_free_rate)
+        cache.set(key, snapshot)
+    return snapshot
+
+
+def _strategy_risk(strategy, date, spot_shocks, vol_shocks, versions):
+    """A strategy's risk on a date, cached per definition, grid and data version."""
+    ticker = strategy.definition.get('underlying_ticker', 'SPY')
+    if ticker not in versions:
+        versions[ticker] = chain_data_version(ticker)
+    definition_hash = hashlib.sha256(json.dumps(strategy.definition, sort_keys=True).encode()).hexdigest()
+    key = (definition_hash, date, spot_shocks, vol_shocks, versions[ticker])
+
+    cache = _cache('strategy_risk_cache', 'RISK_RESULT_CACHE_SIZE', 1024)
+    risk = cache.get(key)
+    if risk is None:
+        rate = strategy.definition.get('settings', {}).get('risk_free_rate', 0.02)
+        snapshot = _market_snapshot(ticker, date, versions[ticker], rate)
+        risk = strategy_risk(strategy.definition, snapshot, spot_shocks, vol_shocks)
+        cache.set(key, risk)
+    return dict(risk, strategy_id=strategy.id, name=strategy.name)
+
+
+def _parse_shocks(name, default):
+    """Reads a comma-separated list of shocks from the query string."""
+    raw = request.args.get(name)
+    if not raw:
+        return tuple(default)
+    try:
+        shocks = tuple(sorted({float(value) for value in raw.split(',')}))
+    except ValueError:
+        raise ValueError(f"{name} must be a comma-separated list of numbers.")
+    if not 1 <= len(shocks) <= MAX_SHOCKS:
+        raise ValueError(f"{name} takes between 1 and {MAX_SHOCKS} values.")
+    return shocks
+
+
+def _risk_request():
+    """Parses the date and shock grid shared by the risk endpoints; returns (args, error response)."""
+    try:
+        date = datetime.datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return None, (jsonify({'message': 'A date parameter in YYYY-MM-DD format is required.'}), 400)
+    try:
+        spot_shocks = _parse_shocks('spot_shocks', DEFAULT_SPOT_SHOCKS)
+        vol_shocks = _parse_shocks('vol_shocks', DEFAULT_VOL_SHOCKS)
+    except ValueError as e:
+        return None, (jsonify({'message': str(e)}), 400)
+    if min(spot_shocks) <= -1:
+        return None, (jsonify({'message': 'Spot shocks must be greater than -1.'}), 400)
+    return (date, spot_shocks, vol_shocks), None
+
+
+@api_bp.route('/strategies/<int:strategy_id>/risk', methods=['GET'])
+@token_user_id_required
+def get_strategy_risk(current_user_id, strategy_id):
+    """
+    Greeks and spot/vol scenario P&L of a strategy opened on a date.
+    /api/strategies/1/risk?date=2023-01-20&spot_shocks=-0.1,0,0.1&vol_shocks=-5,0,5
+    """
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
+    if not strategy:
+        return jsonify({'message': 'Strategy not found'}), 404
+
+    args, error = _risk_request()
+    if error:
+        return error
+
+    try:
+        risk = _strategy_risk(strategy, *args, versions={})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 404
+
+    if risk['legs'] is None:
+        return jsonify(dict(risk, message='Some legs have no tradable contract on this date.')), 404
+    return jsonify(risk)
+
+
+@api_bp.route('/risk', methods=['GET'])
+@token_user_id_required
+def get_portfolio_risk(current_user_id):
+    """
+    Greeks and scenario P&L of several strategies on a date, with totals.
+
+    Covers all of the user's strategies unless `strategy_ids` lists some.
+    /api/risk?date=2023-01-20&strategy_ids=1,2
+    """
+    args, error = _risk_request()
+    if error:
+        return error
+
+    query = Strategy.query.filter_by(user_id=current_user_id)
+    if request.args.get('strategy_ids'):
+        try:
+            ids = {int(value) for value in request.args['strategy_ids'].split(',')}
+        except ValueError:
+            return jsonify({'message': 'strategy_ids must be a comma-separated list of ids.'}), 400
+        query = query.filter(Strategy.id.in_(ids))
+    strategies = query.order_by(Strategy.id).all()
+    if not strategies:
+        return jsonify({'message': 'No strategies found'}), 404
+
+    versions = {}
+    risks = []
+    for strategy in strategies:
+        try:
+            risks.append(_strategy_risk(strategy, *args, versions=versions))
+        except ValueError as e:
+            risks.append({'strategy_id': strategy.id, 'name': strategy.name, 'legs': None, 'message': str(e)})
+
+    return jsonify({
+        'date': args[0].isoformat(),
+        'strategies': risks,
+        'total': aggregate_risk(risks),
+    })
@@ -0,0 +1,145 @@
+# backend/optionforge/api/simulations.py
+
+import datetime
+from numbers import Real
+from flask import request, jsonify, url_for, current_app
+from . import api_bp
+from optionforge.models import Simulation, Strategy
+from optionforge import db
+from .utils import token_user_id_required
+from optionforge.tasks import run_simulation_task
+from optionforge.backtester.montecarlo import MODELS, MAX_PATHS, MAX_STEPS, HESTON_DEFAULTS
+from optionforge.scheduling import simulation_queue
+
+# Model parameters a request may override, by model
+MODEL_PARAMETERS = {
+    'gbm': {'drift', 'sigma'},
+    'heston': {'drift'} | set(HESTON_DEFAULTS) | {'theta', 'v0'},
+}
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _simulation_parameters(data):
+    """Validates a simulation request's parameters; returns (parameters, error message)."""
+    model = data.get('model', 'gbm')
+    if model not in MODELS:
+        return None, f"model must be one of: {', '.join(MODELS)}."
+
+    n_paths = data.get('n_paths', 10000)
+    if not _is_int(n_paths) or not 1 <= n_paths <= MAX_PATHS:
+        return None, f"n_paths must be an integer between 1 and {MAX_PATHS}."
+
+    horizon_days = data.get('horizon_days')
+    if horizon_days is not None and (not _is_int(horizon_days) or not 1 <= horizon_days <= MAX_STEPS):
+        return None, f"horizon_days must be an integer between 1 and {MAX_STEPS}."
+
+    seed = data.get('seed')
+    if seed is not None and (not _is_int(seed) or seed < 0):
+        return None, "seed must be a non-negative integer."
+
+    confidence_levels = data.get('confidence_levels', [0.95, 0.99])
+    if (not isinstance(confidence_levels, list) or not confidence_levels
+            or not all(isinstance(c, Real) and not isinstance(c, bool) and 0 < c < 1 for c in confidence_levels)):
+        return None, "confidence_levels must be a list of numbers between 0 and 1."
+
+    model_params = data.get('model_params') or {}
+    if not isinstance(model_params, dict):
+        return None, "model_params must be an object."
+    unknown = set(model_params) - MODEL_PARAMETERS[model]
+    if unknown:
+        return None, f"Unknown {model} parameters: {', '.join(sorted(unknown))}."
+    if not all(isinstance(v, Real) and not isinstance(v, bool) for v in model_params.values()):
+        return None, "model_params values must be numbers."
+
+    return {
+        'model': model,
+        'n_paths': n_paths,
+        'horizon_days': horizon_days,
+        'seed': seed,
+        'confidence_levels': confidence_levels,
+        'model_params': model_params,
+    }, None
+
+
+@api_bp.route('/strategies/<int:strategy_id>/simulations', methods=['POST'])
+@token_user_id_required
+def launch_simulation(current_user_id, strategy_id):
+    """
+    Launches a Monte Carlo risk simulation of a strategy opened on `as_of_date`.
+
+    Optional: `model` ('gbm' or 'heston'), `n_paths`, `horizon_days` (trading
+    days; defaults to the first leg expiry), `seed`, `confidence_levels` for
+    VaR/CVaR and `model_params` overriding the calibrated defaults.
+    """
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
+    if not strategy:
+        return jsonify({'message': 'Strategy not found'}), 404
+
+    data = request.get_json()
+    if not data or not data.get('as_of_date'):
+        return jsonify({'message': 'An as-of date is required'}), 400
+
+    try:
+        as_of_date = datetime.datetime.strptime(data['as_of_date'], '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    parameters, error = _simulation_parameters(data)
+    if error:
+        return jsonify({'message': error}), 400
+
+    simulation = Simulation(
+        strategy_id=strategy.id,
+        as_of_date=as_of_date,
+        parameters=parameters,
+        status='PENDING'
+    )
+    db.session.add(simulation)
+    db.session.commit()
+
+    queue = simulation_queue(strategy.definition, parameters['n_paths'], parameters['horizon_days'], current_app.config)
+    task = run_simulation_task.apply_async(args=[simulation.id], queue=queue)
+
+    simulation.celery_task_id = task.id
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Simulation launched successfully.',
+        'simulation_id': simulation.id,
+        'task_id': task.id,
+        'queue': queue,
+        'status_url': url_for('api.get_simulation', simulation_id=simulation.id, _external=True)
+    }), 202
+
+
+@api_bp.route('/simulations/<int:simulation_id>', methods=['GET'])
+@token_user_id_required
+def get_simulation(current_user_id, simulation_id):
+    """Reports a simulation's status, with its results once completed."""
+    simulation = Simulation.query.get_or_404(simulation_id)
+    strategy = Strategy.query.get_or_404(simulation.strategy_id)
+
+    if strategy.user_id != current_user_id:
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    response = {
+        'simulation_id': simulation.id,
+        'strategy_id': simulation.strategy_id,
+        'as_of_date': simulation.as_of_date.isoformat(),
+        'parameters': simulation.parameters,
+        'status': simulation.status,
+        'created_at': simulation.created_at.isoformat() if simulation.created_at else None,
+        'completed_at': simulation.completed_at.isoformat() if simulation.completed_at else None,
+    }
+
+    if simulation.status in ('PENDING', 'RUNNING') and simulation.celery_task_id:
+        task = run_simulation_task.AsyncResult(simulation.celery_task_id)
+        if task.state == 'PROGRESS' and isinstance(task.info, dict):
+            response['progress'] = {'current': task.info.get('current'), 'status': task.info.get('status')}
+    elif simulation.status in ('COMPLETED', 'FAILED'):
+        response['results'] = simulation.results
+
+    return jsonify(response)
@@ -1,10 +1,13 @@
 # backend/optionforge/api/strategies.py
 
-from flask import request, jsonify
+import datetime
+from flask import request, jsonify, current_app
 from . import api_bp
 from optionforge.models import Strategy, User
 from optionforge import db
-from .utils import token_required
+from .utils import token_required, token_user_id_required
+from optionforge.backtester.engine import BacktestEngine
+from optionforge.backtester.datasource import chain_source_from_config
 
 @api_bp.route('/strategies', methods=['POST'])
 @token_required
@@ -26,10 +29,10 @@ def create_strategy(current_user):
     return jsonify({'message': 'Strategy created successfully', 'id': strategy.id}), 201
 
 @api_bp.route('/strategies', methods=['GET'])
-@token_required
-def get_strategies(current_user):
+@token_user_id_required
+def get_strategies(current_user_id):
     """Retrieves all strategies for the logged-in user."""
-    strategies = Strategy.query.filter_by(user_id=current_user.id).all()
+    strategies = Strategy.query.filter_by(user_id=current_user_id).all()
     output = []
     for strategy in strategies:
         strategy_data = {
@@ -43,10 +46,10 @@ def get_strategies(current_user):
     return jsonify({'strategies': output})
 
 @api_bp.route('/strategies/<int:strategy_id>', methods=['GET'])
-@token_required
-def get_strategy(current_user, strategy_id):
+@token_user_id_required
+def get_strategy(current_user_id, strategy_id):
     """Retrieves a single strategy."""
-    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user.id).first()
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
     if not strategy:
         return jsonify({'message': 'Strategy not found'}), 404
 
@@ -60,10 +63,10 @@ def get_strategy(current_user, strategy_id):
     return jsonify(strategy_data)
 
 @api_bp.route('/strategies/<int:strategy_id>', methods=['PUT'])
-@token_required
-def update_strategy(current_user, strategy_id):
+@token_user_id_required
+def update_strategy(current_user_id, strategy_id):
     """Updates an existing strategy."""
-    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user.id).first()
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
     if not strategy:
         return jsonify({'message': 'Strategy not found'}), 404
 
@@ -76,13 +79,40 @@ def update_strategy(current_user, strategy_id):
     return jsonify({'message': 'Strategy updated successfully'})
 
 @api_bp.route('/strategies/<int:strategy_id>', methods=['DELETE'])
-@token_required
-def delete_strategy(current_user, strategy_id):
+@token_user_id_required
+def delete_strategy(current_user_id, strategy_id):
     """Deletes a strategy."""
-    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user.id).first()
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
     if not strategy:
         return jsonify({'message': 'Strategy not found'}), 404
     
     db.session.delete(strategy)
     db.session.commit()
     return jsonify({'message': 'Strategy deleted successfully'})
+
+@api_bp.route('/strategies/<int:strategy_id>/legs', methods=['GET'])
+@token_user_id_required
+def resolve_strategy_legs(current_user_id, strategy_id):
+    """
+    Resolves a strategy's legs to the contracts it would open on a given date.
+    /api/strategies/1/legs?date=2023-01-20
+    """
+    strategy = Strategy.query.filter_by(id=strategy_id, user_id=current_user_id).first()
+    if not strategy:
+        return jsonify({'message': 'Strategy not found'}), 404
+
+    try:
+        date = datetime.datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'A date parameter in YYYY-MM-DD format is required.'}), 400
+
+    try:
+        engine = BacktestEngine(strategy.definition, date, date,
+                                data_source=chain_source_from_config(current_app.config))
+        resolved = engine.resolve_legs()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 404
+
+    if resolved['legs'] is None:
+        return jsonify(dict(resolved, message='Some legs have no tradable contract on this date.')), 404
+    return jsonify(dict(resolved, strategy_id=strategy.id))
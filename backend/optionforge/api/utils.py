@@ -1,33 +1,236 @@
 # backend/optionforge/api/utils.py
 
+import threading
+import time
 from functools import wraps
-from flask import request, jsonify
+import jwt
+import redis
+from flask import request, jsonify, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from optionforge import db
 from optionforge.models import User
+from optionforge.caching import TTLCache
 
-def token_required(f):
-    """Decorator to protect routes with JWT authentication."""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            # Expected format: "Bearer <token>"
-            token = request.headers['Authorization'].split(" ")[1]
+class LocalUserGenerations:
+    """
+    Per-user counters bumped whenever a user row changes or is deleted.
+
+    Cached token validations are stored with their user's generation;
+    entries validated under an older one are re-checked. In-process only,
+    for single-process setups.
+    """
+
+    def __init__(self):
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        return self._generations.get(user_id, 0)
+
+    def bump(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+
+class RedisUserGenerations(LocalUserGenerations):
+    """
+    LocalUserGenerations kept in step across web processes over Redis pub/sub.
+
+    Reads stay in-process, so a cached validation costs no round trip. Each
+    bump is applied locally and published; a listener thread applies the
+    published bumps (its own included, which only moves them further). Bumps published while the listener is not
+    subscribed are lost, so generations are returned with the subscription's
+    epoch: while it is down `get` returns None (validate in full, cache
+    nothing), and entries cached under an earlier subscription are re-checked.
+    """
+    CHANNEL = 'auth:user-changed'
+
+    def __init__(self, url, retry_interval=1.0):
+        super().__init__()
+        self.redis = redis.Redis.from_url(url, health_check_interval=30)
+        self.retry_interval = retry_interval
+        self._epoch = None
+        threading.Thread(target=self._listen, name='auth-user-generations', daemon=True).start()
+
+    def get(self, user_id):
+        epoch = self._epoch
+        return None if epoch is None else (epoch, super().get(user_id))
+
+    def bump(self, user_ids):
+        super().bump(user_ids)
+        self.redis.publish(self.CHANNEL, ','.join(str(user_id) for user_id in user_ids))
 
-        if not token:
-            return jsonify({'message': 'Token is missing!'}), 401
+    def _listen(self):
+        epoch = 0
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                pubsub.subscribe(self.CHANNEL)
+                for message in pubsub.listen():
+                    if message['type'] == 'subscribe':
+                        # Confirmed: every bump published from here on arrives
+                        epoch += 1
+                        self._epoch = epoch
+                    elif message['type'] == 'message':
+                        LocalUserGenerations.bump(self, [int(user_id) for user_id in message['data'].split(b',')])
+            except redis.RedisError:
+                pass
+            finally:
+                self._epoch = None
+                pubsub.close()
+            time.sleep(self.retry_interval)
 
+
+def user_generations(app):
+    """
+    The app's user generation counters, created on first use.
+
+    AUTH_GENERATIONS selects 'redis' (default, pub/sub at AUTH_REDIS_URL) or 'local'.
+    """
+    generations = app.extensions.get('auth_user_generations')
+    if generations is None:
+        if app.config.get('AUTH_GENERATIONS', 'redis') == 'local':
+            generations = LocalUserGenerations()
+        else:
+            generations = RedisUserGenerations(app.config['AUTH_REDIS_URL'])
+        generations = app.extensions.setdefault('auth_user_generations', generations)
+    return generations
+
+
+def invalidate_user_tokens(*user_ids):
+    """Drops every web process' cached validations of these users' tokens."""
+    user_generations(current_app).bump(user_ids)
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, user):
+    # Flushes also "update" users whose only change is a related collection
+    if object_session(user).is_modified(user, include_collections=False):
+        object_session(user).info.setdefault('changed_user_ids', set()).add(user.id)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, user):
+    object_session(user).info.setdefault('changed_user_ids', set()).add(user.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _users_committed(session):
+    # Bumped only once the change is visible, so a concurrent re-check
+    # cannot cache the old row under the new generation
+    user_ids = session.info.pop('changed_user_ids', None)
+    if user_ids:
         try:
-            user_id = User.decode_auth_token(token)
-            if isinstance(user_id, str): # Error string was returned
-                return jsonify({'message': user_id}), 401
-            
+            invalidate_user_tokens(*user_ids)
+        except redis.RedisError:
+            pass  # stale validations still expire after AUTH_TOKEN_CACHE_TTL
+
+
+@event.listens_for(Session, 'after_rollback')
+def _users_rolled_back(session):
+    session.info.pop('changed_user_ids', None)
+
+
+def _token_cache():
+    """The per-process cache of validated tokens: token -> (user id, generation, token expiry)."""
+    cache = current_app.extensions.get('auth_token_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('auth_token_cache', TTLCache(
+            max_entries=current_app.config.get('AUTH_TOKEN_CACHE_SIZE', 4096),
+            ttl=current_app.config.get('AUTH_TOKEN_CACHE_TTL', 60)
+        ))
+    return cache
+
+
+# Event streams opened by browsers' EventSource, which cannot set headers and
+# so pass the token as ?token=; no other route accepts it in the URL, where
+# access logs and proxies record it
+QUERY_TOKEN_ENDPOINTS = {'api.stream_backtest_progress'}
+
+
+def _request_token():
+    if 'Authorization' in request.headers:
+        # Expected format: "Bearer <token>"
+        return request.headers['Authorization'].split(" ")[1]
+    if request.endpoint in QUERY_TOKEN_ENDPOINTS:
+        return request.args.get('token')
+    return None
+
+
+def _authenticate(load_user):
+    """
+    Validates the request's token.
+
+    Tokens whose user was confirmed within the last AUTH_TOKEN_CACHE_TTL
+    seconds (0 disables the cache) skip decoding and the user lookup, unless
+    the user has changed since. Without `load_user` a miss only checks that
+    the user id exists.
+
+    :return: (User or user id, None) or (None, error response)
+    """
+    token = _request_token()
+    if not token:
+        return None, (jsonify({'message': 'Token is missing!'}), 401)
+
+    cache = _token_cache() if current_app.config.get('AUTH_TOKEN_CACHE_TTL', 60) else None
+    generations = user_generations(current_app) if cache is not None else None
+    cached = cache.get(token) if cache is not None else None
+    if cached:
+        user_id, generation, expires_at = cached
+        # None while changes made elsewhere cannot be seen; validate in full
+        current = generations.get(user_id)
+        if generation == current and expires_at > time.time():
+            return (User.query.get(user_id) if load_user else user_id), None
+
+    try:
+        user_id = User.decode_auth_token(token)
+        if isinstance(user_id, str): # Error string was returned
+            return None, (jsonify({'message': user_id}), 401)
+
+        # Read before the lookup, so a change committed meanwhile invalidates this entry
+        generation = generations.get(user_id) if generations is not None else None
+        if load_user:
             current_user = User.query.get(user_id)
-            if not current_user:
-                 return jsonify({'message': 'User not found'}), 401
+            found = current_user is not None
+        else:
+            found = db.session.query(User.id).filter_by(id=user_id).first() is not None
+        if not found:
+            return None, (jsonify({'message': 'User not found'}), 401)
 
-        except Exception as e:
-            return jsonify({'message': 'Token is invalid!'}), 401
+        if cache is not None and generation is not None:
+            # The signature was verified above; only the expiry is needed here
+            expires_at = jwt.decode(token, options={'verify_signature': False})['exp']
+            cache.set(token, (user_id, generation, expires_at))
 
+    except Exception as e:
+        return None, (jsonify({'message': 'Token is invalid!'}), 401)
+
+    return (current_user if load_user else user_id), None
+
+
+def token_required(f):
+    """Decorator to protect routes with JWT authentication; passes the current User."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        current_user, error = _authenticate(load_user=True)
+        if error:
+            return error
+        if current_user is None:
+            return jsonify({'message': 'User not found'}), 401
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+
+def token_user_id_required(f):
+    """Like token_required, but passes only the user id and never loads the User row."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        current_user_id, error = _authenticate(load_user=False)
+        if error:
+            return error
+        return f(current_user_id, *args, **kwargs)
+
+    return decorated
@@ -0,0 +1,195 @@
+# backend/optionforge/backtester/cache.py
+
+import datetime
+import os
+import shutil
+import tempfile
+import uuid
+import numpy as np
+import pandas as pd
+
+# On-disk dtype of each cached field; these are the columns the engine reads.
+# Dates are days since the epoch and the option type is stored as a category
+# code (1 = call, 0 = put).
+CACHE_FIELDS = {
+    'data_date': np.int32,
+    'expiration_date': np.int32,
+    'strike_price': np.float32,
+    'option_type': np.int8,
+    'bid': np.float32,
+    'ask': np.float32,
+    'last_price': np.float32,
+    'implied_volatility': np.float32,
+    'delta': np.float32,
+}
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _to_days(value):
+    return (pd.Timestamp(value).date() - _EPOCH).days
+
+
+class CachedChainSource:
+    """
+    Memory-mapped, per-ticker cache in front of another chain source.
+
+    The first load of a (ticker, date range) writes the chain as one compact
+    .npy file per field under `<root>/<ticker>/<start>_<end>/`. Later loads,
+    from any worker process on the same host, map those files read-only, so
+    the operating system's page cache holds a single shared copy. A cached
+    range also serves any sub-range of it.
+
+    Entries are published with an atomic directory rename, so concurrent
+    workers never see a partial build. Ingestion calls `invalidate` to drop a
+    ticker's entries once new rows are stored for it.
+
+    Each ticker has a generation token, replaced by every invalidation. An
+    entry is named after the generation current when its build started
+    loading, and only entries of the current generation are served, so a
+    build racing an invalidation can never publish stale rows.
+    """
+
+    def __init__(self, source, root):
+        self.source = source
+        self.root = root
+
+    def _ticker_dir(self, ticker):
+        return os.path.join(self.root, ticker)
+
+    def _generation_path(self, ticker):
+        return os.path.join(self.root, f'.{ticker}.generation')
+
+    def _generation(self, ticker):
+        """The ticker's current generation token ('0' before its first invalidation)."""
+        try:
+            with open(self._generation_path(ticker)) as f:
+                return f.read().strip() or '0'
+        except FileNotFoundError:
+            return '0'
+
+    def _find_entry(self, ticker, start, end):
+        """Returns the path of a current-generation cached range covering [start, end], if any."""
+        ticker_dir = self._ticker_dir(ticker)
+        if not os.path.isdir(ticker_dir):
+            return None
+        generation = self._generation(ticker)
+        for name in os.listdir(ticker_dir):
+            try:
+                entry_generation, cached_start, cached_end = name.split('_')
+                cached_start, cached_end = int(cached_start), int(cached_end)
+            except ValueError:
+                continue  # in-progress build
+            if entry_generation == generation and cached_start <= start and cached_end >= end:
+                return os.path.join(ticker_dir, name)
+        return None
+
+    def _build_entry(self, ticker, start_date, end_date):
+        """
+        Loads the range from the underlying source and publishes it to the cache.
+
+        :return: The published entry's path, or None if the ticker was
+                 invalidated while building; the caller then reads the
+                 source directly.
+        """
+        # Read before loading: rows loaded after an invalidation carry its new generation
+        generation = self._generation(ticker)
+        df = self.source.load(ticker, start_date, end_date, columns=list(CACHE_FIELDS))
+        df['data_date'] = pd.to_datetime(df['data_date'])
+        df['expiration_date'] = pd.to_datetime(df['expiration_date'])
+        df = df.sort_values(['data_date', 'expiration_date', 'strike_price', 'option_type'], kind='mergesort')
+
+        fields = {
+            'data_date': (df['data_date'] - pd.Timestamp(_EPOCH)).dt.days,
+            'expiration_date': (df['expiration_date'] - pd.Timestamp(_EPOCH)).dt.days,
+            'option_type': df['option_type'] == 'call',
+        }
+
+        ticker_dir = self._ticker_dir(ticker)
+        final_dir = os.path.join(ticker_dir, f'{generation}_{_to_days(start_date)}_{_to_days(end_date)}')
+        build_dir = None
+        try:
+            os.makedirs(ticker_dir, exist_ok=True)
+            build_dir = tempfile.mkdtemp(prefix='.build-', dir=ticker_dir)
+            for name, dtype in CACHE_FIELDS.items():
+                values = fields[name] if name in fields else df[name]
+                np.save(os.path.join(build_dir, f'{name}.npy'), values.to_numpy(dtype=dtype))
+            os.rename(build_dir, final_dir)
+        except OSError:
+            # Another worker published the same range first, or an
+            # invalidation moved the ticker's directory away mid-build
+            if build_dir:
+                shutil.rmtree(build_dir, ignore_errors=True)
+        if self._generation(ticker) != generation:
+            shutil.rmtree(final_dir, ignore_errors=True)
+            return None
+        return final_dir if os.path.isdir(final_dir) else None
+
+    def load(self, ticker, start_date, end_date, columns=None, min_expiration=None, max_expiration=None):
+        """Loads the chain for a ticker and date range; see SQLChainSource.load."""
+        columns = columns or list(CACHE_FIELDS)
+        if any(c not in CACHE_FIELDS for c in columns):
+            return self.source.load(ticker, start_date, end_date, columns, min_expiration, max_expiration)
+
+        start, end = _to_days(start_date), _to_days(end_date)
+        entry = self._find_entry(ticker, start, end) or self._build_entry(ticker, start_date, end_date)
+        if entry is None:
+            return self.source.load(ticker, start_date, end_date, columns, min_expiration, max_expiration)
+        arrays = {name: np.load(os.path.join(entry, f'{name}.npy'), mmap_mode='r') for name in columns}
+        dates = arrays.get('data_date')
+        if dates is None:
+            dates = np.load(os.path.join(entry, 'data_date.npy'), mmap_mode='r')
+
+        # Rows are sorted by date, so the requested date range is a zero-copy slice
+        lo, hi = np.searchsorted(dates, start, side='left'), np.searchsorted(dates, end, side='right')
+        arrays = {name: values[lo:hi] for name, values in arrays.items()}
+
+        if min_expiration is not None or max_expiration is not None:
+            expirations = np.load(os.path.join(entry, 'expiration_date.npy'), mmap_mode='r')[lo:hi]
+            keep = np.ones(hi - lo, dtype=bool)
+            if min_expiration is not None:
+                keep &= expirations >= _to_days(min_expiration)
+            if max_expiration is not None:
+                keep &= expirations <= _to_days(max_expiration)
+            # Expiries interleave within each day, so the window is a copy of the kept rows
+            arrays = {name: values[keep] for name, values in arrays.items()}
+
+        df = pd.DataFrame(arrays, copy=False)
+        for name in ('data_date', 'expiration_date'):
+            if name in df:
+                df[name] = pd.to_datetime(df[name].astype(np.int64), unit='D')
+        if 'option_type' in df:
+            df['option_type'] = np.where(df['option_type'].to_numpy() == 1, 'call', 'put')
+        return df
+
+    def invalidate(self, ticker):
+        """
+        Drops every cached range of a ticker.
+
+        A new generation token is written first, so builds that loaded
+        before this call are never served. The directory is then renamed
+        away before deletion, so new loads rebuild immediately while workers
+        that already mapped the old files keep reading them until they are done.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, token_path = tempfile.mkstemp(prefix=f'.{ticker}-generation-', dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(token_path, self._generation_path(ticker))
+
+        ticker_dir = self._ticker_dir(ticker)
+        if not os.path.isdir(ticker_dir):
+            return
+        doomed = tempfile.mkdtemp(prefix=f'.{ticker}-stale-', dir=self.root)
+        try:
+            os.rename(ticker_dir, os.path.join(doomed, ticker))
+        except OSError:
+            pass  # already invalidated by another process
+        shutil.rmtree(doomed, ignore_errors=True)
+
+
+def invalidate_chain_cache(config, ticker):
+    """Drops a ticker's cached chains if the chain cache is enabled in the app config."""
+    root = config.get('CHAIN_CACHE_PATH')
+    if root:
+        CachedChainSource(None, root).invalidate(ticker)
@@ -0,0 +1,190 @@
+# backend/optionforge/backtester/datasource.py
+
+import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from optionforge.models import db, OptionData, UnderlyingPrice, IVHistory
+from .cache import CachedChainSource
+
+# Columns the backtest engine reads from a chain
+ENGINE_COLUMNS = [
+    'data_date', 'expiration_date', 'strike_price', 'option_type',
+    'bid', 'ask', 'last_price', 'implied_volatility', 'delta'
+]
+
+# Arrow schema of the on-disk store; partition columns are added on write
+CHAIN_SCHEMA = pa.schema([
+    ('data_date', pa.date32()),
+    ('expiration_date', pa.date32()),
+    ('strike_price', pa.float64()),
+    ('option_type', pa.dictionary(pa.int8(), pa.string())),
+    ('last_price', pa.float64()),
+    ('bid', pa.float64()),
+    ('ask', pa.float64()),
+    ('volume', pa.float64()),
+    ('open_interest', pa.float64()),
+    ('implied_volatility', pa.float64()),
+    ('delta', pa.float64()),
+    ('gamma', pa.float64()),
+    ('theta', pa.float64()),
+    ('vega', pa.float64()),
+])
+
+
+class SQLChainSource:
+    """Reads option chains from the `option_data` table."""
+
+    def load(self, ticker, start_date, end_date, columns=None, min_expiration=None, max_expiration=None):
+        """
+        Loads the chain for a ticker and date range as a DataFrame.
+
+        :param columns: Column names to load (all OptionData columns if None)
+        :param min_expiration: Optional lower bound on expiration_date
+        :param max_expiration: Optional upper bound on expiration_date
+        """
+        entities = [getattr(OptionData, c) for c in columns] if columns else [OptionData]
+        query = db.session.query(*entities).filter(
+            OptionData.underlying_ticker == ticker,
+            OptionData.data_date >= start_date,
+            OptionData.data_date <= end_date
+        )
+        if min_expiration is not None:
+            query = query.filter(OptionData.expiration_date >= min_expiration)
+        if max_expiration is not None:
+            query = query.filter(OptionData.expiration_date <= max_expiration)
+        return pd.read_sql(query.statement, db.session.bind)
+
+
+class ParquetChainSource:
+    """
+    Reads option chains from a Parquet dataset on disk.
+
+    The dataset is hive-partitioned as `<root>/underlying_ticker=<T>/data_month=<YYYY-MM>/`,
+    so a backtest only opens the files of its ticker and months. Date and expiry
+    filters are pushed down to Parquet row-group statistics, and only the
+    requested columns are decoded.
+    """
+
+    PARTITIONING = ds.partitioning(
+        pa.schema([('underlying_ticker', pa.string()), ('data_month', pa.string())]),
+        flavor='hive'
+    )
+
+    def __init__(self, root):
+        self.root = root
+
+    def _dataset(self):
+        return ds.dataset(self.root, format='parquet', partitioning=self.PARTITIONING)
+
+    def load(self, ticker, start_date, end_date, columns=None, min_expiration=None, max_expiration=None):
+        """Loads the chain for a ticker and date range; see SQLChainSource.load."""
+        months = pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq='M').strftime('%Y-%m').tolist()
+        expression = (
+            (ds.field('underlying_ticker') == ticker)
+            & ds.field('data_month').isin(months)
+            & (ds.field('data_date') >= start_date)
+            & (ds.field('data_date') <= end_date)
+        )
+        if min_expiration is not None:
+            expression &= ds.field('expiration_date') >= min_expiration
+        if max_expiration is not None:
+            expression &= ds.field('expiration_date') <= max_expiration
+
+        table = self._dataset().to_table(columns=columns, filter=expression)
+        df = table.to_pandas(date_as_object=False)
+        if 'option_type' in df:
+            df['option_type'] = df['option_type'].astype(str)
+        return df
+
+    def write(self, ticker, chain_df):
+        """
+        Writes a chain DataFrame for one ticker into the store.
+
+        Months present in `chain_df` replace whatever the store held for them,
+        so re-exporting a range is idempotent.
+        """
+        df = chain_df[[f.name for f in CHAIN_SCHEMA]].copy()
+        df['data_date'] = pd.to_datetime(df['data_date']).dt.date
+        df['expiration_date'] = pd.to_datetime(df['expiration_date']).dt.date
+        table = pa.Table.from_pandas(df, schema=CHAIN_SCHEMA, preserve_index=False)
+        table = table.append_column('underlying_ticker', pa.array([ticker] * len(df), pa.string()))
+        table = table.append_column('data_month', pa.array(pd.to_datetime(df['data_date']).dt.strftime('%Y-%m'), pa.string()))
+
+        ds.write_dataset(
+            table.sort_by([('data_date', 'ascending'), ('expiration_date', 'ascending')]),
+            self.root,
+            format='parquet',
+            partitioning=self.PARTITIONING,
+            existing_data_behavior='delete_matching',
+            # Roughly one trading week per row group keeps date pruning effective
+            max_rows_per_group=64 * 1024,
+            min_rows_per_group=16 * 1024
+        )
+
+
+def load_underlying_prices(ticker, start_date, end_date):
+    """
+    Loads an underlying's stored daily closes for a date range.
+
+    A single range query on the (ticker, date) unique index; the prices live
+    in the database whichever chain source is configured.
+
+    :return: Series of closes indexed by date (DatetimeIndex), empty if none are stored.
+    """
+    rows = db.session.query(UnderlyingPrice.data_date, UnderlyingPrice.close).filter(
+        UnderlyingPrice.underlying_ticker == ticker,
+        UnderlyingPrice.data_date >= start_date,
+        UnderlyingPrice.data_date <= end_date
+    ).order_by(UnderlyingPrice.data_date).all()
+    dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    closes = np.array([row[1] for row in rows], dtype=np.float64)
+    return pd.Series(closes, index=pd.DatetimeIndex(dates), name='underlying_price')
+
+
+def load_iv_history(ticker, start_date, end_date):
+    """
+    Loads a ticker's daily IV rank and percentile for a date range.
+
+    :return: DataFrame with 'iv_rank' and 'iv_percentile' indexed by date
+             (DatetimeIndex), empty if none are stored.
+    """
+    rows = db.session.query(IVHistory.data_date, IVHistory.iv_rank, IVHistory.iv_percentile).filter(
+        IVHistory.underlying_ticker == ticker,
+        IVHistory.data_date >= start_date,
+        IVHistory.data_date <= end_date
+    ).order_by(IVHistory.data_date).all()
+    dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+    return pd.DataFrame({
+        'iv_rank': np.array([row[1] for row in rows], dtype=np.float64),
+        'iv_percentile': np.array([row[2] for row in rows], dtype=np.float64),
+    }, index=pd.DatetimeIndex(dates))
+
+
+def chain_source_from_config(config):
+    """
+    Builds the chain source selected by the app config.
+
+    CHAIN_DATA_SOURCE is 'sql' (default) or 'parquet'; the Parquet store lives
+    at CHAIN_STORE_PATH. If CHAIN_CACHE_PATH is set, the source is wrapped in
+    the shared memory-mapped cache.
+    """
+    if config.get('CHAIN_DATA_SOURCE', 'sql') == 'parquet':
+        source = ParquetChainSource(config['CHAIN_STORE_PATH'])
+    else:
+        source = SQLChainSource()
+    if config.get('CHAIN_CACHE_PATH'):
+        source = CachedChainSource(source, config['CHAIN_CACHE_PATH'])
+    return source
+
+
+def expiration_window(start_date, end_date, legs):
+    """
+    Expiry bounds covering every contract a strategy could select in a date range.
+
+    An expiry more than twice the largest leg DTE past the last trading day is
+    never the nearest-DTE match unless nothing closer is listed, so it is not loaded.
+    """
+    max_dte = max((leg.get('dte', 30) for leg in legs), default=30)
+    return start_date, end_date + datetime.timedelta(days=2 * max_dte)
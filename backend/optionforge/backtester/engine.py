@@ -2,96 +2,421 @@
 
 import pandas as pd
 import numpy as np
-from optionforge.models import db, OptionData
-from .pricing import black_scholes
-from .metrics import calculate_metrics
+from optionforge.ingest import underlying_prices_by_date, mid_prices, chain_data_version
+from .pricing import black_scholes_greeks_vectorized
+from .metrics import calculate_metrics, StreamingMetrics
+from .datasource import SQLChainSource, ENGINE_COLUMNS, expiration_window, load_underlying_prices, load_iv_history
+from .selection import build_selection_index, select_legs
+from .surface import VolSurface, cached_surface
+from .signals import PRICE_SIGNALS, validate_entry_rules, signal_field, compile_entry_signals
+
+# Equity options control 100 shares per contract
+CONTRACT_MULTIPLIER = 100
+
+# Part of every stored result's cache key; bump it whenever a change to the
+# engine alters the results of an existing strategy
+ENGINE_VERSION = 5
+
+# Entry rules bounding a day's stored IV rank/percentile (0-100), by chain field
+IV_ENTRY_RULES = {
+    'iv_rank_min': ('iv_rank', np.greater_equal),
+    'iv_rank_max': ('iv_rank', np.less_equal),
+    'iv_percentile_min': ('iv_percentile', np.greater_equal),
+    'iv_percentile_max': ('iv_percentile', np.less_equal),
+}
+
 
 class BacktestEngine:
     """
     Core engine for running vectorized backtests on options strategies.
+
+    The chain is loaded once and flattened into NumPy arrays sorted by
+    (trading day, contract). Each trading day is then a contiguous slice of
+    those arrays, so mark-to-market is an array operation on that slice rather
+    than per-row pandas work, and leg selection is a few binary searches in a
+    per-day index of expiries, strikes and deltas built with the chain.
     """
-    def __init__(self, strategy_definition, start_date, end_date, progress_callback=None):
+    def __init__(self, strategy_definition, start_date, end_date, progress_callback=None, data_source=None):
         self.strategy = strategy_definition
         self.start_date = start_date
         self.end_date = end_date
         self.progress_callback = progress_callback
+        self.data_source = data_source or SQLChainSource()
         self.underlying_ticker = self.strategy.get('underlying_ticker', 'SPY')
-        self.risk_free_rate = self.strategy.get('settings', {}).get('risk_free_rate', 0.02)
-        
+        settings = self.strategy.get('settings', {})
+        self.risk_free_rate = settings.get('risk_free_rate', 0.02)
+        self.initial_capital = settings.get('initial_capital', 100000)
+
         self.legs = self.strategy.get('legs', [])
         if not self.legs:
             raise ValueError("Strategy definition must contain at least one leg.")
+        self.entry_rules = self.strategy.get('entry_rules') or {}
+        validate_entry_rules(self.entry_rules)
+        self.exit_rules = self.strategy.get('exit_rules') or {}
+        # Leg selections by trading day; engines with identical legs may share it
+        self.selection_cache = {}
 
-    def _update_progress(self, percentage, message):
+    def _update_progress(self, percentage, message, metrics=None):
+        """Reports progress; callbacks receive live metrics as a third argument when available."""
         if self.progress_callback:
-            self.progress_callback(percentage, message)
+            if metrics is None:
+                self.progress_callback(percentage, message)
+            else:
+                self.progress_callback(percentage, message, metrics)
 
     def _fetch_data(self):
-        """Fetches required options and underlying data from the database."""
+        """Fetches required options and underlying data from the configured chain source."""
         self._update_progress(5, f"Fetching data for {self.underlying_ticker}...")
-        
-        # This is a simplified data fetching logic.
-        # A real implementation would need to be more sophisticated,
-        # fetching underlying price data and matching option chains for each day.
-        # For this example, we'll assume we can query a pre-populated DB.
-        
-        query = db.session.query(OptionData).filter(
-            OptionData.underlying_ticker == self.underlying_ticker,
-            OptionData.data_date >= self.start_date,
-            OptionData.data_date <= self.end_date
+
+        min_expiration, max_expiration = expiration_window(self.start_date, self.end_date, self.legs)
+        df = self.data_source.load(
+            self.underlying_ticker, self.start_date, self.end_date,
+            columns=ENGINE_COLUMNS, min_expiration=min_expiration, max_expiration=max_expiration
         )
-        
-        df = pd.read_sql(query.statement, db.session.bind)
         if df.empty:
             raise ValueError(f"No option data found for {self.underlying_ticker} in the given date range.")
 
-        # For simplicity, we'll simulate the underlying price from the options data.
-        # A real implementation should fetch actual historical stock prices.
-        underlying_prices = df.groupby('data_date').apply(
-            lambda x: (x['bid'] + x['ask']).mean() if not x.empty else np.nan
-        ).rename('underlying_price').dropna()
+        df['data_date'] = pd.to_datetime(df['data_date'])
+        df['expiration_date'] = pd.to_datetime(df['expiration_date'])
+        df['T'] = (df['expiration_date'] - df['data_date']).dt.days / 365.0
+        df['mid'] = mid_prices(df)
+
+        # Stored daily closes, with put-call parity estimates for days without one
+        stored_prices = load_underlying_prices(self.underlying_ticker, self.start_date, self.end_date)
+        underlying_prices = underlying_prices_by_date(df, stored_prices, self.risk_free_rate)
 
         self._update_progress(20, "Data fetched successfully.")
         return df, underlying_prices
 
+    def _prepare_chain(self, df, underlying_prices):
+        """
+        Flattens the chain into arrays sorted by (day, contract) with per-day offsets.
+
+        Deltas missing from the stored data are filled from implied volatility
+        with the vectorized pricer. The chain also carries the leg selection
+        index built from these arrays (see `selection.build_selection_index`),
+        each day's IV rank and percentile from iv_history and the masks of the
+        strategy's price-signal entry rules (see `_entry_signals`).
+        """
+        df = df.copy()
+        df['contract_id'] = df.groupby(['expiration_date', 'strike_price', 'option_type'], sort=False).ngroup()
+        df = df.sort_values(['data_date', 'contract_id'], kind='mergesort')
+
+        dates = df['data_date'].to_numpy(dtype='datetime64[D]')
+        day_values, day_start = np.unique(dates, return_index=True)
+        day_end = np.append(day_start[1:], len(dates))
+
+        spot_by_day = underlying_prices.reindex(pd.DatetimeIndex(day_values)).ffill().to_numpy(dtype=np.float64)
+        day_index = np.repeat(np.arange(len(day_values)), day_end - day_start)
+        spot = spot_by_day[day_index]
+
+        expiration = df['expiration_date'].to_numpy(dtype='datetime64[D]')
+        strike = df['strike_price'].to_numpy(dtype=np.float64)
+        is_call = (df['option_type'] == 'call').to_numpy()
+        mid = df['mid'].to_numpy(dtype=np.float64)
+        T = df['T'].to_numpy(dtype=np.float64)
+
+        delta = df['delta'].to_numpy(dtype=np.float64, copy=True)
+        missing = ~np.isfinite(delta)
+        if missing.any():
+            iv = df['implied_volatility'].to_numpy(dtype=np.float64, copy=True)
+            # Contracts without a stored volatility take it from their day's fitted surface
+            unquoted = missing & ~(iv > 0)
+            if unquoted.any():
+                self._fill_from_surfaces(df, day_values, day_start, day_end, spot_by_day, unquoted, iv)
+            greeks = black_scholes_greeks_vectorized(spot[missing], strike[missing], T[missing],
+                                                     self.risk_free_rate, iv[missing], is_call[missing])
+            delta[missing] = greeks['delta']
+
+        chain = {
+            'days': day_values,
+            'day_start': day_start,
+            'day_end': day_end,
+            'spot': spot_by_day,
+            'contract_id': df['contract_id'].to_numpy(dtype=np.int64),
+            'expiration': expiration,
+            'dte': (expiration - dates).astype(np.int64),
+            'strike': strike,
+            'is_call': is_call,
+            'mid': mid,
+            'delta': delta,
+        }
+        chain.update(build_selection_index(chain))
+        iv_history = load_iv_history(self.underlying_ticker, self.start_date, self.end_date)
+        iv_history = iv_history.reindex(pd.DatetimeIndex(day_values))
+        chain['iv_rank'] = iv_history['iv_rank'].to_numpy(dtype=np.float64)
+        chain['iv_percentile'] = iv_history['iv_percentile'].to_numpy(dtype=np.float64)
+        chain.update(self._entry_signals(day_values, spot_by_day))
+        return chain
+
+    def _entry_signals(self, days, spot):
+        """
+        Per-day masks of the strategy's price-signal entry rules, by chain field.
+
+        Computed where the database is reachable and carried in the chain, so
+        `_entry_mask` is a lookup even in workers without an app context.
+        Engines sharing a chain add their own masks to it; the chain's `spot`
+        must have been estimated at this engine's risk-free rate.
+        """
+        return compile_entry_signals(self.underlying_ticker, self.entry_rules, days, spot,
+                                     chain_data_version(self.underlying_ticker), self.risk_free_rate)
+
+    def _fill_from_surfaces(self, df, day_values, day_start, day_end, spot_by_day, rows, iv):
+        """
+        Fills `iv` at `rows` from the SVI surface of each row's trading day.
+
+        Surfaces come from the process-wide cache (see `surface.cached_surface`)
+        and are only fitted for days with rows to fill. Days whose chain has no
+        usable volatility are left as they are.
+        """
+        version = chain_data_version(self.underlying_ticker)
+        strike = df['strike_price'].to_numpy(dtype=np.float64)
+        dte = (df['expiration_date'] - df['data_date']).dt.days.to_numpy(dtype=np.float64)
+        for day in np.unique(np.searchsorted(day_start, np.flatnonzero(rows), side='right') - 1):
+            start, end = day_start[day], day_end[day]
+            spot = spot_by_day[day]
+            if not np.isfinite(spot):
+                continue
+            try:
+                surface = cached_surface(self.underlying_ticker, day_values[day], version, self.risk_free_rate,
+                                         lambda: VolSurface.from_chain(df.iloc[start:end], spot, self.risk_free_rate))
+            except ValueError:
+                continue
+            day_rows = start + np.flatnonzero(rows[start:end])
+            iv[day_rows] = surface.vol(strike[day_rows], dte[day_rows])
+
+    def _entry_mask(self, chain):
+        """
+        Boolean mask over trading days on which a new position may be opened.
+
+        IV and price-signal rules are lookups in per-day arrays of the chain;
+        days without a value never satisfy them.
+        """
+        days = chain['days']
+        mask = np.ones(len(days), dtype=bool)
+        days_of_week = self.entry_rules.get('days_of_week')
+        if days_of_week:
+            # 1970-01-01 was a Thursday; this yields ISO weekdays (Monday = 1)
+            iso_weekday = (days.astype(np.int64) + 3) % 7 + 1
+            mask &= np.isin(iso_weekday, days_of_week)
+        for rule, (field, compare) in IV_ENTRY_RULES.items():
+            bound = self.entry_rules.get(rule)
+            if bound is not None:
+                mask &= compare(chain[field], bound)
+        for rule in PRICE_SIGNALS:
+            if rule in self.entry_rules:
+                mask &= chain[signal_field(rule, self.entry_rules[rule])]
+        return mask
+
+    def _select_legs(self, chain, day):
+        """
+        Picks one contract per strategy leg on a trading day (see `selection.select_legs`).
+
+        :return: Array of row indices into the chain arrays, or None if any leg
+                 has no tradable contract on this day.
+        """
+        return select_legs(chain, day, self.legs)
+
+    def resolve_legs(self):
+        """
+        The contracts the strategy would open on the first trading day of its date range.
+
+        :return: Dict with the 'date', the 'underlying_price' and 'legs', one
+                 contract description per strategy leg; 'legs' is None if some
+                 leg has no tradable contract that day.
+        :raises ValueError: If there is no option data in the date range.
+        """
+        options_df, underlying_prices = self._fetch_data()
+        chain = self._prepare_chain(options_df, underlying_prices)
+        spot = chain['spot'][0]
+        resolved = {
+            'date': str(chain['days'][0]),
+            'underlying_price': round(float(spot), 2) if np.isfinite(spot) else None,
+            'legs': None
+        }
+        rows = self._select_legs(chain, 0)
+        if rows is None:
+            return resolved
+
+        resolved['legs'] = []
+        for leg, row in zip(self.legs, rows):
+            delta = chain['delta'][row]
+            resolved['legs'].append({
+                'type': 'call' if chain['is_call'][row] else 'put',
+                'action': leg.get('action', 'buy'),
+                'quantity': leg.get('quantity', 1),
+                'expiration_date': str(chain['expiration'][row]),
+                'dte': int(chain['dte'][row]),
+                'strike': float(chain['strike'][row]),
+                'delta': round(float(delta), 4) if np.isfinite(delta) else None,
+                'mid': round(float(chain['mid'][row]), 4)
+            })
+        return resolved
+
+    def _mark_positions(self, chain, day, contract_ids, last_marks):
+        """Looks up today's mid for each held contract, carrying the last mark if it is not quoted."""
+        start, end = chain['day_start'][day], chain['day_end'][day]
+        day_ids = chain['contract_id'][start:end]
+        pos = np.minimum(np.searchsorted(day_ids, contract_ids), len(day_ids) - 1)
+        found = day_ids[pos] == contract_ids
+        marks = chain['mid'][start:end][pos]
+        return np.where(found & (marks > 0), marks, last_marks)
+
+    def _simulate(self, chain, report_progress=True):
+        """Walks every trading day, returning the cumulative PnL per day and the closed trades."""
+        path = self._simulate_range(chain, report_progress=report_progress)
+        return path['pnl'], path['trades']
+
+    def _simulate_range(self, chain, start_day=0, end_day=None, until_flat=False, sync_flat=None,
+                        report_progress=False):
+        """
+        Opens, marks and closes positions over a range of trading days, starting flat.
+
+        :param start_day: First day index to simulate; PnL is measured from here.
+        :param end_day: Day index to stop at (exclusive); defaults to the last day.
+        :param until_flat: Keep simulating past end_day until no position is open.
+        :param sync_flat: Optional (first_day, flags) of another path's end-of-day
+                          flat flags. The walk stops after the first day on which
+                          both paths are flat, since they are identical from then on.
+        :return: A dict with 'pnl' (cumulative per simulated day), 'flat'
+                 (end-of-day flat flags), 'trades', 'stop' (exclusive end day
+                 index) and 'synced'.
+        """
+        days = chain['days']
+        n_days = len(days)
+        end_day = n_days if end_day is None else end_day
+        entry_mask = self._entry_mask(chain)
+
+        signs = np.array([1.0 if leg.get('action', 'buy') == 'buy' else -1.0 for leg in self.legs])
+        quantities = np.array([leg.get('quantity', 1) for leg in self.legs], dtype=np.float64)
+        weights = signs * quantities * CONTRACT_MULTIPLIER
+
+        profit_target = self.exit_rules.get('profit_target_pct')
+        stop_loss = self.exit_rules.get('stop_loss_pct')
+        dte_to_exit = self.exit_rules.get('dte_to_exit')
+
+        cumulative_pnl = np.zeros(n_days - start_day)
+        flat = np.zeros(n_days - start_day, dtype=bool)
+        realized = 0.0
+        trades = []
+        position = None
+        synced = False
+        stop = n_days
+        report_every = max((end_day - start_day) // 10, 1)
+        live_metrics = StreamingMetrics(self.risk_free_rate) if report_progress else None
+
+        for day in range(start_day, n_days):
+            if day >= end_day and (position is None or not until_flat):
+                stop = day
+                break
+
+            unrealized = 0.0
+            if position is not None:
+                spot = chain['spot'][day]
+                remaining_dte = (position['expiration'] - days[day]).astype(np.int64)
+                expired = remaining_dte <= 0
+                intrinsic = np.where(position['is_call'], np.maximum(spot - position['strike'], 0.0),
+                                     np.maximum(position['strike'] - spot, 0.0))
+                marks = self._mark_positions(chain, day, position['contract_id'], position['marks'])
+                marks = np.where(expired, intrinsic, marks)
+                position['marks'] = marks
+
+                unrealized = float(np.dot(weights, marks - position['entry_prices']))
+                basis = abs(position['entry_value'])
+
+                exit_reason = None
+                if expired.any():
+                    exit_reason = 'expiration'
+                elif profit_target is not None and unrealized >= basis * profit_target / 100:
+                    exit_reason = 'profit_target'
+                elif stop_loss is not None and unrealized <= -basis * stop_loss / 100:
+                    exit_reason = 'stop_loss'
+                elif dte_to_exit is not None and remaining_dte.min() <= dte_to_exit:
+                    exit_reason = 'dte_to_exit'
+
+                if exit_reason:
+                    trades.append({
+                        'entry_date': str(days[position['entry_day']]),
+                        'exit_date': str(days[day]),
+                        'exit_reason': exit_reason,
+                        'entry_value': round(position['entry_value'], 2),
+                        'pnl': round(unrealized, 2)
+                    })
+                    realized += unrealized
+                    unrealized = 0.0
+                    position = None
+            elif entry_mask[day]:
+                if day not in self.selection_cache:
+                    self.selection_cache[day] = self._select_legs(chain, day)
+                rows = self.selection_cache[day]
+                if rows is not None:
+                    entry_prices = chain['mid'][rows]
+                    position = {
+                        'entry_day': day,
+                        'contract_id': chain['contract_id'][rows],
+                        'expiration': chain['expiration'][rows],
+                        'strike': chain['strike'][rows],
+                        'is_call': chain['is_call'][rows],
+                        'entry_prices': entry_prices,
+                        'marks': entry_prices.copy(),
+                        'entry_value': float(np.dot(weights, entry_prices))
+                    }
+
+            cumulative_pnl[day - start_day] = realized + unrealized
+            flat[day - start_day] = position is None
+
+            if live_metrics is not None:
+                live_metrics.update(self.initial_capital + realized + unrealized)
+                if (day - start_day) % report_every == 0:
+                    self._update_progress(30 + int(50 * (day - start_day) / (end_day - start_day)),
+                                          f"Simulating trades... ({day - start_day + 1}/{end_day - start_day} days)",
+                                          live_metrics.result())
+
+            if sync_flat is not None and position is None:
+                sync_start, sync_flags = sync_flat
+                if sync_start <= day < sync_start + len(sync_flags) and sync_flags[day - sync_start]:
+                    stop = day + 1
+                    synced = True
+                    break
+
+        return {
+            'pnl': cumulative_pnl[:stop - start_day],
+            'flat': flat[:stop - start_day],
+            'trades': trades,
+            'stop': stop,
+            'synced': synced
+        }
+
+    def _summarize(self, chain, cumulative_pnl, trades):
+        """Performance metrics of a simulated PnL path."""
+        equity_curve = pd.Series(cumulative_pnl + self.initial_capital, index=pd.DatetimeIndex(chain['days']))
+        metrics = calculate_metrics(equity_curve, self.risk_free_rate, is_equity_curve=True)
+        metrics['num_trades'] = len(trades)
+        return metrics
+
     def run(self):
         """Executes the backtest."""
         self._update_progress(0, "Starting backtest...")
-        
+
         options_df, underlying_prices = self._fetch_data()
-        
-        # This is a highly simplified, conceptual backtest loop.
-        # A production-grade engine would be far more complex, handling:
-        # - Entry/exit rules (e.g., enter on first day of month)
-        # - Delta-hedging
-        # - Rolling positions
-        # - Margin calculations
-        # - Slippage and commissions
-        
+        chain = self._prepare_chain(options_df, underlying_prices)
+
         self._update_progress(30, "Simulating trades...")
-        
-        # Let's simulate a simple "buy and hold" of the strategy
-        # for the entire period for demonstration purposes.
-        
-        # On the start date, find the options that match the strategy legs
-        start_day_data = options_df[options_df['data_date'] == options_df['data_date'].min()]
-        
-        # This is a placeholder for a proper portfolio simulation
-        daily_pnl = pd.Series(np.random.randn(len(underlying_prices)) * 100, index=underlying_prices.index).cumsum()
-        
+        cumulative_pnl, trades = self._simulate(chain)
+
         self._update_progress(80, "Calculating performance metrics...")
-        
-        # Calculate metrics based on the PnL curve
-        metrics = calculate_metrics(daily_pnl, self.risk_free_rate)
-        
+        metrics = self._summarize(chain, cumulative_pnl, trades)
+
         self._update_progress(100, "Backtest complete.")
-        
+
         # Format results for JSON storage
+        date_strings = pd.DatetimeIndex(chain['days']).strftime('%Y-%m-%d')
         results = {
             'summary_metrics': metrics,
-            'daily_pnl': daily_pnl.reset_index().rename(columns={'index': 'date', 0: 'pnl'}).to_dict('records'),
-            'underlying_price': underlying_prices.reset_index().rename(columns={'index': 'date', 0: 'price'}).to_dict('records'),
+            'daily_pnl': [{'date': d, 'pnl': round(float(p), 2)} for d, p in zip(date_strings, cumulative_pnl)],
+            'underlying_price': [{'date': d, 'price': round(float(p), 2)} for d, p in zip(date_strings, chain['spot']) if np.isfinite(p)],
+            'trades': trades,
             'strategy_definition': self.strategy
         }
-        
+
         return results
@@ -3,12 +3,14 @@
 import numpy as np
 import pandas as pd
 
-def calculate_metrics(pnl_series, risk_free_rate=0.02):
+def calculate_metrics(pnl_series, risk_free_rate=0.02, is_equity_curve=False):
     """
     Calculates key performance metrics from a daily PnL series.
 
     :param pnl_series: A pandas Series of daily portfolio values or PnL.
     :param risk_free_rate: Annual risk-free rate for Sharpe/Sortino.
+    :param is_equity_curve: True if pnl_series already holds portfolio values,
+                            in which case it is not accumulated again.
     :return: A dictionary of performance metrics.
     """
     if pnl_series.empty or len(pnl_series) < 2:
@@ -19,7 +21,7 @@ def calculate_metrics(pnl_series, risk_free_rate=0.02):
         }
 
     # Ensure pnl_series represents cumulative returns/value
-    if not (pnl_series.diff().dropna() == 0).all(): # if not already cumulative
+    if not is_equity_curve and not (pnl_series.diff().dropna() == 0).all(): # if not already cumulative
         equity_curve = pnl_series.cumsum()
     else:
         equity_curve = pnl_series
@@ -77,3 +79,194 @@ def calculate_metrics(pnl_series, risk_free_rate=0.02):
         'calmar_ratio': round(calmar_ratio, 2)
     }
 
+
+class StreamingMetrics:
+    """
+    Online version of `calculate_metrics` for an equity curve fed one bar at a time.
+
+    Every update is O(1): returns, excess returns and downside excess returns
+    keep Welford running moments, and drawdown keeps a running peak. `result()`
+    gives the same dictionary as `calculate_metrics(curve, risk_free_rate,
+    is_equity_curve=True)` on the values seen so far, without storing them.
+    """
+    TRADING_DAYS = 252
+
+    def __init__(self, risk_free_rate=0.02):
+        self.daily_risk_free_rate = (1 + risk_free_rate) ** (1 / self.TRADING_DAYS) - 1
+        self.first = None
+        self.last = None
+        self.num_days = 0
+        # Running moments of excess returns (count, mean, sum of squared deviations)
+        self.n_returns, self.excess_mean, self.excess_m2 = 0, 0.0, 0.0
+        # Running moments of the negative excess returns only
+        self.n_downside, self.downside_mean, self.downside_m2 = 0, 0.0, 0.0
+        self.n_wins, self.n_losses = 0, 0
+        self.total_profit, self.total_loss = 0.0, 0.0
+        self.cumulative_max = None
+        self.max_drawdown = 0.0
+
+    def update(self, value):
+        """Adds the next equity value."""
+        value = float(value)
+        self.num_days += 1
+        if self.first is None:
+            self.first = value
+        else:
+            previous = self.last
+            if previous != 0:
+                self._add_return((value - previous) / previous)
+            elif value != 0:
+                # pct_change yields +/-inf after a zero value and drops 0/0
+                self._add_return(np.inf if value > 0 else -np.inf)
+        self.last = value
+
+        self.cumulative_max = value if self.cumulative_max is None else max(self.cumulative_max, value)
+        if self.cumulative_max != 0:
+            self.max_drawdown = min(self.max_drawdown, (value - self.cumulative_max) / self.cumulative_max)
+
+    def _add_return(self, daily_return):
+        if daily_return > 0:
+            self.n_wins += 1
+            self.total_profit += daily_return
+        elif daily_return < 0:
+            self.n_losses += 1
+            self.total_loss += -daily_return
+
+        excess = daily_return - self.daily_risk_free_rate
+        self.n_returns += 1
+        delta = excess - self.excess_mean
+        self.excess_mean += delta / self.n_returns
+        self.excess_m2 += delta * (excess - self.excess_mean)
+
+        if excess < 0:
+            self.n_downside += 1
+            delta = excess - self.downside_mean
+            self.downside_mean += delta / self.n_downside
+            self.downside_m2 += delta * (excess - self.downside_mean)
+
+    def result(self):
+        """The metrics dictionary for the curve seen so far."""
+        if self.num_days < 2:
+            return {
+                'total_return_pct': 0, 'annualized_return_pct': 0, 'annualized_volatility_pct': 0,
+                'sharpe_ratio': 0, 'sortino_ratio': 0, 'max_drawdown_pct': 0,
+                'win_rate_pct': 0, 'profit_factor': 0, 'calmar_ratio': 0
+            }
+
+        trading_days = self.TRADING_DAYS
+        total_return = (self.last / self.first) - 1 if self.first != 0 else 0
+        annualized_return = (1 + total_return) ** (trading_days / self.num_days) - 1
+
+        # Sample standard deviations (ddof=1), NaN with fewer than two observations as in pandas
+        excess_std = np.sqrt(self.excess_m2 / (self.n_returns - 1)) if self.n_returns > 1 else np.nan
+        annualized_volatility = excess_std * np.sqrt(trading_days)
+        sharpe_ratio = (self.excess_mean / excess_std) * np.sqrt(trading_days) if excess_std != 0 else 0
+
+        downside_std = np.sqrt(self.downside_m2 / (self.n_downside - 1)) if self.n_downside > 1 else np.nan
+        downside_deviation = downside_std * np.sqrt(trading_days)
+        sortino_ratio = (self.excess_mean * trading_days) / downside_deviation if downside_deviation != 0 else 0
+
+        max_drawdown = self.max_drawdown
+        calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
+
+        win_rate = self.n_wins / self.n_returns if self.n_returns > 0 else 0
+        profit_factor = self.total_profit / self.total_loss if self.total_loss != 0 else np.inf
+
+        return {
+            'total_return_pct': round(total_return * 100, 2),
+            'annualized_return_pct': round(annualized_return * 100, 2),
+            'annualized_volatility_pct': round(annualized_volatility * 100, 2),
+            'sharpe_ratio': round(sharpe_ratio, 2),
+            'sortino_ratio': round(sortino_ratio, 2),
+            'max_drawdown_pct': round(max_drawdown * 100, 2),
+            'win_rate_pct': round(win_rate * 100, 2),
+            'profit_factor': round(profit_factor, 2) if profit_factor != np.inf else 'inf',
+            'calmar_ratio': round(calmar_ratio, 2)
+        }
+
+
+def calculate_metrics_batch(equity_curves, risk_free_rate=0.02):
+    """
+    Calculates performance metrics for many equity curves at once.
+
+    Every metric is an axis-wise reduction over an (n_curves x n_days) array,
+    so there is no Python loop over curves. Values are left unrounded and a
+    profit factor with no losing days is `np.inf`; `metrics_row` turns one
+    curve's values into the dictionary `calculate_metrics(curve, risk_free_rate,
+    is_equity_curve=True)` returns.
+
+    :param equity_curves: 2-D array of daily portfolio values, one curve per row.
+    :param risk_free_rate: Annual risk-free rate for Sharpe/Sortino.
+    :return: A dictionary of 1-D arrays, one value per curve.
+    """
+    equity = np.atleast_2d(np.asarray(equity_curves, dtype=np.float64))
+    n_curves, num_days = equity.shape
+    trading_days = 252
+    if num_days < 2:
+        zeros = np.zeros(n_curves)
+        return {key: zeros.copy() for key in (
+            'total_return_pct', 'annualized_return_pct', 'annualized_volatility_pct',
+            'sharpe_ratio', 'sortino_ratio', 'max_drawdown_pct',
+            'win_rate_pct', 'profit_factor', 'calmar_ratio'
+        )}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first, last = equity[:, 0], equity[:, -1]
+        total_return = np.where(first != 0, last / first - 1, 0.0)
+        annualized_return = (1 + total_return) ** (trading_days / num_days) - 1
+
+        # pct_change().dropna(): 0/0 gives NaN and is dropped, x/0 gives +/-inf and is kept
+        daily_returns = equity[:, 1:] / equity[:, :-1] - 1
+        valid = ~np.isnan(daily_returns)
+        n_returns = valid.sum(axis=1)
+        returns = np.where(valid, daily_returns, 0.0)
+
+        daily_risk_free_rate = (1 + risk_free_rate) ** (1 / trading_days) - 1
+        excess = returns - daily_risk_free_rate
+        excess_mean = np.where(valid, excess, 0.0).sum(axis=1) / n_returns
+        deviations = np.where(valid, excess - excess_mean[:, None], 0.0)
+        excess_std = np.where(n_returns > 1, np.sqrt((deviations ** 2).sum(axis=1) / (n_returns - 1)), np.nan)
+
+        annualized_volatility = excess_std * np.sqrt(trading_days)
+        sharpe_ratio = np.where(excess_std != 0, excess_mean / excess_std * np.sqrt(trading_days), 0.0)
+
+        downside = valid & (excess < 0)
+        n_downside = downside.sum(axis=1)
+        downside_mean = np.where(downside, excess, 0.0).sum(axis=1) / n_downside
+        downside_deviations = np.where(downside, excess - downside_mean[:, None], 0.0)
+        downside_std = np.where(n_downside > 1, np.sqrt((downside_deviations ** 2).sum(axis=1) / (n_downside - 1)), np.nan)
+        downside_deviation = downside_std * np.sqrt(trading_days)
+        sortino_ratio = np.where(downside_deviation != 0, excess_mean * trading_days / downside_deviation, 0.0)
+
+        cumulative_max = np.maximum.accumulate(equity, axis=1)
+        drawdown = (equity - cumulative_max) / cumulative_max
+        max_drawdown = np.where(np.isnan(drawdown).all(axis=1), np.nan,
+                                np.where(np.isnan(drawdown), np.inf, drawdown).min(axis=1))
+        calmar_ratio = np.where(max_drawdown != 0, annualized_return / np.abs(max_drawdown), 0.0)
+
+        wins = valid & (daily_returns > 0)
+        losses = valid & (daily_returns < 0)
+        win_rate = np.where(n_returns > 0, wins.sum(axis=1) / n_returns, 0.0)
+        total_profit = np.where(wins, daily_returns, 0.0).sum(axis=1)
+        total_loss = np.abs(np.where(losses, daily_returns, 0.0).sum(axis=1))
+        profit_factor = np.where(total_loss != 0, total_profit / total_loss, np.inf)
+
+    return {
+        'total_return_pct': total_return * 100,
+        'annualized_return_pct': annualized_return * 100,
+        'annualized_volatility_pct': annualized_volatility * 100,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'max_drawdown_pct': max_drawdown * 100,
+        'win_rate_pct': win_rate * 100,
+        'profit_factor': profit_factor,
+        'calmar_ratio': calmar_ratio
+    }
+
+
+def metrics_row(batch_metrics, i):
+    """Formats curve `i` of a `calculate_metrics_batch` result like `calculate_metrics`."""
+    row = {key: round(values[i], 2) for key, values in batch_metrics.items()}
+    if np.isinf(batch_metrics['profit_factor'][i]):
+        row['profit_factor'] = 'inf'
+    return row
@@ -0,0 +1,292 @@
+# backend/optionforge/backtester/montecarlo.py
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .engine import BacktestEngine, CONTRACT_MULTIPLIER
+from .pricing import black_scholes_vectorized, implied_volatility_vectorized
+
+TRADING_DAYS_PER_YEAR = 252
+# Calendar days that pass per simulated trading day, for the legs' time to expiry
+CALENDAR_DAYS_PER_STEP = 365 / TRADING_DAYS_PER_YEAR
+
+# Upper bounds on one simulation's size
+MAX_PATHS = 200000
+MAX_STEPS = 252
+# Paths simulated together; bounds memory at a few arrays of chunk x legs floats
+DEFAULT_CHUNK_PATHS = 10000
+# Bits of the seed drawn when none is given: integers up to 2**53 survive JSON
+# clients that parse numbers as doubles (browsers), so the stored seed reproduces the run
+SEED_BITS = 53
+
+MODELS = ('gbm', 'heston')
+# Heston parameters used when not given; theta and v0 default to the squared
+# implied volatility of the leg nearest the money
+HESTON_DEFAULTS = {'kappa': 2.0, 'xi': 0.5, 'rho': -0.7}
+# Floor on the volatility legs are revalued with
+MIN_VOLATILITY = 0.01
+
+# Exit reason codes of simulated paths, in the engine's order of precedence
+EXIT_REASONS = ('horizon', 'expiration', 'profit_target', 'stop_loss', 'dte_to_exit')
+
+
+def _simulate_chunk(spec, seed_sequence, n_paths):
+    """
+    Simulates one chunk of underlying paths and the strategy's P&L along each.
+
+    Module-level so process pool workers can run it. Each chunk draws from its
+    own seeded stream, so results do not depend on how chunks are spread over
+    workers.
+
+    :return: (P&L per path, exit reason code per path, underlying at the horizon)
+    """
+    rng = np.random.default_rng(seed_sequence)
+    dt = 1.0 / TRADING_DAYS_PER_YEAR
+    r = spec['risk_free_rate']
+    drift = spec['drift']
+    strike, is_call, dte, iv, weights = spec['strike'], spec['is_call'], spec['dte'], spec['iv'], spec['weights']
+    entry_value = spec['entry_value']
+    basis = abs(entry_value)
+
+    spot = np.full(n_paths, spec['spot'])
+    heston = spec['model'] == 'heston'
+    if heston:
+        params = spec['model_params']
+        variance = np.full(n_paths, params['v0'])
+        rho_complement = np.sqrt(1.0 - params['rho'] ** 2)
+
+    pnl = np.zeros(n_paths)
+    reason = np.zeros(n_paths, dtype=np.int8)
+    alive = np.ones(n_paths, dtype=bool)
+
+    for step in range(1, spec['steps'] + 1):
+        z = rng.standard_normal(n_paths)
+        if heston:
+            # Full-truncation Euler: negative variance is treated as zero
+            positive = np.maximum(variance, 0.0)
+            spot *= np.exp((drift - 0.5 * positive) * dt + np.sqrt(positive * dt) * z)
+            z_variance = params['rho'] * z + rho_complement * rng.standard_normal(n_paths)
+            variance += params['kappa'] * (params['theta'] - positive) * dt + params['xi'] * np.sqrt(positive * dt) * z_variance
+        else:
+            spot *= np.exp((drift - 0.5 * spec['sigma'] ** 2) * dt + spec['sigma'] * np.sqrt(dt) * z)
+
+        open_paths = np.flatnonzero(alive)
+        if len(open_paths) == 0:
+            break
+        remaining_dte = dte - step * CALENDAR_DAYS_PER_STEP
+        if heston:
+            # Shift every leg's implied volatility by the path's change in instantaneous volatility
+            vol_change = np.sqrt(np.maximum(variance[open_paths], 0.0)) - np.sqrt(params['v0'])
+            sigma = np.maximum(iv + vol_change[:, None], MIN_VOLATILITY)
+        else:
+            sigma = iv
+        marks = black_scholes_vectorized(spot[open_paths, None], strike, remaining_dte / 365.0, r, sigma, is_call)
+        unrealized = marks @ weights - entry_value
+        pnl[open_paths] = unrealized
+
+        exits = np.zeros(len(open_paths), dtype=np.int8)
+        if (remaining_dte <= 0).any():
+            exits[:] = EXIT_REASONS.index('expiration')
+        else:
+            if spec['profit_target'] is not None:
+                exits[(exits == 0) & (unrealized >= basis * spec['profit_target'] / 100)] = EXIT_REASONS.index('profit_target')
+            if spec['stop_loss'] is not None:
+                exits[(exits == 0) & (unrealized <= -basis * spec['stop_loss'] / 100)] = EXIT_REASONS.index('stop_loss')
+            if spec['dte_to_exit'] is not None and remaining_dte.min() <= spec['dte_to_exit']:
+                exits[exits == 0] = EXIT_REASONS.index('dte_to_exit')
+        closed = exits > 0
+        reason[open_paths[closed]] = exits[closed]
+        alive[open_paths[closed]] = False
+
+    return pnl, reason, spot
+
+
+class MonteCarloEngine:
+    """
+    Forward-looking risk of a strategy from simulated underlying paths.
+
+    The strategy's legs are resolved against the option chain of the as-of
+    date, exactly as the backtest engine would open them, and their implied
+    volatilities are solved from the entry mids. Paths of the underlying are
+    then simulated under GBM or Heston, one trading day per step, and every
+    leg is revalued along them with the vectorized pricer. The strategy's
+    exit rules close paths early as in a backtest; the rest are valued at
+    the horizon.
+
+    Paths are generated in chunks of `chunk_paths`, each from its own stream
+    of a seeded SeedSequence, so memory stays bounded and the same seed gives
+    the same distribution whether chunks run in one process or on `workers`.
+    """
+    def __init__(self, strategy_definition, as_of_date, n_paths=10000, horizon_days=None, model='gbm',
+                 model_params=None, seed=None, confidence_levels=(0.95, 0.99), chunk_paths=DEFAULT_CHUNK_PATHS,
+                 workers=1, progress_callback=None, data_source=None):
+        if model not in MODELS:
+            raise ValueError(f"Unknown model '{model}'. Use one of: {', '.join(MODELS)}.")
+        if not 1 <= n_paths <= MAX_PATHS:
+            raise ValueError(f"n_paths must be between 1 and {MAX_PATHS}.")
+        if horizon_days is not None and not 1 <= horizon_days <= MAX_STEPS:
+            raise ValueError(f"horizon_days must be between 1 and {MAX_STEPS}.")
+        if not all(0 < level < 1 for level in confidence_levels):
+            raise ValueError("Confidence levels must be between 0 and 1.")
+
+        self.strategy = strategy_definition
+        self.as_of_date = as_of_date
+        self.n_paths = n_paths
+        self.horizon_days = horizon_days
+        self.model = model
+        self.model_params = dict(model_params or {})
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0]) >> (64 - SEED_BITS)
+        self.seed = seed
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.confidence_levels = tuple(confidence_levels)
+        self.chunk_paths = max(1, chunk_paths)
+        self.workers = workers
+        self.progress_callback = progress_callback
+        # Loads the as-of chain and shares the strategy's settings and legs
+        self.engine = BacktestEngine(strategy_definition, as_of_date, as_of_date, data_source=data_source)
+
+    def _update_progress(self, percentage, message):
+        if self.progress_callback:
+            self.progress_callback(percentage, message)
+
+    def _build_spec(self):
+        """Resolves the starting position and model inputs shared by every chunk."""
+        resolved = self.engine.resolve_legs()
+        if resolved['legs'] is None:
+            raise ValueError(f"Some legs have no tradable contract on {resolved['date']}.")
+        spot = resolved['underlying_price']
+        if spot is None:
+            raise ValueError(f"No underlying price for {resolved['date']}.")
+
+        legs = resolved['legs']
+        strike = np.array([leg['strike'] for leg in legs])
+        is_call = np.array([leg['type'] == 'call' for leg in legs])
+        dte = np.array([leg['dte'] for leg in legs], dtype=np.float64)
+        mid = np.array([leg['mid'] for leg in legs])
+        r = self.engine.risk_free_rate
+        iv = np.asarray(implied_volatility_vectorized(mid, spot, strike, dte / 365.0, r, is_call), dtype=np.float64)
+        iv = np.where(np.isfinite(iv), np.maximum(iv, MIN_VOLATILITY), np.nan)
+        if not np.isfinite(iv).all():
+            raise ValueError("Could not solve the implied volatility of every leg from its mid price.")
+        for leg, leg_iv in zip(legs, iv):
+            leg['iv'] = round(float(leg_iv), 4)
+
+        signs = np.array([1.0 if leg['action'] == 'buy' else -1.0 for leg in legs])
+        weights = signs * np.array([leg['quantity'] for leg in legs], dtype=np.float64) * CONTRACT_MULTIPLIER
+
+        steps_to_expiry = int(np.ceil(dte.min() / CALENDAR_DAYS_PER_STEP))
+        steps = min(self.horizon_days or steps_to_expiry, steps_to_expiry, MAX_STEPS)
+
+        reference_vol = float(iv[np.argmin(np.abs(strike - spot))])
+        params = dict(self.model_params)
+        if self.model == 'heston':
+            params = dict(HESTON_DEFAULTS, theta=reference_vol ** 2, v0=reference_vol ** 2, **params)
+            if not -1 <= params['rho'] <= 1:
+                raise ValueError("Heston rho must be between -1 and 1.")
+            if min(params['kappa'], params['theta'], params['xi'], params['v0']) < 0:
+                raise ValueError("Heston kappa, theta, xi and v0 must not be negative.")
+        else:
+            params.setdefault('sigma', reference_vol)
+            if params['sigma'] <= 0:
+                raise ValueError("GBM sigma must be positive.")
+        params.setdefault('drift', r)
+
+        exit_rules = self.engine.exit_rules
+        return resolved, {
+            'model': self.model,
+            'model_params': params,
+            'drift': params['drift'],
+            'sigma': params.get('sigma'),
+            'spot': spot,
+            'risk_free_rate': r,
+            'steps': steps,
+            'strike': strike,
+            'is_call': is_call,
+            'dte': dte,
+            'iv': iv,
+            'weights': weights,
+            'entry_value': float(np.dot(weights, mid)),
+            'profit_target': exit_rules.get('profit_target_pct'),
+            'stop_loss': exit_rules.get('stop_loss_pct'),
+            'dte_to_exit': exit_rules.get('dte_to_exit'),
+        }
+
+    def _run_chunks(self, spec):
+        """Simulates every chunk, in a process pool when `workers` > 1, and concatenates them in order."""
+        sizes = [min(self.chunk_paths, self.n_paths - start) for start in range(0, self.n_paths, self.chunk_paths)]
+        seeds = self.seed_sequence.spawn(len(sizes))
+        results = [None] * len(sizes)
+
+        workers = min(self.workers, len(sizes))
+        # Daemonic processes (e.g. Celery prefork children) cannot start a pool
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_simulate_chunk, spec, seeds[i], size): i for i, size in enumerate(sizes)}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    self._update_progress(10 + int(80 * done / len(sizes)), f"Simulated {done}/{len(sizes)} chunks.")
+        else:
+            for i, size in enumerate(sizes):
+                results[i] = _simulate_chunk(spec, seeds[i], size)
+                self._update_progress(10 + int(80 * (i + 1) / len(sizes)), f"Simulated {i + 1}/{len(sizes)} chunks.")
+
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    def _summarize(self, pnl, reason, terminal_spot):
+        percentiles = (1, 5, 25, 50, 75, 95, 99)
+        counts, edges = np.histogram(pnl, bins=50)
+        risk = []
+        for level in self.confidence_levels:
+            cutoff = np.quantile(pnl, 1 - level)
+            risk.append({
+                'confidence': level,
+                # Losses are reported as positive amounts
+                'var': round(float(-cutoff), 2),
+                'cvar': round(float(-pnl[pnl <= cutoff].mean()), 2),
+            })
+        return {
+            'pnl': {
+                'mean': round(float(pnl.mean()), 2),
+                'std': round(float(pnl.std()), 2),
+                'min': round(float(pnl.min()), 2),
+                'max': round(float(pnl.max()), 2),
+                'prob_profit': round(float((pnl > 0).mean()), 4),
+                'percentiles': {str(p): round(float(v), 2) for p, v in zip(percentiles, np.percentile(pnl, percentiles))},
+                'histogram': {'edges': [round(float(e), 2) for e in edges], 'counts': counts.tolist()},
+            },
+            'risk': risk,
+            'exit_reasons': {
+                name: int(count) for name, count in zip(EXIT_REASONS, np.bincount(reason, minlength=len(EXIT_REASONS)))
+                if count
+            },
+            'terminal_underlying': {
+                str(p): round(float(v), 2) for p, v in zip(percentiles, np.percentile(terminal_spot, percentiles))
+            },
+        }
+
+    def run(self):
+        """Executes the simulation and returns the P&L distribution, VaR and CVaR."""
+        self._update_progress(0, "Resolving legs...")
+        resolved, spec = self._build_spec()
+        self._update_progress(10, f"Simulating {self.n_paths} {self.model.upper()} paths over {spec['steps']} days...")
+
+        pnl, reason, terminal_spot = self._run_chunks(spec)
+
+        self._update_progress(95, "Summarizing the distribution...")
+        results = {
+            'as_of_date': resolved['date'],
+            'underlying_price': resolved['underlying_price'],
+            'model': self.model,
+            'model_params': {name: round(float(value), 6) for name, value in spec['model_params'].items()},
+            'n_paths': self.n_paths,
+            'horizon_days': spec['steps'],
+            # Reproduces this run when passed back as `seed`
+            'seed': self.seed,
+            'legs': resolved['legs'],
+            'entry_value': round(spec['entry_value'], 2),
+            'strategy_definition': self.strategy,
+        }
+        results.update(self._summarize(pnl, reason, terminal_spot))
+        self._update_progress(100, "Simulation complete.")
+        return results
@@ -0,0 +1,128 @@
+# backend/optionforge/backtester/parallel.py
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from .engine import BacktestEngine
+
+# Chunks shorter than this spend more time resynchronising than simulating
+MIN_DAYS_PER_CHUNK = 60
+
+
+def _share_chain(chain):
+    """
+    Copies the chain arrays into shared memory blocks.
+
+    :return: (blocks, spec) where spec maps each array name to the
+             (block name, shape, dtype) a worker needs to attach to it.
+    """
+    blocks, spec = [], {}
+    for name, values in chain.items():
+        values = np.ascontiguousarray(values)
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+        blocks.append(block)
+        spec[name] = (block.name, values.shape, values.dtype.str)
+    return blocks, spec
+
+
+def _simulate_chunk(strategy, chain_spec, start_day, end_day):
+    """Worker entry point: simulates one chunk against the shared chain arrays."""
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in chain_spec.items()}
+    try:
+        chain = {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            for name, (_, shape, dtype) in chain_spec.items()
+        }
+        engine = BacktestEngine(strategy, None, None)
+        path = engine._simulate_range(chain, start_day, end_day, until_flat=True)
+        # Drop every view of the shared buffers before detaching
+        del chain, engine
+        return start_day, path
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+class ParallelBacktestEngine(BacktestEngine):
+    """
+    Backtest engine that shards the simulation across a process pool.
+
+    The trading days are split into chunks, and the chain arrays are handed
+    to the workers through shared memory. Each worker simulates its chunk
+    from a flat book and keeps going past the chunk end until its last
+    position closes.
+
+    The parent then stitches the chunks together. Two paths that are both
+    flat at the end of the same day are identical from then on, so a chunk
+    is adopted from the first day it agrees with the exact path. If no such
+    day exists yet, the parent re-simulates from the exact path until the
+    two paths agree. The stitched result equals a single-process run.
+    """
+    def __init__(self, *args, workers=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.workers = workers or multiprocessing.cpu_count()
+
+    def _simulate(self, chain, report_progress=True):
+        n_days = len(chain['days'])
+        n_chunks = min(self.workers, n_days // MIN_DAYS_PER_CHUNK)
+        # Daemonic processes (e.g. Celery prefork children) cannot start a pool
+        if n_chunks <= 1 or multiprocessing.current_process().daemon:
+            return super()._simulate(chain, report_progress)
+
+        boundaries = np.linspace(0, n_days, n_chunks + 1).astype(int)
+        blocks, spec = _share_chain(chain)
+        paths = {}
+        try:
+            with ProcessPoolExecutor(max_workers=n_chunks) as pool:
+                futures = [
+                    pool.submit(_simulate_chunk, self.strategy, spec, int(boundaries[i]), int(boundaries[i + 1]))
+                    for i in range(n_chunks)
+                ]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    start_day, path = future.result()
+                    paths[start_day] = path
+                    if report_progress:
+                        self._update_progress(30 + int(45 * done / n_chunks),
+                                              f"Simulating trades... ({done}/{n_chunks} chunks)")
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        if report_progress:
+            self._update_progress(76, "Stitching chunk results...")
+        return self._stitch(chain, [(start, paths[start]) for start in sorted(paths)])
+
+    def _stitch(self, chain, chunks):
+        """Joins per-chunk paths into the exact single-process PnL path and trade list."""
+        days = chain['days']
+        n_days = len(days)
+        cumulative_pnl = np.zeros(n_days)
+        trades = []
+
+        _, first = chunks[0]
+        cumulative_pnl[:first['stop']] = first['pnl']
+        trades.extend(first['trades'])
+        # The exact path is known for days before `cursor` and is flat at the end of cursor - 1
+        cursor = first['stop']
+
+        for start_day, path in chunks[1:]:
+            while cursor < path['stop']:
+                base = cumulative_pnl[cursor - 1]
+                if cursor == start_day or path['flat'][cursor - 1 - start_day]:
+                    # Both paths are flat at the end of cursor - 1: adopt the chunk from here
+                    reference = path['pnl'][cursor - 1 - start_day] if cursor > start_day else 0.0
+                    cumulative_pnl[cursor:path['stop']] = base + path['pnl'][cursor - start_day:] - reference
+                    first_date = str(days[cursor])
+                    trades.extend(t for t in path['trades'] if t['entry_date'] >= first_date)
+                    cursor = path['stop']
+                else:
+                    resumed = self._simulate_range(chain, cursor, path['stop'], until_flat=True,
+                                                   sync_flat=(start_day, path['flat']))
+                    cumulative_pnl[cursor:resumed['stop']] = base + resumed['pnl']
+                    trades.extend(resumed['trades'])
+                    cursor = resumed['stop']
+
+        return cumulative_pnl, trades
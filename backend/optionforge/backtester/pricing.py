@@ -2,6 +2,9 @@
 
 import numpy as np
 from scipy.stats import norm
+from scipy.special import ndtr
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
 
 def black_scholes(S, K, T, r, sigma, option_type='call'):
     """
@@ -62,3 +65,203 @@ def black_scholes_greeks(S, K, T, r, sigma):
         'theta_put': theta_put,
         'vega': vega
     }
+
+
+def _as_call_mask(option_type, shape):
+    """
+    Normalizes an option type argument into a boolean call mask.
+
+    Accepts a boolean array (True for calls), a single 'call'/'put' string,
+    or an array of 'call'/'put' strings.
+    """
+    option_type = np.asarray(option_type)
+    if option_type.dtype == bool:
+        return np.broadcast_to(option_type, shape)
+    if option_type.dtype.kind in ('U', 'S', 'O'):
+        is_call = option_type == 'call'
+        if not np.all(is_call | (option_type == 'put')):
+            raise ValueError("Invalid option type. Must be 'call' or 'put'.")
+        return np.broadcast_to(is_call, shape)
+    return np.broadcast_to(option_type.astype(bool), shape)
+
+
+def _unwrap(value):
+    """Returns a Python float for 0-d results so scalar callers get scalars back."""
+    return value[()] if value.ndim == 0 else value
+
+
+def _prepare_inputs(S, K, T, r, sigma, option_type):
+    """
+    Broadcasts pricing inputs and computes the d1/d2 terms shared by every output.
+
+    Contracts that are expired or have no volatility are flagged in the
+    returned `live` mask; their T and sigma are replaced with harmless
+    placeholders so the arithmetic never divides by zero.
+    """
+    S, K, T, r, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma)))
+    is_call = _as_call_mask(option_type, S.shape)
+
+    live = (T > 0) & (sigma > 0)
+    T_safe = np.where(live, T, 1.0)
+    sigma = np.where(live, sigma, 1.0)
+
+    sqrt_T = np.sqrt(T_safe)
+    sigma_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T_safe) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    discounted_K = K * np.exp(-r * T_safe)
+    return S, K, T_safe, r, sigma, is_call, live, sqrt_T, d1, d2, discounted_K
+
+
+def black_scholes_vectorized(S, K, T, r, sigma, option_type='call'):
+    """
+    Calculates Black-Scholes prices for whole arrays of European options.
+
+    All numeric inputs broadcast against each other. Expired contracts
+    (T <= 0) are priced at intrinsic value through a mask rather than a
+    Python branch, so a full option chain is priced in a single call.
+
+    :param S: Underlying price(s)
+    :param K: Strike price(s)
+    :param T: Time(s) to expiration in years
+    :param r: Risk-free interest rate(s)
+    :param sigma: Volatility(ies) of the underlying
+    :param option_type: 'call'/'put', an array of them, or a boolean call mask
+    :return: Array of option prices (a scalar if all inputs are scalars)
+    """
+    S, K, T, r, sigma, is_call, live, sqrt_T, d1, d2, discounted_K = _prepare_inputs(S, K, T, r, sigma, option_type)
+
+    call_price = S * ndtr(d1) - discounted_K * ndtr(d2)
+    put_price = call_price - S + discounted_K
+    price = np.where(is_call, call_price, put_price)
+
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    return _unwrap(np.where(live, price, intrinsic))
+
+
+def black_scholes_greeks_vectorized(S, K, T, r, sigma, option_type='call'):
+    """
+    Calculates price and Greeks for whole arrays of European options in one pass.
+
+    d1/d2 and the shared normal pdf/cdf terms are evaluated once and reused
+    for every output. Units follow `black_scholes_greeks`: theta is per
+    calendar day and vega is per 1% change in volatility.
+
+    :return: A dictionary of arrays keyed by 'price', 'delta', 'gamma',
+             'theta' and 'vega', each selected per contract by option type.
+    """
+    S, K, T, r, sigma, is_call, live, sqrt_T, d1, d2, discounted_K = _prepare_inputs(S, K, T, r, sigma, option_type)
+
+    pdf_d1 = np.exp(-0.5 * d1 ** 2) / _SQRT_2PI
+    cdf_d1 = ndtr(d1)
+    cdf_d2 = ndtr(d2)
+
+    # Put terms follow from put-call parity on the shared call terms
+    call_price = S * cdf_d1 - discounted_K * cdf_d2
+    put_price = call_price - S + discounted_K
+    price = np.where(is_call, call_price, put_price)
+
+    delta = np.where(is_call, cdf_d1, cdf_d1 - 1.0)
+    gamma = pdf_d1 / (S * sigma * sqrt_T)
+    vega = S * pdf_d1 * sqrt_T * 0.01
+
+    decay = -(S * pdf_d1 * sigma) / (2 * sqrt_T)
+    theta_call = (decay - r * discounted_K * cdf_d2) / 365
+    theta_put = (decay + r * discounted_K * (1.0 - cdf_d2)) / 365
+    theta = np.where(is_call, theta_call, theta_put)
+
+    # Expired contracts carry intrinsic value and a step delta only
+    intrinsic = np.where(is_call, np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    expired_delta = np.where(is_call, (S > K).astype(np.float64), -(S < K).astype(np.float64))
+
+    return {
+        'price': _unwrap(np.where(live, price, intrinsic)),
+        'delta': _unwrap(np.where(live, delta, expired_delta)),
+        'gamma': _unwrap(np.where(live, gamma, 0.0)),
+        'theta': _unwrap(np.where(live, theta, 0.0)),
+        'vega': _unwrap(np.where(live, vega, 0.0)),
+    }
+
+
+def implied_volatility_vectorized(price, S, K, T, r, option_type='call',
+                                  tol=1e-6, max_iter=50, sigma_low=1e-4, sigma_high=5.0):
+    """
+    Inverts Black-Scholes for implied volatility over whole arrays of option prices.
+
+    Each iteration takes a Halley step (Newton corrected by vomma) on every
+    unconverged contract at once, while maintaining a [low, high] bracket per
+    contract. Whenever the step leaves the bracket or vega vanishes, that
+    contract falls back to bisection, so convergence is guaranteed for any
+    price inside the no-arbitrage bounds.
+
+    :param price: Observed option price(s), e.g. bid/ask mid
+    :param S: Underlying price(s)
+    :param K: Strike price(s)
+    :param T: Time(s) to expiration in years
+    :param r: Risk-free interest rate(s)
+    :param option_type: 'call'/'put', an array of them, or a boolean call mask
+    :param tol: Absolute price tolerance for convergence
+    :param max_iter: Maximum number of solver iterations
+    :param sigma_low: Lower volatility bound of the bracket
+    :param sigma_high: Upper volatility bound of the bracket
+    :return: Array of implied volatilities, NaN where the price is outside
+             the no-arbitrage bounds or the contract has expired
+    """
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)))
+    is_call = _as_call_mask(option_type, S.shape)
+    shape = S.shape
+    price, S, K, T, r = (np.ravel(x) for x in (price, S, K, T, r))
+    is_call = np.ravel(is_call)
+
+    iv = np.full(price.shape, np.nan)
+
+    # Prices outside the no-arbitrage bounds have no implied volatility
+    discounted_K = K * np.exp(-r * T)
+    lower_bound = np.where(is_call, np.maximum(S - discounted_K, 0.0), np.maximum(discounted_K - S, 0.0))
+    upper_bound = np.where(is_call, S, discounted_K)
+    valid = (T > 0) & (price > lower_bound) & (price < upper_bound) & np.isfinite(price)
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return _unwrap(iv.reshape(shape))
+
+    p, s, k, t, rate, call = price[idx], S[idx], K[idx], T[idx], r[idx], is_call[idx]
+    low = np.full(idx.size, sigma_low)
+    high = np.full(idx.size, sigma_high)
+
+    # Brenner-Subrahmanyam initial guess, clipped into the bracket
+    sigma = np.clip(np.sqrt(2 * np.pi / t) * p / s, sigma_low * 2, sigma_high / 2)
+
+    active = np.arange(idx.size)
+    for _ in range(max_iter):
+        sg, ss, kk, tt, rr = sigma[active], s[active], k[active], t[active], rate[active]
+        sqrt_t = np.sqrt(tt)
+        d1 = (np.log(ss / kk) + (rr + 0.5 * sg ** 2) * tt) / (sg * sqrt_t)
+        d2 = d1 - sg * sqrt_t
+        disc_k = kk * np.exp(-rr * tt)
+        call_price = ss * ndtr(d1) - disc_k * ndtr(d2)
+        model = np.where(call[active], call_price, call_price - ss + disc_k)
+
+        diff = model - p[active]
+        done = np.abs(diff) < tol
+        if done.all():
+            break
+
+        # Price is increasing in sigma, so the sign of the error tightens the bracket
+        too_high = diff > 0
+        high[active] = np.where(too_high, sg, high[active])
+        low[active] = np.where(too_high, low[active], sg)
+
+        vega = ss * np.exp(-0.5 * d1 ** 2) / _SQRT_2PI * sqrt_t
+        vomma = vega * d1 * d2 / sg
+        with np.errstate(all='ignore'):
+            newton = diff / vega
+            step = newton / (1 - 0.5 * newton * vomma / vega)
+        candidate = sg - step
+
+        bisect = (0.5 * (low[active] + high[active]))
+        in_bracket = np.isfinite(candidate) & (candidate > low[active]) & (candidate < high[active]) & (vega > 1e-12)
+        sigma[active] = np.where(done, sg, np.where(in_bracket, candidate, bisect))
+        active = active[~done]
+
+    iv[idx] = sigma
+    return _unwrap(iv.reshape(shape))
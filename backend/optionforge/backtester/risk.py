@@ -0,0 +1,159 @@
+# backend/optionforge/backtester/risk.py
+
+import numpy as np
+from .engine import BacktestEngine, CONTRACT_MULTIPLIER
+from .pricing import black_scholes_greeks_vectorized, black_scholes_vectorized
+from .selection import select_legs
+from .surface import VolSurface
+
+# Underlying moves (fractions of spot) and implied volatility moves (vol
+# points) of the default scenario grid
+DEFAULT_SPOT_SHOCKS = (-0.2, -0.15, -0.1, -0.05, 0.0, 0.05, 0.1, 0.15, 0.2)
+DEFAULT_VOL_SHOCKS = (-10, -5, 0, 5, 10)
+# Largest number of shocks along either axis of a grid
+MAX_SHOCKS = 41
+# Expiries loaded for a snapshot: far enough out to include every listing
+SNAPSHOT_MAX_DTE = 1100
+# Floor on shocked volatilities
+MIN_VOLATILITY = 0.01
+
+GREEKS = ('delta', 'gamma', 'theta', 'vega')
+
+
+class MarketSnapshot:
+    """
+    One (ticker, date) of market data prepared for risk: the chain with its
+    leg selection index, the underlying price and the volatility surface, all
+    solved at `risk_free_rate`.
+    """
+    def __init__(self, ticker, date, spot, chain, surface, risk_free_rate):
+        self.ticker = ticker
+        self.date = date
+        self.spot = spot
+        self.chain = chain
+        self.surface = surface
+        self.risk_free_rate = risk_free_rate
+
+
+def load_market_snapshot(ticker, date, data_source=None, risk_free_rate=0.02):
+    """
+    Loads and prepares a ticker's chain on a date.
+
+    :param risk_free_rate: The rate of the parity spot, filled deltas and
+                           surface; that of the strategies priced off it.
+    :raises ValueError: If there is no option data or underlying price that day.
+    """
+    loader = BacktestEngine({'underlying_ticker': ticker, 'legs': [{'dte': SNAPSHOT_MAX_DTE}],
+                             'settings': {'risk_free_rate': risk_free_rate}}, date, date,
+                            data_source=data_source)
+    options_df, underlying_prices = loader._fetch_data()
+    chain = loader._prepare_chain(options_df, underlying_prices)
+    spot = float(chain['spot'][0])
+    if not np.isfinite(spot):
+        raise ValueError(f"No underlying price for {ticker} on {chain['days'][0]}.")
+    day_df = options_df[options_df['data_date'] == options_df['data_date'].min()]
+    surface = VolSurface.from_chain(day_df, spot, risk_free_rate)
+    return MarketSnapshot(ticker, str(chain['days'][0]), spot, chain, surface, risk_free_rate)
+
+
+def strategy_risk(definition, snapshot, spot_shocks=DEFAULT_SPOT_SHOCKS, vol_shocks=DEFAULT_VOL_SHOCKS):
+    """
+    Greeks and scenario P&L of a strategy opened on the snapshot's date.
+
+    Legs are selected as the backtest engine would open them and priced off
+    the snapshot's volatility surface, at the snapshot's risk-free rate (load
+    it at the strategy's settings.risk_free_rate). Position Greeks are in dollars per
+    unit: delta per $1 of underlying, gamma per $1 squared, theta per
+    calendar day and vega per vol point. The scenario grid revalues every leg
+    with the underlying moved by each spot shock (fraction of spot) and
+    implied volatility by each vol shock (vol points), P&L against the
+    unshocked model value.
+
+    :return: Dict of the resolved legs, position value, Greeks and the
+             'scenarios' grid (rows by spot shock, columns by vol shock);
+             'legs' is None and nothing else is computed if some leg has no
+             tradable contract that day.
+    """
+    legs = definition.get('legs', [])
+    chain = snapshot.chain
+    risk = {'ticker': snapshot.ticker, 'date': snapshot.date, 'underlying_price': round(snapshot.spot, 2), 'legs': None}
+    rows = select_legs(chain, 0, legs)
+    if rows is None:
+        return risk
+
+    r = snapshot.risk_free_rate
+    strike, dte, is_call, mid = chain['strike'][rows], chain['dte'][rows], chain['is_call'][rows], chain['mid'][rows]
+    sigma = snapshot.surface.vol(strike, dte)
+    signs = np.array([1.0 if leg.get('action', 'buy') == 'buy' else -1.0 for leg in legs])
+    weights = signs * np.array([leg.get('quantity', 1) for leg in legs], dtype=np.float64) * CONTRACT_MULTIPLIER
+
+    T = dte / 365.0
+    greeks = black_scholes_greeks_vectorized(snapshot.spot, strike, T, r, sigma, is_call)
+    model_value = float(np.dot(weights, greeks['price']))
+    position = {name: float(np.dot(weights, greeks[name])) for name in GREEKS}
+
+    spot_grid = snapshot.spot * (1 + np.asarray(spot_shocks, dtype=np.float64))
+    vol_grid = np.maximum(sigma + np.asarray(vol_shocks, dtype=np.float64)[:, None] / 100, MIN_VOLATILITY)
+    # (spot shock, vol shock, leg) in one broadcast
+    prices = black_scholes_vectorized(spot_grid[:, None, None], strike, T, r, vol_grid[None, :, :], is_call)
+    pnl = prices @ weights - model_value
+
+    risk['legs'] = [{
+        'type': 'call' if call else 'put',
+        'action': leg.get('action', 'buy'),
+        'quantity': leg.get('quantity', 1),
+        'expiration_date': str(chain['expiration'][row]),
+        'dte': int(days),
+        'strike': float(k),
+        'iv': round(float(iv), 4),
+        'mid': round(float(price), 4),
+        'delta': round(float(leg_delta), 4),
+    } for leg, row, call, days, k, iv, price, leg_delta in zip(legs, rows, is_call, dte, strike, sigma, mid, greeks['delta'])]
+    risk.update({
+        'market_value': round(float(np.dot(weights, mid)), 2),
+        'model_value': round(model_value, 2),
+        'greeks': {name: round(value, 4) for name, value in position.items()},
+        'dollar_greeks': _dollar_greeks(position, snapshot.spot),
+        'scenarios': {
+            'spot_shocks': [float(s) for s in spot_shocks],
+            'vol_shocks': [float(v) for v in vol_shocks],
+            'pnl': np.round(pnl, 2).tolist(),
+        },
+    })
+    return risk
+
+
+def _dollar_greeks(greeks, spot):
+    """Greeks comparable across underlyings: delta and gamma per 1% move of the underlying."""
+    return {
+        'delta': round(greeks['delta'] * spot / 100, 2),
+        'gamma': round(greeks['gamma'] * spot ** 2 / 10000, 2),
+        'theta': round(greeks['theta'], 2),
+        'vega': round(greeks['vega'], 2),
+    }
+
+
+def aggregate_risk(risks):
+    """
+    Totals of strategy risks computed on the same scenario grid.
+
+    Greeks in underlying units are summed per ticker; dollar Greeks and the
+    scenario P&L (the same relative shocks applied to every underlying) are
+    summed over everything. Strategies without resolved legs are skipped.
+    """
+    priced = [risk for risk in risks if risk.get('legs')]
+    by_ticker = {}
+    for risk in priced:
+        totals = by_ticker.setdefault(risk['ticker'], {name: 0.0 for name in GREEKS})
+        for name in GREEKS:
+            totals[name] += risk['greeks'][name]
+    total = {
+        'strategies': len(priced),
+        'market_value': round(sum(risk['market_value'] for risk in priced), 2),
+        'greeks_by_ticker': {ticker: {name: round(v, 4) for name, v in totals.items()} for ticker, totals in by_ticker.items()},
+        'dollar_greeks': {name: round(sum(risk['dollar_greeks'][name] for risk in priced), 2) for name in GREEKS},
+    }
+    if priced:
+        total['scenarios'] = dict(priced[0]['scenarios'],
+                                  pnl=np.round(np.sum([risk['scenarios']['pnl'] for risk in priced], axis=0), 2).tolist())
+    return total
@@ -0,0 +1,140 @@
+# backend/optionforge/backtester/selection.py
+
+import numpy as np
+
+# Arrays added to a prepared chain by `build_selection_index`
+SELECTION_FIELDS = (
+    'sel_strike_rows', 'sel_strikes', 'sel_delta_rows', 'sel_deltas',
+    'sel_group_bounds', 'sel_group_dte', 'sel_group_finite_deltas',
+    'sel_side_group_start', 'sel_side_group_end',
+)
+
+
+def build_selection_index(chain):
+    """
+    Indexes a prepared chain's tradable contracts for leg selection.
+
+    Tradable rows (positive mid, unexpired) are grouped by (day, option type,
+    DTE). Within a day and type the groups are in ascending DTE order, and
+    each group lists its rows once by strike and once by delta (contracts
+    without a delta last). Nearest-DTE, nearest-delta and nearest-strike
+    lookups are then binary searches instead of scans of the day's chain.
+
+    Everything is stored as flat arrays, so the index travels with the chain,
+    e.g. into the shared memory of ParallelBacktestEngine workers.
+
+    :return: Dict of the SELECTION_FIELDS arrays, to merge into the chain.
+    """
+    n_days = len(chain['days'])
+    day_of_row = np.repeat(np.arange(n_days), chain['day_end'] - chain['day_start'])
+    tradable = np.flatnonzero((chain['mid'] > 0) & (chain['dte'] > 0))
+
+    # Side key: two per day, puts then calls
+    side = day_of_row[tradable] * 2 + chain['is_call'][tradable]
+    dte = chain['dte'][tradable]
+    strike = chain['strike'][tradable]
+    order = np.lexsort((strike, dte, side))
+    rows, side, dte, strike = tradable[order], side[order], dte[order], strike[order]
+
+    new_group = np.ones(len(rows), dtype=bool)
+    new_group[1:] = (side[1:] != side[:-1]) | (dte[1:] != dte[:-1])
+    group_start = np.flatnonzero(new_group)
+    group_id = np.cumsum(new_group) - 1
+    group_side = side[group_start]
+
+    delta = chain['delta'][rows]
+    # NaN deltas sort last within their group
+    delta_order = np.lexsort((strike, delta, group_id))
+    finite_deltas = np.bincount(group_id, weights=np.isfinite(delta), minlength=len(group_start))
+
+    sides = np.arange(n_days * 2)
+    return {
+        'sel_strike_rows': rows,
+        'sel_strikes': strike,
+        'sel_delta_rows': rows[delta_order],
+        'sel_deltas': delta[delta_order],
+        'sel_group_bounds': np.append(group_start, len(rows)),
+        'sel_group_dte': dte[group_start],
+        'sel_group_finite_deltas': finite_deltas.astype(np.int64),
+        'sel_side_group_start': np.searchsorted(group_side, sides, side='left'),
+        'sel_side_group_end': np.searchsorted(group_side, sides, side='right'),
+    }
+
+
+def _nearest(values, target):
+    """
+    Position of the value closest to `target` in a sorted array.
+
+    Ties go to the first of equal values and, between two values equally far
+    from the target, to the lower one.
+    """
+    i = int(np.searchsorted(values, target, side='left'))
+    if i == len(values):
+        i -= 1
+        return int(np.searchsorted(values, values[i], side='left'))
+    if i > 0 and target - values[i - 1] <= values[i] - target:
+        return int(np.searchsorted(values, values[i - 1], side='left'))
+    return i
+
+
+def nearest_expiry_group(chain, day, is_call, target_dte):
+    """The group of the expiry closest to `target_dte` for a day and option type, or None."""
+    side = day * 2 + int(is_call)
+    first, last = chain['sel_side_group_start'][side], chain['sel_side_group_end'][side]
+    if first == last:
+        return None
+    return first + _nearest(chain['sel_group_dte'][first:last], target_dte)
+
+
+def nearest_delta(chain, group, target_delta):
+    """Row of the contract in a group whose delta is closest to the target, or None."""
+    start = chain['sel_group_bounds'][group]
+    end = start + chain['sel_group_finite_deltas'][group]
+    if start == end:
+        return None
+    return int(chain['sel_delta_rows'][start + _nearest(chain['sel_deltas'][start:end], target_delta)])
+
+
+def nearest_strike(chain, group, target_strike):
+    """Row of the contract in a group whose strike is closest to the target, or None."""
+    if not np.isfinite(target_strike):
+        return None
+    start, end = chain['sel_group_bounds'][group], chain['sel_group_bounds'][group + 1]
+    return int(chain['sel_strike_rows'][start + _nearest(chain['sel_strikes'][start:end], target_strike)])
+
+
+def select_legs(chain, day, legs):
+    """
+    Picks one contract per strategy leg on a trading day.
+
+    Each leg takes the expiry closest to its `dte` target, then the strike
+    closest to its `delta` target. Legs with a `strike_offset` are placed
+    relative to the previously selected leg of the same type (or to the
+    underlying if there is none), as in spreads and iron condors; other legs
+    take the strike closest to the underlying.
+
+    :param chain: A prepared chain including its selection index.
+    :return: Array of row indices into the chain arrays, or None if any leg
+             has no tradable contract on this day.
+    """
+    spot = chain['spot'][day]
+    selected = []
+    reference_strike = {}
+    for leg in legs:
+        leg_is_call = leg.get('type', 'call') == 'call'
+        group = nearest_expiry_group(chain, day, leg_is_call, leg.get('dte', 30))
+        if group is None:
+            return None
+
+        if 'delta' in leg:
+            row = nearest_delta(chain, group, leg['delta'])
+        elif 'strike_offset' in leg:
+            row = nearest_strike(chain, group, reference_strike.get(leg_is_call, spot) + leg['strike_offset'])
+        else:
+            row = nearest_strike(chain, group, spot)
+        if row is None:
+            return None
+        reference_strike[leg_is_call] = chain['strike'][row]
+        selected.append(row)
+
+    return np.array(selected, dtype=np.int64)
@@ -0,0 +1,160 @@
+# backend/optionforge/backtester/signals.py
+
+import datetime
+import numpy as np
+from optionforge.caching import TTLCache
+from .datasource import load_underlying_prices
+
+# Close histories by (ticker, data version), and those filled from a chain's spot
+# by (ticker, data version, risk-free rate, first day, last day), with their running sums
+_histories = TTLCache(max_entries=64)
+# Boolean signals over a close history's calendar by (history key, chain field)
+_signals = TTLCache(max_entries=1024)
+
+
+class PriceHistory:
+    """
+    A ticker's full history of daily closes.
+
+    The running sum of closes is computed once, so a moving average of any
+    window is a difference of two slices of it.
+    """
+    def __init__(self, dates, closes):
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.closes = np.asarray(closes, dtype=np.float64)
+        self._cumsum = np.concatenate([[0.0], np.cumsum(self.closes)])
+
+    def moving_average(self, window):
+        """Simple moving average of each day's close and the `window - 1` before it; NaN while warming up."""
+        average = np.full(len(self.closes), np.nan)
+        if window <= len(self.closes):
+            average[window - 1:] = (self._cumsum[window:] - self._cumsum[:-window]) / window
+        return average
+
+
+def _moving_average_cross(history, short, long, direction='above'):
+    """Days on which the short moving average is above (or below) the long one."""
+    short_average, long_average = history.moving_average(short), history.moving_average(long)
+    compare = np.greater if direction == 'above' else np.less
+    return compare(short_average, long_average)
+
+
+def _validate_moving_average_cross(params):
+    if not isinstance(params, dict):
+        return "moving_average_cross must be an object with 'short' and 'long' windows."
+    short, long = params.get('short'), params.get('long')
+    if not all(isinstance(w, int) and not isinstance(w, bool) and w >= 1 for w in (short, long)):
+        return "moving_average_cross windows must be positive integers."
+    if short >= long:
+        return "moving_average_cross requires a short window below the long one."
+    if params.get('direction', 'above') not in ('above', 'below'):
+        return "moving_average_cross direction must be 'above' or 'below'."
+    unknown = set(params) - {'short', 'long', 'direction'}
+    if unknown:
+        return f"Unknown moving_average_cross parameters: {', '.join(sorted(unknown))}."
+    return None
+
+
+# Entry rules evaluated on the underlying's close history: rule name ->
+# (signal over a PriceHistory from the rule's parameters, validator
+# returning an error message or None)
+PRICE_SIGNALS = {
+    'moving_average_cross': (_moving_average_cross, _validate_moving_average_cross),
+}
+
+
+def validate_entry_rules(entry_rules):
+    """
+    Checks the parameters of a strategy's price-signal entry rules.
+
+    :raises ValueError: With the first problem found.
+    """
+    for rule, (_, validate) in PRICE_SIGNALS.items():
+        if rule in entry_rules:
+            error = validate(entry_rules[rule])
+            if error:
+                raise ValueError(error)
+
+
+def signal_field(rule, params):
+    """The chain field holding a price-signal rule's per-day mask, e.g. 'signal:moving_average_cross:long=50,short=20'."""
+    return f"signal:{rule}:" + ','.join(f"{name}={params[name]}" for name in sorted(params))
+
+
+def price_history(ticker, version):
+    """A ticker's stored closes from the process-wide cache, loaded on a miss."""
+    key = (ticker, version)
+    history = _histories.get(key)
+    if history is None:
+        closes = load_underlying_prices(ticker, datetime.date.min, datetime.date.max)
+        history = PriceHistory(closes.index.to_numpy(dtype='datetime64[D]'), closes.to_numpy())
+        _histories.set(key, history)
+    return history
+
+
+def _filled_history(ticker, version, risk_free_rate, days, spot):
+    """
+    The stored closes with chain days lacking one filled from the chain's spot.
+
+    :return: (cache key, PriceHistory); the stored history itself when no day is missing.
+    """
+    stored = price_history(ticker, version)
+    missing = ~np.isin(days, stored.dates) & np.isfinite(spot)
+    if not missing.any():
+        return (ticker, version), stored
+
+    # The chain's spot is fixed by the data version, the rate its parity
+    # estimates were solved with and the chain's date range
+    key = (ticker, version, risk_free_rate, days[0], days[-1])
+    history = _histories.get(key)
+    if history is None:
+        dates = np.concatenate([stored.dates, days[missing]])
+        closes = np.concatenate([stored.closes, spot[missing]])
+        order = np.argsort(dates, kind='stable')
+        history = PriceHistory(dates[order], closes[order])
+        _histories.set(key, history)
+    return key, history
+
+
+def compile_entry_signals(ticker, entry_rules, days, spot, version, risk_free_rate):
+    """
+    Evaluates a strategy's price-signal entry rules on the given trading days.
+
+    Each rule is computed over the ticker's whole close history, so moving
+    averages are warmed up by the closes before the first day, and cached
+    per (history, rule, parameters) for every backtest in the process. Chain
+    days without a stored close use the chain's spot (stored closes with
+    put-call parity estimates), so a ticker whose bars were never loaded
+    still trades once the chain alone covers a rule's windows.
+
+    :param days: datetime64[D] trading days of the chain.
+    :param spot: The chain's per-day spot, aligned with `days`.
+    :param version: The ticker's chain data version (bumped by bar ingestion too).
+    :param risk_free_rate: The rate the chain's parity spot estimates were solved with.
+    :return: Dict mapping each rule's `signal_field` to a boolean mask over `days`.
+    :raises ValueError: If the ticker has neither stored closes nor a spot on any day.
+    """
+    rules = [(rule, entry_rules[rule]) for rule in PRICE_SIGNALS if rule in entry_rules]
+    if not rules:
+        return {}
+
+    history_key, history = _filled_history(ticker, version, risk_free_rate, days,
+                                           np.asarray(spot, dtype=np.float64))
+    if not len(history.dates):
+        raise ValueError(f"Entry rule '{rules[0][0]}' needs closes of {ticker}, but none are stored "
+                         f"and its chain gives no spot; load its daily bars first.")
+    position = np.searchsorted(history.dates, days)
+    in_range = position < len(history.dates)
+    position = np.minimum(position, len(history.dates) - 1)
+    known = in_range & (history.dates[position] == days)
+
+    masks = {}
+    for rule, params in rules:
+        field = signal_field(rule, params)
+        key = history_key + (field,)
+        signal = _signals.get(key)
+        if signal is None:
+            signal = PRICE_SIGNALS[rule][0](history, **params)
+            _signals.set(key, signal)
+        masks[field] = known & signal[position]
+    return masks
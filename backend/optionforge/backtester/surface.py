@@ -0,0 +1,229 @@
+# backend/optionforge/backtester/surface.py
+
+import numpy as np
+from optionforge.caching import TTLCache
+from .pricing import implied_volatility_vectorized
+
+# Columns of VolSurface.params: raw SVI a, b, rho, m, sigma of each expiry
+SVI_PARAMETERS = ('a', 'b', 'rho', 'm', 'sigma')
+# Fewer quotes than this and an expiry gets a flat smile at their mean variance
+MIN_SVI_POINTS = 5
+# Candidate (m, sigma) pairs of the coarse pass, per axis; a finer pass follows around the best
+SVI_GRID_SIZE = 11
+SVI_REFINE_SIZE = 7
+
+# Fitted surfaces by (ticker, date, data version, risk-free rate); each is a few hundred bytes
+_surfaces = TTLCache(max_entries=1024)
+
+
+def _svi_fit_candidates(k, w, mask, m, sigma):
+    """
+    Best raw SVI fit per smile over candidate (m, sigma) pairs.
+
+    For fixed m and sigma, w = a + d*y + c*sqrt(y^2 + 1) with y = (k - m) / sigma
+    is linear in (a, d, c), so every candidate is one 3x3 least-squares
+    solve, batched over all smiles and candidates at once. Candidates
+    violating c > 0, |d| < c or a non-negative minimum variance are discarded.
+
+    :param k, w, mask: (smiles, quotes) log-moneyness, total variance and
+                       which entries are quotes rather than padding.
+    :param m, sigma: (smiles, candidates) candidate pairs.
+    :return: Per smile, the (sum of squared errors, a, b, rho, m, sigma) of
+             its best candidate; the error is inf if none is admissible.
+    """
+    w = np.where(mask, w, 0.0)
+    y = (k[:, None, :] - m[..., None]) / sigma[..., None]
+    s = np.sqrt(y ** 2 + 1) * mask[:, None, :]
+    y = y * mask[:, None, :]
+    # Normal equations from moment sums, without materializing the design matrix
+    n = np.broadcast_to(mask.sum(axis=1)[:, None], m.shape).astype(np.float64)
+    sum_y, sum_s, sum_yy, sum_ys = y.sum(axis=-1), s.sum(axis=-1), (y * y).sum(axis=-1), (y * s).sum(axis=-1)
+    XtX = np.stack([
+        np.stack([n, sum_y, sum_s], axis=-1),
+        np.stack([sum_y, sum_yy, sum_ys], axis=-1),
+        np.stack([sum_s, sum_ys, sum_yy + n], axis=-1),
+    ], axis=-2)
+    Xtw = np.stack([np.broadcast_to(w.sum(axis=1)[:, None], m.shape),
+                    np.einsum('ecn,en->ec', y, w), np.einsum('ecn,en->ec', s, w)], axis=-1)
+    # A tiny ridge keeps degenerate candidates (e.g. all quotes on one side of m) solvable
+    coef = np.linalg.solve(XtX + 1e-12 * np.eye(3), Xtw[..., None])[..., 0]
+    a, d, c = coef[..., 0], coef[..., 1], coef[..., 2]
+    # Residual sum of squares: w'w - 2 coef'X'w + coef'X'X coef
+    sse = (w * w).sum(axis=1)[:, None] - 2 * (coef * Xtw).sum(axis=-1) + np.einsum('eci,ecij,ecj->ec', coef, XtX, coef)
+    admissible = (c > 0) & (np.abs(d) < c) & (a + np.sqrt(np.maximum(c ** 2 - d ** 2, 0.0)) >= 0)
+    sse = np.where(admissible, sse, np.inf)
+
+    best = np.argmin(sse, axis=1)[:, None]
+    pick = lambda values: np.take_along_axis(values, best, axis=1)[:, 0]
+    a, d, c, m, sigma = pick(a), pick(d), pick(c), pick(m), pick(sigma)
+    safe_c = np.where(c > 0, c, 1.0)
+    return pick(sse), a, c / sigma, np.where(c > 0, d / safe_c, 0.0), m, sigma
+
+
+def _grid(m, sigma):
+    """All (m, sigma) pairs of per-smile axes, as two (smiles, pairs) arrays."""
+    return (np.repeat(m, sigma.shape[1], axis=1), np.tile(sigma, (1, m.shape[1])))
+
+
+def fit_svi_smiles(k, w, mask):
+    """
+    Fits one raw SVI smile w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2)) per row.
+
+    A coarse grid of (m, sigma) spans each smile's quoted moneyness, then a
+    finer grid searches around its best pair. Smiles with fewer than
+    MIN_SVI_POINTS quotes, or no admissible fit, are flat at their mean
+    total variance.
+
+    :param k: (smiles, quotes) log-moneyness log(K / F), padded per row.
+    :param w: Total implied variance sigma_imp^2 * T of the same quotes.
+    :param mask: Which entries are quotes rather than padding.
+    :return: (smiles, 5) array of the SVI_PARAMETERS.
+    """
+    counts = mask.sum(axis=1)
+    k_min = np.where(mask, k, np.inf).min(axis=1)
+    k_max = np.where(mask, k, -np.inf).max(axis=1)
+    span = np.maximum(k_max - k_min, 1e-3)
+    flat = np.column_stack([np.where(mask, w, 0.0).sum(axis=1) / np.maximum(counts, 1),
+                            np.zeros(len(k)), np.zeros(len(k)), np.zeros(len(k)), np.ones(len(k))])
+    fitted = counts >= MIN_SVI_POINTS
+    if not fitted.any():
+        return flat
+    k, w, mask, k_min, span = k[fitted], w[fitted], mask[fitted], k_min[fitted], span[fitted]
+
+    m = k_min[:, None] + span[:, None] * np.linspace(0, 1, SVI_GRID_SIZE)
+    sigma = span[:, None] * np.geomspace(1 / 50, 2, SVI_GRID_SIZE)
+    coarse = _svi_fit_candidates(k, w, mask, *_grid(m, sigma))
+
+    step = span / (SVI_GRID_SIZE - 1)
+    fine_m = coarse[4][:, None] + step[:, None] * np.linspace(-1, 1, SVI_REFINE_SIZE)
+    fine_sigma = coarse[5][:, None] * np.geomspace(0.7, 1.4, SVI_REFINE_SIZE)
+    fine = _svi_fit_candidates(k, w, mask, *_grid(fine_m, fine_sigma))
+
+    better = fine[0] < coarse[0]
+    sse, a, b, rho, m, sigma = (np.where(better, f, c) for f, c in zip(fine, coarse))
+    params = flat.copy()
+    params[fitted] = np.where(np.isfinite(sse)[:, None], np.column_stack([a, b, rho, m, sigma]), flat[fitted])
+    return params
+
+
+def fit_svi(k, w):
+    """Fits a raw SVI smile to one expiry's quotes; returns the SVI_PARAMETERS."""
+    k, w = np.asarray(k, dtype=np.float64), np.asarray(w, dtype=np.float64)
+    return fit_svi_smiles(k[None, :], w[None, :], np.ones((1, len(k)), dtype=bool))[0]
+
+
+def svi_total_variance(params, k):
+    """Total variance of raw SVI `params` (rows broadcast against `k`) at log-moneyness `k`."""
+    a, b, rho, m, sigma = (params[..., i] for i in range(5))
+    return a + b * (rho * (k - m) + np.sqrt((k - m) ** 2 + sigma ** 2))
+
+
+class VolSurface:
+    """
+    Implied volatility at any strike and expiry of one (ticker, date) chain.
+
+    Each listed expiry's smile is a raw SVI curve of total variance in
+    log-moneyness, fitted to the out-of-the-money quotes (the other side
+    where one has no quote). Between expiries total variance is linear in
+    time at fixed moneyness; before the first and after the last expiry the
+    nearest smile's volatility is used.
+
+    The fit is stored as one row of SVI_PARAMETERS per expiry, so a surface
+    is a few hundred bytes and a lookup is a binary search over expiries and
+    two closed-form SVI evaluations, whatever the size of the chain.
+    """
+    def __init__(self, spot, dte, params, risk_free_rate=0.02):
+        self.spot = spot
+        self.dte = np.asarray(dte, dtype=np.float64)
+        self.params = np.asarray(params, dtype=np.float64).reshape(len(self.dte), len(SVI_PARAMETERS))
+        self.risk_free_rate = risk_free_rate
+
+    @classmethod
+    def from_chain(cls, chain_df, spot, risk_free_rate=0.02):
+        """
+        Fits the surface of one day's chain.
+
+        :param chain_df: One trading day of contracts with 'data_date',
+                         'expiration_date', 'strike_price', 'option_type',
+                         'implied_volatility' and 'mid'. Missing implied
+                         volatilities are solved from the mids.
+        :param spot: The underlying price that day.
+        :raises ValueError: If no contract has a usable implied volatility.
+        """
+        dte = (chain_df['expiration_date'] - chain_df['data_date']).dt.days.to_numpy()
+        listed = dte > 0
+        dte = dte[listed]
+        strike = chain_df['strike_price'].to_numpy(dtype=np.float64)[listed]
+        is_call = (chain_df['option_type'] == 'call').to_numpy()[listed]
+
+        iv = chain_df['implied_volatility'].to_numpy(dtype=np.float64)[listed]
+        missing = ~(iv > 0)
+        if missing.any():
+            iv[missing] = implied_volatility_vectorized(chain_df['mid'].to_numpy(dtype=np.float64)[listed][missing], spot,
+                                                        strike[missing], dte[missing] / 365.0, risk_free_rate, is_call[missing])
+        usable = iv > 0
+        if not usable.any():
+            raise ValueError("No contract in the chain has a usable implied volatility.")
+        dte, strike, iv = dte[usable], strike[usable], iv[usable]
+        otm = np.where(is_call[usable], strike >= spot, strike < spot)
+
+        # One volatility per (expiry, strike), preferring the out-of-the-money side
+        order = np.lexsort((~otm, strike, dte))
+        dte, strike, iv = dte[order], strike[order], iv[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (dte[1:] != dte[:-1]) | (strike[1:] != strike[:-1])
+        dte, strike, iv = dte[first], strike[first], iv[first]
+
+        # Smiles as rows of a padded (expiry, quote) matrix, fitted together
+        expiries, expiry, counts = np.unique(dte, return_inverse=True, return_counts=True)
+        position = np.arange(len(dte)) - np.repeat(np.cumsum(counts) - counts, counts)
+        T = dte / 365.0
+        k = np.zeros((len(expiries), counts.max()))
+        w = np.zeros_like(k)
+        mask = np.zeros(k.shape, dtype=bool)
+        k[expiry, position] = np.log(strike / (spot * np.exp(risk_free_rate * T)))
+        w[expiry, position] = iv ** 2 * T
+        mask[expiry, position] = True
+        return cls(spot, expiries, fit_svi_smiles(k, w, mask), risk_free_rate)
+
+    def vol(self, strike, dte):
+        """
+        Implied volatility at the given strikes and calendar days to expiry.
+
+        Accepts scalars or arrays, broadcast against each other.
+        """
+        strike, dte = np.broadcast_arrays(np.asarray(strike, dtype=np.float64), np.asarray(dte, dtype=np.float64))
+        T = np.maximum(dte, 1e-6) / 365.0
+        k = np.log(strike / (self.spot * np.exp(self.risk_free_rate * T)))
+
+        last = len(self.dte) - 1
+        above = np.searchsorted(self.dte, dte, side='left')
+        lower = np.clip(above - 1, 0, last)
+        upper = np.clip(above, 0, last)
+        # Queries on a listed expiry, or outside the listed range, use one smile
+        lower = np.where(self.dte[upper] == dte, upper, lower)
+
+        T_lower, T_upper = self.dte[lower] / 365.0, self.dte[upper] / 365.0
+        w_lower = np.maximum(svi_total_variance(self.params[lower], k), 0.0)
+        w_upper = np.maximum(svi_total_variance(self.params[upper], k), 0.0)
+        between = upper != lower
+        weight = np.where(between, (T - T_lower) / np.where(between, T_upper - T_lower, 1.0), 0.0)
+        variance = np.where(between, ((1 - weight) * w_lower + weight * w_upper) / T, w_lower / T_lower)
+        vol = np.sqrt(variance)
+        return vol if vol.ndim else float(vol)
+
+
+def cached_surface(ticker, date, version, risk_free_rate, build):
+    """
+    A (ticker, date) surface from the process-wide LRU cache, fitted by `build()` on a miss.
+
+    :param version: The ticker's chain data version, so re-ingested data is refitted.
+    :param risk_free_rate: The rate `build` fits with; it sets the forward,
+                           the parity spot and solved IVs, so it is part of the key.
+    """
+    key = (ticker, str(date), version, risk_free_rate)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = build()
+        _surfaces.set(key, surface)
+    return surface
@@ -0,0 +1,169 @@
+# backend/optionforge/backtester/sweep.py
+
+import copy
+import itertools
+import json
+import numpy as np
+from .engine import BacktestEngine
+from .metrics import calculate_metrics_batch, metrics_row
+
+# Upper bound on the number of parameter combinations in one sweep
+MAX_SWEEP_COMBINATIONS = 1000
+
+
+def _set_path(definition, path, value):
+    """
+    Sets a dotted parameter path in a strategy definition.
+
+    Paths look like 'exit_rules.profit_target_pct' or 'legs.0.delta';
+    'legs.*.dte' applies the value to every leg.
+    """
+    parts = path.split('.')
+    targets = [definition]
+    for part in parts[:-1]:
+        next_targets = []
+        for target in targets:
+            if part == '*':
+                next_targets.extend(target)
+            elif isinstance(target, list):
+                next_targets.append(target[int(part)])
+            else:
+                next_targets.append(target.setdefault(part, {}))
+        targets = next_targets
+    for target in targets:
+        if isinstance(target, list):
+            target[int(parts[-1])] = value
+        else:
+            target[parts[-1]] = value
+
+
+def expand_parameter_grid(template, parameters):
+    """
+    Expands a strategy template and parameter ranges into concrete strategies.
+
+    :param template: A strategy definition used as the base of every combination.
+    :param parameters: Dict mapping dotted paths to lists of values.
+    :return: A list of (parameter values, strategy definition) tuples.
+    """
+    if not parameters:
+        raise ValueError("At least one parameter range is required.")
+    paths = list(parameters)
+    value_lists = [parameters[p] if isinstance(parameters[p], list) else [parameters[p]] for p in paths]
+    empty = [path for path, values in zip(paths, value_lists) if not values]
+    if empty:
+        raise ValueError(f"Parameter ranges must list at least one value: {', '.join(empty)}")
+
+    n_combinations = 1
+    for values in value_lists:
+        n_combinations *= len(values)
+    if n_combinations > MAX_SWEEP_COMBINATIONS:
+        raise ValueError(f"Sweep has {n_combinations} combinations; the limit is {MAX_SWEEP_COMBINATIONS}.")
+
+    combinations = []
+    for values in itertools.product(*value_lists):
+        definition = copy.deepcopy(template)
+        for path, value in zip(paths, values):
+            try:
+                _set_path(definition, path, value)
+            except (IndexError, ValueError, TypeError, AttributeError):
+                raise ValueError(f"Invalid parameter path: {path}")
+        combinations.append((dict(zip(paths, values)), definition))
+
+    # Every combination runs on one load of the chain
+    tickers = {definition.get('underlying_ticker', 'SPY') for _, definition in combinations}
+    if len(tickers) > 1:
+        raise ValueError("All sweep combinations must use the same underlying ticker.")
+    return combinations
+
+
+def _rank_key(value):
+    """Sort key of a metric; missing and undefined (NaN) values rank last."""
+    if value == 'inf':
+        return float('inf')
+    if value is None or not np.isfinite(value):
+        return float('inf') if value == float('inf') else float('-inf')
+    return value
+
+
+class SweepEngine:
+    """
+    Runs a grid of strategy variants over a single load of the option chain.
+
+    The chain is fetched and flattened once for the widest expiry window any
+    variant needs (once per risk-free rate when the rate is swept). Variants
+    with identical legs and rate share their per-day leg selections, so
+    sweeping exit rules or entry filters only re-runs the cheap mark-to-market
+    walk. Metrics for all combinations are computed in one batched pass.
+    """
+    def __init__(self, template, parameters, start_date, end_date, rank_by='sharpe_ratio',
+                 progress_callback=None, data_source=None):
+        self.template = template
+        self.start_date = start_date
+        self.end_date = end_date
+        self.rank_by = rank_by
+        self.progress_callback = progress_callback
+        self.data_source = data_source
+        self.combinations = expand_parameter_grid(template, parameters)
+
+        self.engines = [
+            BacktestEngine(definition, start_date, end_date, data_source=data_source)
+            for _, definition in self.combinations
+        ]
+
+    def _update_progress(self, percentage, message):
+        if self.progress_callback:
+            self.progress_callback(percentage, message)
+
+    def run(self):
+        """Executes every combination and returns them ranked by `rank_by`."""
+        self._update_progress(0, f"Starting sweep of {len(self.engines)} combinations...")
+
+        # Load the combinations' ticker once per distinct risk-free rate (it
+        # sets the parity spot and filled deltas), using the expiry window of
+        # the variant reaching furthest out
+        all_legs = [leg for engine in self.engines for leg in engine.legs]
+        chains = {}
+        for engine in self.engines:
+            chain = chains.get(engine.risk_free_rate)
+            if chain is None:
+                loader = BacktestEngine(dict(engine.strategy, legs=all_legs), self.start_date, self.end_date,
+                                        data_source=self.data_source)
+                options_df, underlying_prices = loader._fetch_data()
+                chain = chains[engine.risk_free_rate] = loader._prepare_chain(options_df, underlying_prices)
+            chain.update(engine._entry_signals(chain['days'], chain['spot']))
+
+        selection_caches = {}
+        equity_curves = np.empty((len(self.engines), len(chain['days'])))
+        trade_counts = []
+        for i, engine in enumerate(self.engines):
+            legs_key = json.dumps([engine.risk_free_rate, engine.legs], sort_keys=True)
+            engine.selection_cache = selection_caches.setdefault(legs_key, {})
+
+            cumulative_pnl, trades = engine._simulate(chains[engine.risk_free_rate], report_progress=False)
+            equity_curves[i] = cumulative_pnl + engine.initial_capital
+            trade_counts.append(len(trades))
+
+            self._update_progress(20 + int(70 * (i + 1) / len(self.engines)),
+                                  f"Evaluated {i + 1}/{len(self.engines)} combinations.")
+
+        # Metrics for all curves at once, per distinct risk-free rate
+        self._update_progress(90, "Calculating performance metrics...")
+        metrics = [None] * len(self.engines)
+        for rate in {engine.risk_free_rate for engine in self.engines}:
+            indices = [i for i, engine in enumerate(self.engines) if engine.risk_free_rate == rate]
+            batch = calculate_metrics_batch(equity_curves[indices], rate)
+            for j, i in enumerate(indices):
+                metrics[i] = dict(metrics_row(batch, j), num_trades=trade_counts[i])
+
+        rows = [{'parameters': params, 'metrics': metrics[i]} for i, (params, _) in enumerate(self.combinations)]
+        rows.sort(key=lambda row: _rank_key(row['metrics'].get(self.rank_by)), reverse=True)
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+
+        self._update_progress(100, "Sweep complete.")
+        return {
+            'rank_by': self.rank_by,
+            'sweep_results': rows,
+            'summary_metrics': rows[0]['metrics'] if rows else {},
+            'strategy_definition': self.template
+        }
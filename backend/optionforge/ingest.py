@@ -0,0 +1,720 @@
+# backend/optionforge/ingest.py
+
+import io
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+from .models import db, OptionData, ChainDataVersion, UnderlyingPrice, IVHistory
+from .backtester.cache import invalidate_chain_cache
+from .backtester.datasource import load_underlying_prices
+from .backtester.pricing import implied_volatility_vectorized, black_scholes_greeks_vectorized
+from .backtester.surface import VolSurface
+
+
+def mid_prices(df):
+    """Bid/ask mid where both sides are quoted, otherwise the last traded price."""
+    quoted = (df['bid'] > 0) & (df['ask'] > 0)
+    return np.where(quoted, (df['bid'] + df['ask']) / 2, df['last_price'])
+
+
+def implied_spot_by_date(chain_df, risk_free_rate=0.02, pairs=5):
+    """
+    Estimates the underlying price for each day from put-call parity.
+
+    For every (date, expiry, strike) with both a call and a put, S = C - P + K*exp(-rT).
+    The estimate for a day is the median over the `pairs` strikes closest to the money,
+    i.e. the ones with the smallest |C - P|.
+
+    :param chain_df: DataFrame with data_date, expiration_date, strike_price,
+                     option_type, mid and T columns.
+    :return: A pandas Series of underlying prices indexed by data_date.
+    """
+    keys = ['data_date', 'expiration_date', 'strike_price']
+    calls = chain_df.loc[chain_df['option_type'] == 'call', keys + ['T', 'mid']]
+    puts = chain_df.loc[chain_df['option_type'] == 'put', keys + ['mid']]
+    paired = calls.merge(puts, on=keys, suffixes=('_call', '_put')).dropna()
+    paired = paired[paired['T'] > 0]
+
+    paired['spot'] = paired['mid_call'] - paired['mid_put'] + paired['strike_price'] * np.exp(-risk_free_rate * paired['T'])
+    paired['atm_distance'] = (paired['mid_call'] - paired['mid_put']).abs()
+
+    nearest = paired.sort_values('atm_distance').groupby('data_date').head(pairs)
+    return nearest.groupby('data_date')['spot'].median().rename('underlying_price')
+
+
+def underlying_prices_by_date(chain_df, stored_prices, risk_free_rate=0.02):
+    """
+    The underlying price of each date in a chain.
+
+    Stored closes (see `load_underlying_prices`) are used where present; only
+    dates without one fall back to the put-call parity estimate.
+
+    :param chain_df: As for `implied_spot_by_date`.
+    :param stored_prices: Series of closes indexed by date.
+    :return: A pandas Series of underlying prices indexed by data_date.
+    """
+    dates = pd.DatetimeIndex(chain_df['data_date'].unique()).sort_values()
+    prices = stored_prices.reindex(dates)
+    missing = prices.index[prices.isna()]
+    if len(missing):
+        implied = implied_spot_by_date(chain_df[chain_df['data_date'].isin(missing)], risk_free_rate)
+        prices = prices.fillna(implied)
+    return prices.rename('underlying_price')
+
+
+def compute_chain_analytics(chain_df, underlying_prices, risk_free_rate=0.02):
+    """
+    Solves implied volatility and Greeks for a whole chain in one vectorized pass.
+
+    :param chain_df: DataFrame of option rows with data_date, expiration_date,
+                     strike_price, option_type, bid, ask, last_price and implied_volatility.
+    :param underlying_prices: Series of underlying prices indexed by data_date.
+    :return: DataFrame with implied_volatility, delta, gamma, theta and vega columns
+             aligned to chain_df's index.
+    """
+    spot = chain_df['data_date'].map(underlying_prices).to_numpy(dtype=np.float64)
+    strike = chain_df['strike_price'].to_numpy(dtype=np.float64)
+    T = chain_df['T'].to_numpy(dtype=np.float64)
+    is_call = (chain_df['option_type'] == 'call').to_numpy()
+
+    iv = implied_volatility_vectorized(chain_df['mid'].to_numpy(dtype=np.float64), spot, strike, T, risk_free_rate, is_call)
+    # Keep the provider's IV where the quote could not be inverted
+    iv = np.where(np.isfinite(iv), iv, chain_df['implied_volatility'].to_numpy(dtype=np.float64))
+
+    greeks = black_scholes_greeks_vectorized(spot, strike, T, risk_free_rate, iv, is_call)
+    usable = np.isfinite(iv) & np.isfinite(spot) & (T > 0)
+
+    return pd.DataFrame({
+        'implied_volatility': iv,
+        'delta': np.where(usable, greeks['delta'], np.nan),
+        'gamma': np.where(usable, greeks['gamma'], np.nan),
+        'theta': np.where(usable, greeks['theta'], np.nan),
+        'vega': np.where(usable, greeks['vega'], np.nan),
+    }, index=chain_df.index)
+
+
+def chain_data_version(ticker):
+    """The current version of a ticker's stored option data (0 if never changed)."""
+    row = db.session.get(ChainDataVersion, ticker)
+    return row.version if row else 0
+
+
+def chain_data_changed(ticker):
+    """
+    Records that a ticker's stored option data changed.
+
+    Bumps its data version, which retires stored backtest results keyed on
+    the old one, and drops the ticker's cached chains.
+    """
+    row = db.session.get(ChainDataVersion, ticker)
+    if row is None:
+        row = ChainDataVersion(underlying_ticker=ticker, version=0)
+        db.session.add(row)
+    row.version += 1
+    db.session.commit()
+    invalidate_chain_cache(current_app.config, ticker)
+
+
+def backfill_greeks(ticker, start_date, end_date, risk_free_rate=0.02, batch_days=20):
+    """
+    Fills implied volatility and Greeks for every stored contract of a ticker/date range.
+
+    Rows are loaded a batch of trading days at a time with a column-only query,
+    solved with the vectorized pricer against the stored underlying closes
+    (parity estimates where none is stored) and written back with bulk updates.
+    The days' entries in iv_history are refreshed from the new volatilities.
+
+    :return: The number of rows updated.
+    """
+    date_rows = db.session.query(OptionData.data_date).filter(
+        OptionData.underlying_ticker == ticker,
+        OptionData.data_date >= start_date,
+        OptionData.data_date <= end_date
+    ).distinct().order_by(OptionData.data_date).all()
+    dates = [row[0] for row in date_rows]
+
+    updated = 0
+    summaries = []
+    for i in range(0, len(dates), batch_days):
+        batch = dates[i:i + batch_days]
+        query = db.session.query(
+            OptionData.id, OptionData.data_date, OptionData.expiration_date,
+            OptionData.strike_price, OptionData.option_type,
+            OptionData.bid, OptionData.ask, OptionData.last_price, OptionData.implied_volatility
+        ).filter(
+            OptionData.underlying_ticker == ticker,
+            OptionData.data_date >= batch[0],
+            OptionData.data_date <= batch[-1]
+        )
+        chain = pd.read_sql(query.statement, db.session.bind)
+        if chain.empty:
+            continue
+
+        chain['data_date'] = pd.to_datetime(chain['data_date'])
+        chain['expiration_date'] = pd.to_datetime(chain['expiration_date'])
+        chain['T'] = (chain['expiration_date'] - chain['data_date']).dt.days / 365.0
+        chain['mid'] = mid_prices(chain)
+
+        stored_prices = load_underlying_prices(ticker, batch[0], batch[-1])
+        underlying_prices = underlying_prices_by_date(chain, stored_prices, risk_free_rate)
+        analytics = compute_chain_analytics(chain, underlying_prices, risk_free_rate)
+        analytics['id'] = chain['id']
+
+        records = analytics.astype(object).where(analytics.notna(), None).to_dict('records')
+        db.session.bulk_update_mappings(OptionData, records)
+        db.session.commit()
+        updated += len(records)
+
+        chain['implied_volatility'] = analytics['implied_volatility']
+        summaries.append(daily_iv_summary(chain, underlying_prices, risk_free_rate))
+
+    if summaries:
+        update_iv_history(ticker, pd.concat(summaries, ignore_index=True))
+    if updated:
+        chain_data_changed(ticker)
+    return updated
+
+
+# --- Bulk chain ingestion ---
+
+# Columns written to option_data, and the ones identifying a contract snapshot
+# (the `_unique_option_contract` constraint)
+OPTION_COLUMNS = [
+    'underlying_ticker', 'data_date', 'expiration_date', 'strike_price', 'option_type',
+    'last_price', 'bid', 'ask', 'volume', 'open_interest', 'implied_volatility',
+    'delta', 'gamma', 'theta', 'vega'
+]
+CONTRACT_KEY = ['underlying_ticker', 'data_date', 'expiration_date', 'strike_price', 'option_type']
+
+# Provider and dump column names accepted in place of the option_data names
+COLUMN_ALIASES = {
+    'underlyingTicker': 'underlying_ticker', 'underlying': 'underlying_ticker', 'ticker': 'underlying_ticker',
+    'dataDate': 'data_date', 'quote_date': 'data_date', 'date': 'data_date',
+    'expirationDate': 'expiration_date', 'expiration': 'expiration_date', 'expiry': 'expiration_date',
+    'strike': 'strike_price',
+    'optionType': 'option_type', 'type': 'option_type',
+    'lastPrice': 'last_price',
+    'openInterest': 'open_interest',
+    'impliedVolatility': 'implied_volatility',
+}
+
+# Rows per executemany batch on databases without COPY
+UPSERT_BATCH_SIZE = 50000
+
+# Dump file names carry the ticker and snapshot date, e.g. SPY_2023-01-03.csv.gz
+# or SPY/2023-01-03.parquet, for dumps whose rows do not include them
+_DUMP_NAME = re.compile(r'(?P<ticker>[A-Z][A-Z0-9.^]*)[_/\\-](?P<date>\d{4}-\d{2}-\d{2})')
+_DUMP_SUFFIXES = ('.csv', '.csv.gz', '.parquet')
+
+
+def normalize_chain(df, ticker=None, data_date=None):
+    """
+    Converts a raw chain snapshot into option_data rows.
+
+    Accepts option_data column names or the provider aliases in COLUMN_ALIASES.
+    The option type is taken from the OCC contract symbol when no type column is
+    present. Rows missing a key field are dropped, and duplicate contracts keep
+    the last quote.
+
+    :param ticker: Underlying ticker for rows that do not carry one.
+    :param data_date: Snapshot date for rows that do not carry one.
+    :return: DataFrame with exactly OPTION_COLUMNS.
+    """
+    df = df.rename(columns=COLUMN_ALIASES)
+    df = df.loc[:, ~df.columns.duplicated()]
+    if 'option_type' not in df and 'contractSymbol' in df:
+        df['option_type'] = df['contractSymbol'].str.extract(r'\d([CP])\d+$', expand=False)
+    if 'underlying_ticker' not in df:
+        df['underlying_ticker'] = ticker
+    if 'data_date' not in df:
+        df['data_date'] = data_date
+
+    rows = pd.DataFrame(index=df.index)
+    rows['underlying_ticker'] = df['underlying_ticker'].astype('string').str.upper()
+    rows['data_date'] = pd.to_datetime(df['data_date'], errors='coerce').dt.date
+    rows['expiration_date'] = pd.to_datetime(df['expiration_date'], errors='coerce').dt.date
+    rows['strike_price'] = pd.to_numeric(df['strike_price'], errors='coerce')
+    rows['option_type'] = df['option_type'].astype('string').str[0].str.lower().map({'c': 'call', 'p': 'put'})
+    for name in OPTION_COLUMNS[5:]:
+        values = pd.to_numeric(df[name], errors='coerce') if name in df else np.nan
+        rows[name] = values
+    for name in ('volume', 'open_interest'):
+        rows[name] = rows[name].round().astype('Int64')
+
+    rows = rows.dropna(subset=CONTRACT_KEY)
+    return rows.drop_duplicates(subset=CONTRACT_KEY, keep='last').reset_index(drop=True)
+
+
+def read_chain_file(path):
+    """
+    Reads one CSV or Parquet chain dump into option_data rows.
+
+    The ticker and snapshot date are taken from the path when the file's rows
+    do not include them.
+    """
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    match = _DUMP_NAME.search(path.replace(os.sep, '/'))
+    return normalize_chain(df,
+                           ticker=match.group('ticker') if match else None,
+                           data_date=match.group('date') if match else None)
+
+
+def find_chain_files(root, ticker=None):
+    """
+    Lists the chain dumps under a directory in path order.
+
+    With `ticker`, only files whose path names that ticker are returned.
+    """
+    found = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if not name.endswith(_DUMP_SUFFIXES):
+                continue
+            match = _DUMP_NAME.search(path.replace(os.sep, '/'))
+            if ticker and (not match or match.group('ticker') != ticker):
+                continue
+            found.append(path)
+    return sorted(found)
+
+
+def _sql_rows(rows):
+    """Rows as plain Python records with None for missing values."""
+    return rows[OPTION_COLUMNS].astype(object).where(rows[OPTION_COLUMNS].notna(), None).to_dict('records')
+
+
+def _copy_upsert(rows):
+    """PostgreSQL: COPY the rows into a staging table, then upsert them in one statement."""
+    cursor = db.session.connection().connection.cursor()
+    columns = ', '.join(OPTION_COLUMNS)
+    updates = ', '.join(f'{c} = EXCLUDED.{c}' for c in OPTION_COLUMNS if c not in CONTRACT_KEY)
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS option_data_staging "
+        "(LIKE option_data INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    buffer = io.StringIO()
+    rows[OPTION_COLUMNS].to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY option_data_staging ({columns}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer)
+    cursor.execute(
+        f"INSERT INTO option_data ({columns}) SELECT {columns} FROM option_data_staging "
+        f"ON CONFLICT ON CONSTRAINT _unique_option_contract DO UPDATE SET {updates}"
+    )
+
+
+def _executemany_upsert(rows, dialect, batch_size):
+    """Other databases: INSERT ... ON CONFLICT DO UPDATE executed in large batches."""
+    statement = dialect.insert(OptionData.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=CONTRACT_KEY,
+        set_={c: statement.excluded[c] for c in OPTION_COLUMNS if c not in CONTRACT_KEY}
+    )
+    records = _sql_rows(rows)
+    for i in range(0, len(records), batch_size):
+        db.session.execute(statement, records[i:i + batch_size])
+
+
+def upsert_option_rows(rows, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Inserts normalized chain rows, updating contracts that are already stored.
+
+    Conflicts on `_unique_option_contract` overwrite the stored quote and
+    Greeks, so reloading a snapshot is idempotent. The caller commits.
+
+    :param rows: DataFrame from `normalize_chain`.
+    :return: The number of rows written.
+    """
+    if rows.empty:
+        return 0
+    dialect_name = db.session.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        _copy_upsert(rows)
+    elif dialect_name == 'sqlite':
+        _executemany_upsert(rows, sqlite, batch_size)
+    else:
+        raise ValueError(f"Bulk upsert is not supported on {dialect_name}.")
+    return len(rows)
+
+
+class IngestCheckpoint:
+    """
+    Records which ingest units have been loaded, so an interrupted run resumes.
+
+    Units are opaque keys (a dump file's path, size and modification time, or a
+    provider snapshot). The set is kept in a JSON file that is rewritten
+    atomically after every completed unit. It is safe to share between the
+    threads of one run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._done = set(json.load(f))
+
+    def is_done(self, key):
+        return key in self._done
+
+    def mark_done(self, key):
+        with self._lock:
+            self._done.add(key)
+            if not self.path:
+                return
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(sorted(self._done), f)
+            os.replace(temp_path, self.path)
+
+
+def file_unit(path):
+    """An ingest unit that reads a dump file; the key changes if the file is rewritten."""
+    stat = os.stat(path)
+    return f'file:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}', lambda: read_chain_file(path)
+
+
+def ingest_ticker(ticker, units, checkpoint=None, backfill=True, risk_free_rate=0.02, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Loads a ticker's chain snapshots into option_data.
+
+    Each unit is committed on its own and then checkpointed, so a rerun skips
+    what already landed. Once everything is stored, the ticker's data version
+    is bumped and, with `backfill`, Greeks are solved for the loaded dates.
+
+    :param units: Iterable of (key, loader) pairs; `loader()` returns normalized rows.
+    :return: The number of rows written.
+    """
+    checkpoint = checkpoint or IngestCheckpoint(None)
+    written, loaded_dates = 0, []
+    try:
+        for key, loader in units:
+            if checkpoint.is_done(key):
+                continue
+            rows = loader()
+            rows = rows[rows['underlying_ticker'] == ticker]
+            try:
+                written += upsert_option_rows(rows, batch_size)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            checkpoint.mark_done(key)
+            if not rows.empty:
+                loaded_dates.extend([rows['data_date'].min(), rows['data_date'].max()])
+    finally:
+        # Units committed before a failure are live, so stale caches must go either way
+        if written:
+            chain_data_changed(ticker)
+
+    if written and backfill:
+        backfill_greeks(ticker, min(loaded_dates), max(loaded_dates), risk_free_rate)
+    return written
+
+
+def run_ingestion(app, units_by_ticker, workers=4, checkpoint=None, **kwargs):
+    """
+    Ingests several tickers in parallel, one thread and database session per ticker.
+
+    :param units_by_ticker: Dict mapping each ticker to its ingest units.
+    :param kwargs: Passed on to `ingest_ticker`.
+    :return: Dict mapping each ticker to the rows written, or to the exception
+             that stopped it; the other tickers keep going.
+    """
+    def ingest(ticker, units):
+        with app.app_context():
+            return ingest_ticker(ticker, units, checkpoint, **kwargs)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(ingest, ticker, units): ticker for ticker, units in units_by_ticker.items()}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                results[futures[future]] = e
+    return results
+
+
+# --- Underlying price bars ---
+
+# Columns written to underlying_prices, and the ones identifying a bar
+BAR_COLUMNS = ['underlying_ticker', 'data_date', 'open', 'high', 'low', 'close', 'volume']
+BAR_KEY = ['underlying_ticker', 'data_date']
+
+# Provider and file column names (compared lower-cased) accepted in place of the underlying_prices names
+BAR_ALIASES = {
+    'ticker': 'underlying_ticker', 'symbol': 'underlying_ticker', 'underlying': 'underlying_ticker',
+    'date': 'data_date', 'timestamp': 'data_date', 'datetime': 'data_date',
+}
+
+
+def normalize_bars(df, ticker=None):
+    """
+    Converts raw daily OHLCV bars into underlying_prices rows.
+
+    Accepts underlying_prices column names in any case, the aliases in
+    BAR_ALIASES, and yfinance's layout with the date as the index. Rows
+    without a date or close are dropped, and duplicate dates keep the last bar.
+
+    :param ticker: Underlying ticker for bars that do not carry one.
+    :return: DataFrame with exactly BAR_COLUMNS.
+    """
+    if isinstance(df.index, pd.DatetimeIndex):
+        df = df.rename_axis('data_date').reset_index()
+    df = df.rename(columns=lambda c: BAR_ALIASES.get(str(c).strip().lower(), str(c).strip().lower()))
+    df = df.loc[:, ~df.columns.duplicated()]
+    if 'underlying_ticker' not in df:
+        df['underlying_ticker'] = ticker
+
+    rows = pd.DataFrame(index=df.index)
+    rows['underlying_ticker'] = df['underlying_ticker'].astype('string').str.upper()
+    # Bars may carry a time zone or time of day; the date is what chains are keyed on
+    dates = pd.to_datetime(df['data_date'], errors='coerce')
+    rows['data_date'] = dates.dt.tz_localize(None).dt.date if dates.dt.tz is not None else dates.dt.date
+    for name in BAR_COLUMNS[2:]:
+        rows[name] = pd.to_numeric(df[name], errors='coerce') if name in df else np.nan
+    rows['volume'] = rows['volume'].round().astype('Int64')
+
+    rows = rows.dropna(subset=BAR_KEY + ['close'])
+    return rows.drop_duplicates(subset=BAR_KEY, keep='last').reset_index(drop=True)
+
+
+def read_bars_file(path, ticker=None):
+    """Reads a CSV or Parquet file of daily bars; the ticker defaults to the file name, e.g. SPY.csv."""
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    if ticker is None:
+        ticker = os.path.basename(path).split('.')[0]
+    return normalize_bars(df, ticker=ticker)
+
+
+def upsert_underlying_prices(rows, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Inserts normalized bars, overwriting bars already stored for the same ticker and date.
+
+    The caller commits.
+
+    :param rows: DataFrame from `normalize_bars`.
+    :return: The number of bars written.
+    """
+    if rows.empty:
+        return 0
+    dialect_name = db.session.get_bind().dialect.name
+    dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(dialect_name)
+    if dialect is None:
+        raise ValueError(f"Bulk upsert is not supported on {dialect_name}.")
+
+    statement = dialect.insert(UnderlyingPrice.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=BAR_KEY,
+        set_={c: statement.excluded[c] for c in BAR_COLUMNS if c not in BAR_KEY}
+    )
+    records = rows[BAR_COLUMNS].astype(object).where(rows[BAR_COLUMNS].notna(), None).to_dict('records')
+    for i in range(0, len(records), batch_size):
+        db.session.execute(statement, records[i:i + batch_size])
+    return len(records)
+
+
+def ingest_underlying_prices(ticker, rows, backfill=False, risk_free_rate=0.02):
+    """
+    Stores a ticker's daily bars and records the data change.
+
+    Stored results priced against the previous spot series are retired via
+    the data version. With `backfill`, Greeks of the bars' date range are
+    re-solved against the new closes.
+
+    :return: The number of bars written.
+    """
+    rows = rows[rows['underlying_ticker'] == ticker]
+    try:
+        written = upsert_underlying_prices(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if written:
+        chain_data_changed(ticker)
+        if backfill:
+            backfill_greeks(ticker, rows['data_date'].min(), rows['data_date'].max(), risk_free_rate)
+    return written
+
+
+# --- Derived daily implied volatility ---
+
+# Trading days in the trailing window of IV rank and percentile, and the
+# fewest with a 30-day IV before either is reported
+IV_RANK_WINDOW = 252
+IV_RANK_MIN_PERIODS = 20
+# Shortest expiry counted as the front month for ATM IV, and the constant maturity
+ATM_MIN_DTE = 7
+CONSTANT_MATURITY_DTE = 30
+IV_SUMMARY_COLUMNS = ['data_date', 'atm_iv', 'iv_30d']
+
+
+def daily_iv_summary(chain_df, underlying_prices, risk_free_rate=0.02):
+    """
+    At-the-money and 30-day constant-maturity IV of each day in a chain.
+
+    Both are read off the day's fitted volatility surface at the underlying
+    price; the 30-day value interpolates total variance between the expiries
+    around it. Days without a price or a usable volatility are left out.
+
+    :param chain_df: Contracts with 'data_date', 'expiration_date',
+                     'strike_price', 'option_type', 'implied_volatility' and 'mid'.
+    :param underlying_prices: Series of underlying prices indexed by date.
+    :return: DataFrame with IV_SUMMARY_COLUMNS, one row per day.
+    """
+    rows = []
+    for data_date, day in chain_df.groupby('data_date', sort=True):
+        spot = underlying_prices.get(data_date, np.nan)
+        if not np.isfinite(spot):
+            continue
+        try:
+            surface = VolSurface.from_chain(day, spot, risk_free_rate)
+        except ValueError:
+            continue
+        front = surface.dte[surface.dte >= ATM_MIN_DTE]
+        rows.append({
+            'data_date': pd.Timestamp(data_date).date(),
+            'atm_iv': surface.vol(spot, front[0]) if len(front) else None,
+            'iv_30d': surface.vol(spot, CONSTANT_MATURITY_DTE),
+        })
+    return pd.DataFrame(rows, columns=IV_SUMMARY_COLUMNS)
+
+
+def rolling_iv_rank(values, window=IV_RANK_WINDOW, min_periods=IV_RANK_MIN_PERIODS):
+    """
+    IV rank and percentile of each value within its trailing window.
+
+    The window is the value and the `window - 1` before it. Rank is where the
+    value sits between the window's low (0) and high (100); percentile is
+    the share of the window's other values below it. Both are NaN where the
+    value is missing or the window holds fewer than `min_periods` values.
+
+    :return: (rank, percentile) arrays aligned with `values`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    present = np.isfinite(windows)
+    count = present.sum(axis=1)
+    low = np.where(present, windows, np.inf).min(axis=1)
+    high = np.where(present, windows, -np.inf).max(axis=1)
+    below = (present & (windows < values[:, None])).sum(axis=1)
+
+    valid = np.isfinite(values) & (count >= min_periods)
+    spread = np.where(high > low, high - low, 1.0)
+    rank = np.where(valid, np.where(high > low, (values - low) / spread * 100, 0.0), np.nan)
+    percentile = np.where(valid, below / np.maximum(count - 1, 1) * 100, np.nan)
+    return rank, percentile
+
+
+def refresh_iv_ranks(ticker, start_date, end_date, window=IV_RANK_WINDOW):
+    """
+    Recomputes the stored IV rank and percentile affected by a change to a date range.
+
+    Those are the range's days and the `window - 1` stored days after it,
+    whose trailing windows reach into the range; the `window - 1` days
+    before it are read as context only.
+
+    :return: The number of days updated.
+    """
+    base = db.session.query(IVHistory.id, IVHistory.data_date, IVHistory.iv_30d).filter(
+        IVHistory.underlying_ticker == ticker)
+    before = base.filter(IVHistory.data_date < start_date).order_by(IVHistory.data_date.desc()).limit(window - 1).all()
+    changed = base.filter(IVHistory.data_date >= start_date, IVHistory.data_date <= end_date).order_by(IVHistory.data_date).all()
+    after = base.filter(IVHistory.data_date > end_date).order_by(IVHistory.data_date).limit(window - 1).all()
+    rows = before[::-1] + changed + after
+    if not changed and not after:
+        return 0
+
+    rank, percentile = rolling_iv_rank([np.nan if row.iv_30d is None else row.iv_30d for row in rows], window)
+    records = [
+        {'id': row.id,
+         'iv_rank': None if np.isnan(r) else round(float(r), 4),
+         'iv_percentile': None if np.isnan(p) else round(float(p), 4)}
+        for row, r, p in zip(rows[len(before):], rank[len(before):], percentile[len(before):])
+    ]
+    db.session.bulk_update_mappings(IVHistory, records)
+    return len(records)
+
+
+def update_iv_history(ticker, summary):
+    """
+    Stores daily IV summaries and refreshes the ranks and percentiles they affect.
+
+    :param summary: DataFrame from `daily_iv_summary`.
+    :return: The number of days written.
+    """
+    if summary.empty:
+        return 0
+    dialect_name = db.session.get_bind().dialect.name
+    dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(dialect_name)
+    if dialect is None:
+        raise ValueError(f"Bulk upsert is not supported on {dialect_name}.")
+
+    rows = summary.assign(underlying_ticker=ticker)
+    statement = dialect.insert(IVHistory.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['underlying_ticker', 'data_date'],
+        set_={c: statement.excluded[c] for c in ('atm_iv', 'iv_30d')}
+    )
+    columns = ['underlying_ticker'] + IV_SUMMARY_COLUMNS
+    db.session.execute(statement, rows[columns].astype(object).where(rows[columns].notna(), None).to_dict('records'))
+    refresh_iv_ranks(ticker, rows['data_date'].min(), rows['data_date'].max())
+    db.session.commit()
+    return len(rows)
+
+
+def build_iv_history(ticker, start_date, end_date, risk_free_rate=0.02, batch_days=20):
+    """
+    Derives iv_history for a date range from the implied volatilities already stored.
+
+    For data loaded before iv_history existed, or with --skip-greeks; a
+    Greeks backfill refreshes the history on its own.
+
+    :return: The number of days written.
+    """
+    date_rows = db.session.query(OptionData.data_date).filter(
+        OptionData.underlying_ticker == ticker,
+        OptionData.data_date >= start_date,
+        OptionData.data_date <= end_date
+    ).distinct().order_by(OptionData.data_date).all()
+    dates = [row[0] for row in date_rows]
+
+    summaries = []
+    for i in range(0, len(dates), batch_days):
+        batch = dates[i:i + batch_days]
+        query = db.session.query(
+            OptionData.data_date, OptionData.expiration_date, OptionData.strike_price, OptionData.option_type,
+            OptionData.bid, OptionData.ask, OptionData.last_price, OptionData.implied_volatility
+        ).filter(
+            OptionData.underlying_ticker == ticker,
+            OptionData.data_date >= batch[0],
+            OptionData.data_date <= batch[-1]
+        )
+        chain = pd.read_sql(query.statement, db.session.bind)
+        if chain.empty:
+            continue
+        chain['data_date'] = pd.to_datetime(chain['data_date'])
+        chain['expiration_date'] = pd.to_datetime(chain['expiration_date'])
+        chain['T'] = (chain['expiration_date'] - chain['data_date']).dt.days / 365.0
+        chain['mid'] = mid_prices(chain)
+        stored_prices = load_underlying_prices(ticker, batch[0], batch[-1])
+        summaries.append(daily_iv_summary(chain, underlying_prices_by_date(chain, stored_prices, risk_free_rate),
+                                          risk_free_rate))
+
+    written = update_iv_history(ticker, pd.concat(summaries, ignore_index=True)) if summaries else 0
+    if written:
+        # Backtests with IV entry rules see the new history
+        chain_data_changed(ticker)
+    return written
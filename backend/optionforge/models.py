@@ -3,7 +3,8 @@
 import datetime
 import jwt
 from flask import current_app
-from optionforge import db, bcrypt
+from optionforge import db
+from optionforge.passwords import password_hasher
 
 class User(db.Model):
     """User model for authentication"""
@@ -17,13 +18,15 @@ class User(db.Model):
     strategies = db.relationship('Strategy', backref='owner', lazy=True)
 
     def __init__(self, email, password, is_admin=False):
+        """:raises PasswordHasherBusy: If too many passwords are being hashed already."""
         self.email = email
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_hasher().hash(password)
         self.registered_on = datetime.datetime.utcnow()
         self.is_admin = is_admin
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """:raises PasswordHasherBusy: If too many passwords are being checked already."""
+        return password_hasher().check(self.password_hash, password)
 
     def encode_auth_token(self):
         """Generates the Auth Token"""
@@ -83,21 +86,89 @@ class Backtest(db.Model):
     end_date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='PENDING') # PENDING, RUNNING, COMPLETED, FAILED
     celery_task_id = db.Column(db.String(100), nullable=True)
+    # Content hash of what determines the results (see optionforge.results.result_key);
+    # identical requests reuse or attach to the run with the same key
+    result_key = db.Column(db.String(64), nullable=True, index=True)
+    # The result key while this row's own task is in flight, cleared when it
+    # finishes; unique, so concurrent identical launches start a single run
+    run_key = db.Column(db.String(64), nullable=True, unique=True)
+    batch_id = db.Column(db.Integer, db.ForeignKey('backtest_batches.id'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
-    # Stores the detailed results as JSON
+    # Stores the summary results as JSON; daily series live in BacktestSeries
     results = db.Column(db.JSON, nullable=True) 
+    series = db.relationship('BacktestSeries', backref='backtest', uselist=False, lazy=True, cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Backtest {self.id} for Strategy {self.strategy_id}>'
 
 
+class Simulation(db.Model):
+    """Stores a Monte Carlo risk simulation of a strategy from an as-of date."""
+    __tablename__ = 'simulations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    strategy_id = db.Column(db.Integer, db.ForeignKey('strategies.id'), nullable=False, index=True)
+    as_of_date = db.Column(db.Date, nullable=False)
+    # Model, path count, horizon, seed and confidence levels as submitted
+    parameters = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='PENDING') # PENDING, RUNNING, COMPLETED, FAILED
+    celery_task_id = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    # P&L distribution, VaR and CVaR (see optionforge.backtester.montecarlo)
+    results = db.Column(db.JSON, nullable=True)
+    strategy = db.relationship('Strategy', backref=db.backref('simulations', lazy='dynamic'))
+
+    def __repr__(self):
+        return f'<Simulation {self.id} for Strategy {self.strategy_id}>'
+
+
+class BacktestBatch(db.Model):
+    """Groups backtests submitted together, for aggregate status."""
+    __tablename__ = 'backtest_batches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    backtests = db.relationship('Backtest', backref='batch', lazy=True)
+
+    def __repr__(self):
+        return f'<BacktestBatch {self.id} for User {self.user_id}>'
+
+
+class BacktestSeries(db.Model):
+    """Stores a backtest's daily series as compressed columnar arrays."""
+    __tablename__ = 'backtest_series'
+
+    id = db.Column(db.Integer, primary_key=True)
+    backtest_id = db.Column(db.Integer, db.ForeignKey('backtests.id'), nullable=False, unique=True, index=True)
+    # np.savez_compressed archive of equal-length arrays (see optionforge.results)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<BacktestSeries for Backtest {self.backtest_id}>'
+
+
+class ChainDataVersion(db.Model):
+    """Counter bumped whenever a ticker's stored option data changes."""
+    __tablename__ = 'chain_data_versions'
+
+    underlying_ticker = db.Column(db.String(10), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ChainDataVersion {self.underlying_ticker} v{self.version}>'
+
+
 class OptionData(db.Model):
     """Stores historical options chain data."""
     __tablename__ = 'option_data'
 
     id = db.Column(db.Integer, primary_key=True)
-    underlying_ticker = db.Column(db.String(10), nullable=False, index=True)
+    # Ticker lookups use the composite indexes below, which all lead with it
+    underlying_ticker = db.Column(db.String(10), nullable=False)
     data_date = db.Column(db.Date, nullable=False, index=True)
     expiration_date = db.Column(db.Date, nullable=False)
     strike_price = db.Column(db.Float, nullable=False)
@@ -115,8 +186,64 @@ class OptionData(db.Model):
     theta = db.Column(db.Float, nullable=True)
     vega = db.Column(db.Float, nullable=True)
 
-    __table_args__ = (db.UniqueConstraint('underlying_ticker', 'data_date', 'expiration_date', 'strike_price', 'option_type', name='_unique_option_contract'),)
+    __table_args__ = (
+        # Also serves chain lookups by ticker + date in expiry/strike order
+        db.UniqueConstraint('underlying_ticker', 'data_date', 'expiration_date', 'strike_price', 'option_type', name='_unique_option_contract'),
+        # PostgreSQL: covers the backtest engine's ticker + date range scan
+        # (ENGINE_COLUMNS) so it runs as an index-only scan without heap fetches
+        db.Index('ix_option_data_engine_covering', 'underlying_ticker', 'data_date', 'expiration_date',
+                 'strike_price', 'option_type',
+                 postgresql_include=['bid', 'ask', 'last_price', 'implied_volatility', 'delta']).ddl_if(dialect='postgresql'),
+    )
 
     def __repr__(self):
         return f'<OptionData {self.underlying_ticker} {self.data_date} K={self.strike_price} {self.option_type}>'
 
+
+
+class UnderlyingPrice(db.Model):
+    """Stores daily OHLCV bars of the underlyings; `close` is the spot the engine prices against."""
+    __tablename__ = 'underlying_prices'
+
+    id = db.Column(db.Integer, primary_key=True)
+    underlying_ticker = db.Column(db.String(10), nullable=False)
+    data_date = db.Column(db.Date, nullable=False)
+    open = db.Column(db.Float, nullable=True)
+    high = db.Column(db.Float, nullable=True)
+    low = db.Column(db.Float, nullable=True)
+    # Not adjusted for dividends, like the strikes it is compared with
+    close = db.Column(db.Float, nullable=False)
+    volume = db.Column(db.BigInteger, nullable=True)
+
+    __table_args__ = (
+        # Also serves the engine's ticker + date range lookup
+        db.UniqueConstraint('underlying_ticker', 'data_date', name='_unique_underlying_bar'),
+    )
+
+    def __repr__(self):
+        return f'<UnderlyingPrice {self.underlying_ticker} {self.data_date} {self.close}>'
+
+
+class IVHistory(db.Model):
+    """Stores a ticker's daily implied volatility summary, derived from its stored chains."""
+    __tablename__ = 'iv_history'
+
+    id = db.Column(db.Integer, primary_key=True)
+    underlying_ticker = db.Column(db.String(10), nullable=False)
+    data_date = db.Column(db.Date, nullable=False)
+    # At-the-money IV of the front expiry at least a week out
+    atm_iv = db.Column(db.Float, nullable=True)
+    # At-the-money IV interpolated to a constant 30 days to expiry
+    iv_30d = db.Column(db.Float, nullable=True)
+    # Where iv_30d sits in its trailing 252-day range, and the share of those
+    # days with a lower iv_30d, both 0-100 (see optionforge.ingest.rolling_iv_rank)
+    iv_rank = db.Column(db.Float, nullable=True)
+    iv_percentile = db.Column(db.Float, nullable=True)
+
+    __table_args__ = (
+        # Also serves the engine's ticker + date range lookup
+        db.UniqueConstraint('underlying_ticker', 'data_date', name='_unique_iv_history_day'),
+    )
+
+    def __repr__(self):
+        return f'<IVHistory {self.underlying_ticker} {self.data_date} {self.iv_30d}>'
@@ -0,0 +1,64 @@
+# backend/optionforge/passwords.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from optionforge import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full; the request should be retried later."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small thread pool with a bounded queue.
+
+    bcrypt releases the GIL, so `workers` caps how many cores password work
+    can take from a process, whatever its number of request threads. At most
+    `max_queued` further calls wait for a worker; beyond that calls fail at
+    once with PasswordHasherBusy instead of piling up behind a login burst.
+
+    Callers block in their request thread while they run or wait, so
+    `workers + max_queued`, plus the open progress streams (see
+    PROGRESS_STREAMS_PER_PROCESS), must be below the server's request threads
+    per process; otherwise a burst occupies every thread before anyone is refused.
+    """
+
+    def __init__(self, workers=1, max_queued=1):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(workers + max_queued)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def check(self, password_hash, password):
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+
+def password_hasher(app=None):
+    """
+    The app's password hasher, created on first use.
+
+    Sized by PASSWORD_HASH_WORKERS and PASSWORD_HASH_MAX_QUEUED; the bcrypt
+    work factor is Flask-Bcrypt's BCRYPT_LOG_ROUNDS.
+    """
+    app = app or current_app._get_current_object()
+    hasher = app.extensions.get('password_hasher')
+    if hasher is None:
+        hasher = app.extensions.setdefault('password_hasher', PasswordHasher(
+            workers=app.config.get('PASSWORD_HASH_WORKERS', 1),
+            max_queued=app.config.get('PASSWORD_HASH_MAX_QUEUED', 1)
+        ))
+    return hasher
@@ -0,0 +1,172 @@
+# backend/optionforge/progress.py
+
+import json
+import logging
+import threading
+import time
+import redis
+from .caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# States after which a backtest publishes nothing more
+TERMINAL_STATES = ('COMPLETED', 'FAILED')
+
+
+def backtest_channel(task_id):
+    """
+    Pub/sub channel carrying a run's progress messages.
+
+    Keyed by Celery task id, so every Backtest attached to a run shares it.
+    """
+    return f'backtest-progress:{task_id}'
+
+
+class RedisProgressBroker:
+    """
+    Progress pub/sub over Redis, shared by Celery workers and API processes.
+
+    Every message is published on the channel and also stored as the
+    channel's latest state (expiring after `retention` seconds), so a client
+    that connects mid-run starts from the current progress.
+    """
+
+    def __init__(self, url, retention=3600):
+        self.redis = redis.Redis.from_url(url)
+        self.retention = retention
+
+    def publish(self, channel, message):
+        payload = json.dumps(message)
+        pipeline = self.redis.pipeline()
+        pipeline.set(f'{channel}:latest', payload, ex=self.retention)
+        pipeline.publish(channel, payload)
+        pipeline.execute()
+
+    def latest(self, channel):
+        """The last message published on a channel, or None."""
+        payload = self.redis.get(f'{channel}:latest')
+        return json.loads(payload) if payload else None
+
+    def listen(self, channel, timeout):
+        """
+        Subscribes to a channel immediately and returns an iterator over its messages.
+
+        The iterator yields None whenever `timeout` seconds pass without a
+        message, so callers can send keep-alives. Close it to unsubscribe.
+        """
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+
+        def messages():
+            try:
+                while True:
+                    message = pubsub.get_message(timeout=timeout)
+                    yield json.loads(message['data']) if message else None
+            finally:
+                pubsub.close()
+        return messages()
+
+
+class LocalProgressBroker:
+    """
+    In-process stand-in for RedisProgressBroker.
+
+    Only reaches listeners in the publishing process, which is enough for
+    development servers and eagerly executed Celery tasks. Listeners that fall
+    behind skip to the latest message.
+    """
+
+    def __init__(self, retention=3600, max_channels=1024):
+        # channel -> (version, message)
+        self._channels = TTLCache(max_entries=max_channels, ttl=retention)
+        self._condition = threading.Condition()
+
+    def _version(self, channel):
+        return self._channels.get(channel, (0, None))[0]
+
+    def publish(self, channel, message):
+        with self._condition:
+            self._channels.set(channel, (self._version(channel) + 1, message))
+            self._condition.notify_all()
+
+    def latest(self, channel):
+        return self._channels.get(channel, (0, None))[1]
+
+    def listen(self, channel, timeout):
+        """See RedisProgressBroker.listen."""
+        with self._condition:
+            seen = self._version(channel)
+
+        def messages():
+            nonlocal seen
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._version(channel) != seen, timeout)
+                    version, message = self._channels.get(channel, (0, None))
+                changed = version != seen
+                seen = version
+                yield message if changed else None
+        return messages()
+
+
+def progress_broker(app):
+    """
+    The app's progress broker, created on first use.
+
+    PROGRESS_BROKER selects 'redis' (default, at PROGRESS_REDIS_URL) or 'local'.
+    """
+    broker = app.extensions.get('progress_broker')
+    if broker is None:
+        retention = app.config.get('PROGRESS_RETENTION', 3600)
+        if app.config.get('PROGRESS_BROKER', 'redis') == 'local':
+            broker = LocalProgressBroker(retention)
+        else:
+            broker = RedisProgressBroker(app.config['PROGRESS_REDIS_URL'], retention)
+        broker = app.extensions.setdefault('progress_broker', broker)
+    return broker
+
+
+class ProgressPublisher:
+    """
+    Engine progress_callback that pushes updates to a progress broker.
+
+    Updates carrying live metrics arrive every few simulated days and are
+    throttled to one per `min_interval` seconds; milestone updates without
+    metrics always go out. `on_milestone(percentage, message)` is called only
+    when progress enters a new 10% step, e.g. to keep a coarse Celery state
+    without a result-backend write per update.
+
+    Publishing is best-effort: a Redis error is logged and the update dropped,
+    so a broker outage never fails the run it reports on.
+    """
+
+    def __init__(self, broker, task_id, backtest_id, min_interval=0.25, on_milestone=None):
+        self.broker = broker
+        self.backtest_id = backtest_id
+        self.channel = backtest_channel(task_id)
+        self.min_interval = min_interval
+        self.on_milestone = on_milestone
+        self._last_sent = float('-inf')
+        self._last_step = None
+
+    def __call__(self, percentage, message, metrics=None):
+        step = percentage // 10
+        if self.on_milestone and step != self._last_step:
+            self._last_step = step
+            try:
+                self.on_milestone(percentage, message)
+            except redis.RedisError as e:
+                logger.warning("Dropped milestone of backtest %s: %s", self.backtest_id, e)
+
+        now = time.monotonic()
+        if metrics is not None and now - self._last_sent < self.min_interval:
+            return
+        self._last_sent = now
+        self.publish('PROGRESS', current=percentage, status=message, metrics=metrics)
+
+    def publish(self, state, **fields):
+        """Publishes a message in the given state, e.g. a terminal 'COMPLETED' or 'FAILED'."""
+        try:
+            self.broker.publish(self.channel, dict(fields, backtest_id=self.backtest_id, state=state, total=100))
+        except redis.RedisError as e:
+            logger.warning("Dropped %s progress of backtest %s: %s", state, self.backtest_id, e)
@@ -0,0 +1,52 @@
+# backend/optionforge/providers.py
+
+import datetime
+import pandas as pd
+import yfinance as yf
+from .ingest import OPTION_COLUMNS, normalize_chain, normalize_bars
+
+
+def fetch_yfinance_chain(ticker):
+    """
+    Fetches the current option chain of a ticker from yfinance.
+
+    yfinance only serves the chain as listed today, so this is a single
+    snapshot dated today; historical chains come from file dumps.
+
+    :return: Normalized option_data rows (see `normalize_chain`).
+    """
+    source = yf.Ticker(ticker)
+    frames = []
+    for expiration in source.options:
+        chain = source.option_chain(expiration)
+        df = pd.concat([chain.calls, chain.puts], ignore_index=True)
+        df['expiration_date'] = expiration
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=OPTION_COLUMNS)
+    return normalize_chain(pd.concat(frames, ignore_index=True), ticker=ticker, data_date=datetime.date.today())
+
+
+def yfinance_unit(ticker):
+    """An ingest unit for today's yfinance snapshot of a ticker."""
+    return f'yfinance:{ticker}:{datetime.date.today().isoformat()}', lambda: fetch_yfinance_chain(ticker)
+
+
+def fetch_yfinance_bars(ticker, start_date=None, end_date=None):
+    """
+    Fetches daily OHLCV bars of a ticker from yfinance.
+
+    Closes are split-adjusted but not dividend-adjusted, matching listed strikes.
+
+    :param start_date: First date to fetch; the whole history if None.
+    :param end_date: Last date to fetch (inclusive); today if None.
+    :return: Normalized underlying_prices rows (see `normalize_bars`).
+    """
+    if start_date is None:
+        window = {'period': 'max'}
+    else:
+        # yfinance's end bound is exclusive
+        end = (end_date or datetime.date.today()) + datetime.timedelta(days=1)
+        window = {'start': start_date, 'end': end}
+    history = yf.Ticker(ticker).history(interval='1d', auto_adjust=False, actions=False, **window)
+    return normalize_bars(history, ticker=ticker)
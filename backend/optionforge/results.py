@@ -0,0 +1,150 @@
+# backend/optionforge/results.py
+
+import datetime
+import hashlib
+import io
+import json
+import numpy as np
+from .models import BacktestSeries
+from .backtester.engine import ENGINE_VERSION
+
+# Daily series kept as compressed arrays instead of JSON records, with the
+# name of the value field each one uses in the API's record format
+SERIES_FIELDS = {'daily_pnl': 'pnl', 'underlying_price': 'price'}
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def pack_series(series):
+    """Serializes a dict of equal-length arrays into a compressed .npz blob."""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **series)
+    return buffer.getvalue()
+
+
+def unpack_series(blob):
+    """Inverse of `pack_series`."""
+    with np.load(io.BytesIO(blob)) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def _records_to_arrays(records, value_field):
+    dates = np.array([(datetime.date.fromisoformat(r['date']) - _EPOCH).days for r in records], dtype=np.int32)
+    values = np.array([r[value_field] for r in records], dtype=np.float64)
+    return dates, values
+
+
+def split_results(results):
+    """
+    Separates engine results into a small JSON summary and a compressed series blob.
+
+    Every daily series is aligned to one int32 date axis (days since the
+    epoch), with NaN where a series has no value for a date.
+
+    :return: (summary dict for Backtest.results, blob for BacktestSeries.data or
+             None if the results carry no daily series)
+    """
+    summary = {key: value for key, value in results.items() if key not in SERIES_FIELDS}
+    present = {name: results[name] for name in SERIES_FIELDS if results.get(name)}
+    if not present:
+        return summary, None
+
+    arrays = {name: _records_to_arrays(records, SERIES_FIELDS[name]) for name, records in present.items()}
+    dates = np.unique(np.concatenate([d for d, _ in arrays.values()]))
+    series = {'date': dates}
+    for name, (series_dates, values) in arrays.items():
+        aligned = np.full(len(dates), np.nan)
+        aligned[np.searchsorted(dates, series_dates)] = values
+        series[name] = aligned
+    return summary, pack_series(series)
+
+
+def load_series(backtest):
+    """
+    Returns a backtest's daily series as a dict of arrays keyed by 'date' and series name.
+
+    Falls back to the inline JSON records of backtests stored before results
+    were split out; returns None if those records are in an unrecognized layout.
+    """
+    if backtest.series:
+        return unpack_series(backtest.series.data)
+
+    results = backtest.results or {}
+    inline = {name: results[name] for name in SERIES_FIELDS if results.get(name)}
+    if not inline:
+        return {'date': np.array([], dtype=np.int32)}
+    try:
+        return unpack_series(split_results(inline)[1])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def slice_series(series, start_date=None, end_date=None, max_points=None):
+    """
+    Restricts series to a date range and downsamples them for charting.
+
+    Downsampling keeps evenly spaced points including the first and last day.
+    """
+    dates = series['date']
+    lo = np.searchsorted(dates, (start_date - _EPOCH).days, side='left') if start_date else 0
+    hi = np.searchsorted(dates, (end_date - _EPOCH).days, side='right') if end_date else len(dates)
+    keep = np.arange(lo, hi)
+    if max_points and len(keep) > max_points:
+        keep = keep[np.unique(np.linspace(0, len(keep) - 1, max_points).round().astype(int))]
+    return {name: values[keep] for name, values in series.items()}
+
+
+def series_to_json(series, names, columnar=False):
+    """
+    Converts sliced series into the API response format.
+
+    By default each series is a list of {'date', <value>} records as before;
+    `columnar` returns a shared 'dates' list plus one value list per series.
+    """
+    date_strings = [(_EPOCH + datetime.timedelta(days=int(d))).isoformat() for d in series['date']]
+    if columnar:
+        output = {'dates': date_strings}
+        for name in names:
+            values = series.get(name)
+            output[name] = [None if np.isnan(v) else round(float(v), 2) for v in values] if values is not None else []
+        return output
+
+    output = {}
+    for name in names:
+        values = series.get(name)
+        if values is None:
+            output[name] = []
+            continue
+        value_field = SERIES_FIELDS[name]
+        output[name] = [
+            {'date': d, value_field: round(float(v), 2)}
+            for d, v in zip(date_strings, values) if not np.isnan(v)
+        ]
+    return output
+
+
+def result_key(definition, start_date, end_date, data_version):
+    """
+    Content hash identifying a backtest's results.
+
+    Covers everything the results depend on: the strategy definition (as
+    canonical JSON), the date range, ENGINE_VERSION and the version of the
+    underlying's stored option data.
+    """
+    payload = json.dumps({
+        'definition': definition,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'engine_version': ENGINE_VERSION,
+        'data_version': data_version,
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def copy_results(target, source):
+    """Completes a Backtest with the stored results of an identical one."""
+    target.results = source.results
+    if source.series is not None:
+        target.series = BacktestSeries(data=source.series.data)
+    target.status = 'COMPLETED'
+    target.completed_at = datetime.datetime.utcnow()
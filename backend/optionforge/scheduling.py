@@ -0,0 +1,77 @@
+# backend/optionforge/scheduling.py
+
+import datetime
+import numpy as np
+from .caching import TTLCache
+from .models import db, OptionData
+from .backtester.montecarlo import CALENDAR_DAYS_PER_STEP, MAX_STEPS
+
+# Celery queues for backtest runs, by estimated cost. Interactive runs get
+# their own workers so they never wait behind multi-year sweeps.
+INTERACTIVE_QUEUE = 'backtests_interactive'
+STANDARD_QUEUE = 'backtests'
+BULK_QUEUE = 'backtests_bulk'
+
+# Contracts listed per day by ticker; listings change slowly
+_chain_sizes = TTLCache(max_entries=256, ttl=3600)
+
+
+def chain_size(ticker):
+    """Number of contracts listed for a ticker on its most recent stored day."""
+    size = _chain_sizes.get(ticker)
+    if size is None:
+        last_date = db.session.query(db.func.max(OptionData.data_date)).filter(
+            OptionData.underlying_ticker == ticker
+        ).scalar()
+        size = 0 if last_date is None else db.session.query(db.func.count(OptionData.id)).filter(
+            OptionData.underlying_ticker == ticker,
+            OptionData.data_date == last_date
+        ).scalar()
+        _chain_sizes.set(ticker, size)
+    return size
+
+
+def estimate_backtest_cost(definition, start_date, end_date, combinations=1):
+    """
+    Rough cost of a run: trading days x legs x contracts per day x combinations.
+
+    Only the relative size matters; it is compared against the thresholds in
+    `backtest_queue`.
+    """
+    trading_days = int(np.busday_count(start_date, end_date + datetime.timedelta(days=1)))
+    legs = max(1, len(definition.get('legs', [])))
+    contracts = max(1, chain_size(definition.get('underlying_ticker', 'SPY')))
+    return max(0, trading_days) * legs * contracts * combinations
+
+
+def backtest_queue(definition, start_date, end_date, config, combinations=1):
+    """
+    Picks the Celery queue for a run from its estimated cost.
+
+    Runs up to BACKTEST_INTERACTIVE_MAX_COST go to the interactive queue, runs
+    from BACKTEST_BULK_MIN_COST to the bulk queue, the rest to the standard one.
+    """
+    cost = estimate_backtest_cost(definition, start_date, end_date, combinations)
+    if cost <= config.get('BACKTEST_INTERACTIVE_MAX_COST', 2000000):
+        return INTERACTIVE_QUEUE
+    if cost >= config.get('BACKTEST_BULK_MIN_COST', 20000000):
+        return BULK_QUEUE
+    return STANDARD_QUEUE
+
+
+def simulation_queue(definition, n_paths, horizon_days, config):
+    """
+    Picks the Celery queue for a Monte Carlo run.
+
+    Its cost is paths x steps x legs, with steps counted as the engine does:
+    up to the first leg expiry, the horizon if shorter, and at most
+    MAX_STEPS. Runs from SIMULATION_BULK_MIN_COST go to the bulk queue, the
+    rest to the standard one.
+    """
+    legs = definition.get('legs', [])
+    steps = int(np.ceil(min((leg.get('dte', 30) for leg in legs), default=30) / CALENDAR_DAYS_PER_STEP))
+    steps = min(horizon_days or steps, steps, MAX_STEPS)
+    cost = n_paths * max(1, steps) * max(1, len(legs))
+    if cost >= config.get('SIMULATION_BULK_MIN_COST', 50000000):
+        return BULK_QUEUE
+    return STANDARD_QUEUE
@@ -1,14 +1,30 @@
 # backend/optionforge/tasks.py
 
 from . import celery, create_app
-from .models import db, Backtest
+from .models import db, Backtest, BacktestSeries, Simulation
 from .backtester.engine import BacktestEngine
+from .backtester.sweep import SweepEngine
+from .backtester.parallel import ParallelBacktestEngine
+from .backtester.montecarlo import MonteCarloEngine
+from .backtester.datasource import chain_source_from_config
+from .ingest import backfill_greeks
+from .results import split_results, copy_results
+from .progress import progress_broker, ProgressPublisher
 import datetime
 
 # Create a Flask app context for the celery worker
 app = create_app()
 app.app_context().push()
 
+def _attached_backtests(task_id, backtest):
+    """Backtests of identical requests that attached to this run instead of starting their own."""
+    return Backtest.query.filter(
+        Backtest.celery_task_id == task_id,
+        Backtest.id != backtest.id,
+        Backtest.status.in_(('PENDING', 'RUNNING'))
+    ).all()
+
+
 @celery.task(bind=True)
 def run_backtest_task(self, backtest_id):
     """
@@ -19,38 +35,180 @@ def run_backtest_task(self, backtest_id):
         self.update_state(state='FAILURE', meta={'exc_type': 'NotFound', 'exc_message': 'Backtest ID not found.'})
         return
 
+    # Live progress goes to the pub/sub channel; Celery's state only tracks 10% steps
+    progress = ProgressPublisher(
+        progress_broker(app), self.request.id, backtest_id,
+        on_milestone=lambda p, m: self.update_state(state='PROGRESS', meta={'current': p, 'total': 100, 'status': m})
+    )
+
     try:
         # Update status in DB
         backtest.status = 'RUNNING'
         db.session.commit()
         self.update_state(state='STARTED', meta={'current': 0, 'total': 100, 'status': 'Initializing...'})
+        progress.publish('RUNNING', current=0, status='Initializing...')
 
-        # Initialize the backtesting engine
-        engine = BacktestEngine(
+        # Initialize the backtesting engine, sharded across processes if configured
+        workers = app.config.get('BACKTEST_WORKERS', 1)
+        engine_kwargs = {'workers': workers} if workers > 1 else {}
+        engine_class = ParallelBacktestEngine if workers > 1 else BacktestEngine
+        engine = engine_class(
             strategy_definition=backtest.strategy.definition,
             start_date=backtest.start_date,
             end_date=backtest.end_date,
             # Pass a progress update callback to the engine
-            progress_callback=lambda p, m: self.update_state(state='PROGRESS', meta={'current': p, 'total': 100, 'status': m})
+            progress_callback=progress,
+            data_source=chain_source_from_config(app.config),
+            **engine_kwargs
         )
         
         # Run the backtest
         results = engine.run()
 
-        # Store results and update status
-        backtest.results = results
+        # Store the summary as JSON and the daily series as a compressed blob
+        summary, series_blob = split_results(results)
+        backtest.results = summary
+        if series_blob is not None:
+            backtest.series = BacktestSeries(data=series_blob)
         backtest.status = 'COMPLETED'
         backtest.completed_at = datetime.datetime.utcnow()
+        backtest.run_key = None
+        for follower in _attached_backtests(self.request.id, backtest):
+            copy_results(follower, backtest)
         db.session.commit()
 
-        return {'current': 100, 'total': 100, 'status': 'Task completed!', 'result': backtest.id}
-
     except Exception as e:
+        db.session.rollback()
         backtest.status = 'FAILED'
+        backtest.run_key = None
+        for follower in _attached_backtests(self.request.id, backtest):
+            follower.status = 'FAILED'
         db.session.commit()
+        progress.publish('FAILED', status=str(e))
         # Log the exception
         print(f"Backtest task {backtest_id} failed: {e}")
         self.update_state(state='FAILURE', meta={'exc_type': type(e).__name__, 'exc_message': str(e)})
         # Re-raise the exception so Celery knows it failed
         raise e
 
+    # Published only once the status is committed, outside the handler that records failures
+    progress.publish('COMPLETED', current=100, status='Task completed!', metrics=summary.get('summary_metrics'))
+    return {'current': 100, 'total': 100, 'status': 'Task completed!', 'result': backtest.id}
+
+
+@celery.task(bind=True)
+def run_sweep_task(self, backtest_id, parameters, rank_by='sharpe_ratio'):
+    """
+    Celery task to execute a parameter sweep of a strategy in a single pass over the data.
+    """
+    backtest = Backtest.query.get(backtest_id)
+    if not backtest:
+        self.update_state(state='FAILURE', meta={'exc_type': 'NotFound', 'exc_message': 'Backtest ID not found.'})
+        return
+
+    progress = ProgressPublisher(
+        progress_broker(app), self.request.id, backtest_id,
+        on_milestone=lambda p, m: self.update_state(state='PROGRESS', meta={'current': p, 'total': 100, 'status': m})
+    )
+
+    try:
+        backtest.status = 'RUNNING'
+        db.session.commit()
+        self.update_state(state='STARTED', meta={'current': 0, 'total': 100, 'status': 'Initializing...'})
+        progress.publish('RUNNING', current=0, status='Initializing...')
+
+        engine = SweepEngine(
+            template=backtest.strategy.definition,
+            parameters=parameters,
+            start_date=backtest.start_date,
+            end_date=backtest.end_date,
+            rank_by=rank_by,
+            progress_callback=progress,
+            data_source=chain_source_from_config(app.config)
+        )
+        results = engine.run()
+
+        backtest.results = results
+        backtest.status = 'COMPLETED'
+        backtest.completed_at = datetime.datetime.utcnow()
+        db.session.commit()
+
+    except Exception as e:
+        backtest.status = 'FAILED'
+        db.session.commit()
+        progress.publish('FAILED', status=str(e))
+        print(f"Sweep task {backtest_id} failed: {e}")
+        self.update_state(state='FAILURE', meta={'exc_type': type(e).__name__, 'exc_message': str(e)})
+        raise e
+
+    progress.publish('COMPLETED', current=100, status='Task completed!', metrics=results['summary_metrics'])
+    return {'current': 100, 'total': 100, 'status': 'Task completed!', 'result': backtest.id}
+
+
+@celery.task(bind=True)
+def run_simulation_task(self, simulation_id):
+    """
+    Celery task to run a Monte Carlo risk simulation of a strategy.
+    """
+    simulation = Simulation.query.get(simulation_id)
+    if not simulation:
+        self.update_state(state='FAILURE', meta={'exc_type': 'NotFound', 'exc_message': 'Simulation ID not found.'})
+        return
+
+    milestones = {'last': -1}
+
+    def report(percentage, message):
+        # Celery's state only tracks 10% steps
+        if percentage // 10 > milestones['last']:
+            milestones['last'] = percentage // 10
+            self.update_state(state='PROGRESS', meta={'current': percentage, 'total': 100, 'status': message})
+
+    try:
+        simulation.status = 'RUNNING'
+        db.session.commit()
+        self.update_state(state='STARTED', meta={'current': 0, 'total': 100, 'status': 'Initializing...'})
+
+        parameters = simulation.parameters
+        engine = MonteCarloEngine(
+            strategy_definition=simulation.strategy.definition,
+            as_of_date=simulation.as_of_date,
+            n_paths=parameters['n_paths'],
+            horizon_days=parameters.get('horizon_days'),
+            model=parameters['model'],
+            model_params=parameters.get('model_params'),
+            seed=parameters.get('seed'),
+            confidence_levels=parameters['confidence_levels'],
+            chunk_paths=app.config.get('SIMULATION_CHUNK_PATHS', 10000),
+            workers=app.config.get('SIMULATION_WORKERS', 1),
+            progress_callback=report,
+            data_source=chain_source_from_config(app.config)
+        )
+        results = engine.run()
+
+        simulation.results = results
+        simulation.status = 'COMPLETED'
+        simulation.completed_at = datetime.datetime.utcnow()
+        db.session.commit()
+
+        return {'current': 100, 'total': 100, 'status': 'Task completed!', 'result': simulation.id}
+
+    except Exception as e:
+        db.session.rollback()
+        simulation.status = 'FAILED'
+        simulation.results = {'error': str(e)}
+        db.session.commit()
+        print(f"Simulation task {simulation_id} failed: {e}")
+        self.update_state(state='FAILURE', meta={'exc_type': type(e).__name__, 'exc_message': str(e)})
+        raise e
+
+
+@celery.task(bind=True)
+def backfill_greeks_task(self, ticker, start_date, end_date):
+    """
+    Celery task to fill implied volatility and Greeks for stored option data.
+    Dates are passed as 'YYYY-MM-DD' strings.
+    """
+    start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+    updated = backfill_greeks(ticker, start, end)
+    return {'ticker': ticker, 'rows_updated': updated}
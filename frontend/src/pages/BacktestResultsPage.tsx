@@ -14,11 +14,19 @@ interface BacktestResults {
   daily_pnl: { date: string; pnl: number }[];
 }
 
+interface BacktestProgress {
+  state: string;
+  current?: number;
+  status?: string;
+  metrics?: Record<string, number | string> | null;
+}
+
 const BacktestResultsPage = () => {
   const { backtestId } = useParams();
   const { theme } = useTheme();
   const [results, setResults] = useState<BacktestResults | null>(null);
-  const [status, setStatus] = useState<string>('LOADING'); // LOADING, POLLING, COMPLETED, FAILED
+  const [status, setStatus] = useState<string>('LOADING'); // LOADING, STREAMING, POLLING, COMPLETED, FAILED
+  const [progress, setProgress] = useState<BacktestProgress | null>(null);
 
   useEffect(() => {
     const fetchResults = async () => {
@@ -28,8 +36,8 @@ const BacktestResultsPage = () => {
         setStatus('COMPLETED');
       } catch (error: any) {
         if (error.response && error.response.status === 404) {
-          // Not complete yet, start polling
-          setStatus('POLLING');
+          // Not complete yet, follow the progress stream
+          setStatus('STREAMING');
         } else {
           console.error("Failed to fetch results", error);
           toast.error("Could not load backtest results.");
@@ -41,6 +49,36 @@ const BacktestResultsPage = () => {
     fetchResults();
   }, [backtestId]);
   
+  useEffect(() => {
+    if (status !== 'STREAMING') return;
+    const token = localStorage.getItem('authToken') ?? '';
+    const source = new EventSource(
+      `${apiClient.defaults.baseURL}/backtests/${backtestId}/events?token=${encodeURIComponent(token)}`
+    );
+    source.addEventListener('progress', async (event) => {
+      const update: BacktestProgress = JSON.parse((event as MessageEvent).data);
+      setProgress(update);
+      if (update.state === 'COMPLETED') {
+        source.close();
+        toast.success('Backtest complete! Fetching results.');
+        const resultsRes = await apiClient.get(`/backtests/${backtestId}/results`);
+        setResults(resultsRes.data);
+        setStatus('COMPLETED');
+      } else if (update.state === 'FAILED') {
+        source.close();
+        setStatus('FAILED');
+        toast.error('Backtest failed to complete.');
+      }
+    });
+    source.onerror = () => {
+      // EventSource retries on its own after a clean close; only give up on a hard failure
+      if (source.readyState === EventSource.CLOSED) {
+        setStatus('POLLING');
+      }
+    };
+    return () => source.close();
+  }, [status, backtestId]);
+
   useEffect(() => {
     let intervalId: number;
     if (status === 'POLLING') {
@@ -71,11 +109,19 @@ const BacktestResultsPage = () => {
   }, [status, backtestId]);
 
 
-  if (status === 'LOADING' || status === 'POLLING') {
+  if (status === 'LOADING' || status === 'STREAMING' || status === 'POLLING') {
     return (
         <Card>
             <h1 className="text-2xl font-bold mb-4">Backtest Results</h1>
             <p>{status === 'LOADING' ? 'Loading backtest data...' : 'Backtest in progress, waiting for completion...'}</p>
+            {progress && progress.current !== undefined && (
+              <p className="mt-2 text-sm">{progress.current}% &middot; {progress.status}</p>
+            )}
+            {progress?.metrics && (
+              <p className="mt-1 text-sm text-gray-500">
+                Sharpe {progress.metrics.sharpe_ratio} &middot; Max drawdown {progress.metrics.max_drawdown_pct}%
+              </p>
+            )}
         </Card>
     );
   }
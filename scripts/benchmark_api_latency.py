@@ -0,0 +1,109 @@
+# scripts/benchmark_api_latency.py
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+import numpy as np
+from sqlalchemy import event
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge import create_app, db
+from optionforge.models import User, Strategy, Backtest, OptionData
+
+
+def create_fixtures():
+    """A throwaway user with one completed backtest to poll."""
+    user = User(email=f'benchmark-{uuid.uuid4().hex[:12]}@example.com', password=uuid.uuid4().hex)
+    db.session.add(user)
+    db.session.flush()
+    strategy = Strategy(name='Latency benchmark', user_id=user.id,
+                        definition={'underlying_ticker': 'SPY', 'legs': []})
+    db.session.add(strategy)
+    db.session.flush()
+    today = datetime.date.today()
+    backtest = Backtest(strategy_id=strategy.id, start_date=today, end_date=today, status='COMPLETED', results={})
+    db.session.add(backtest)
+    db.session.commit()
+    return user, backtest
+
+
+def delete_fixtures(user):
+    for strategy in Strategy.query.filter_by(user_id=user.id):
+        Backtest.query.filter_by(strategy_id=strategy.id).delete()
+        db.session.delete(strategy)
+    db.session.delete(user)
+    db.session.commit()
+
+
+def chain_request(ticker):
+    """Query string of the option-chain endpoint for the ticker's latest stored day, or None."""
+    last_date = db.session.query(db.func.max(OptionData.data_date)).filter(
+        OptionData.underlying_ticker == ticker
+    ).scalar()
+    return f'/api/data/option-chain?ticker={ticker}&date={last_date}' if last_date else None
+
+
+def time_requests(client, url, headers, repeats, statements):
+    """Issues a GET `repeats` times; returns latencies in ms and SQL statements per request."""
+    client.get(url, headers=headers)
+    latencies = []
+    statements[0] = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+    return np.array(latencies), statements[0] / repeats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure authenticated polling and chain latencies with and without the token cache.")
+    parser.add_argument('--ticker', default='SPY', help="Underlying for the option-chain endpoint (skipped if it has no data)")
+    parser.add_argument('--repeats', type=int, default=2000, help="Timed requests per endpoint and mode")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        user, backtest = create_fixtures()
+        token = user.encode_auth_token()
+        headers = {'Authorization': f'Bearer {token}'}
+        urls = {'backtest status': f'/api/backtests/{backtest.id}/status'}
+        chain_url = chain_request(args.ticker)
+        if chain_url:
+            urls['option chain'] = chain_url
+        else:
+            print(f"No {args.ticker} option data; timing the status endpoint only.")
+
+        statements = [0]
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_statement(*_):
+            statements[0] += 1
+
+        ttl = app.config.get('AUTH_TOKEN_CACHE_TTL') or 60
+        client = app.test_client()
+        results = {}
+        try:
+            for mode, mode_ttl in (('no token cache', 0), ('token cache', ttl)):
+                app.config['AUTH_TOKEN_CACHE_TTL'] = mode_ttl
+                app.extensions.pop('auth_token_cache', None)
+                print(f"\n=== {mode} (AUTH_TOKEN_CACHE_TTL={mode_ttl})")
+                for label, url in urls.items():
+                    latencies, per_request = time_requests(client, url, headers, args.repeats, statements)
+                    results[(mode, label)] = latencies
+                    print(f"{label:16s} p50 {np.percentile(latencies, 50):7.2f} ms   "
+                          f"p99 {np.percentile(latencies, 99):7.2f} ms   {per_request:.1f} SQL statements/request")
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+            delete_fixtures(user)
+
+    print("\nSpeedup (p99 without / with the token cache):")
+    for label in urls:
+        before, after = np.percentile(results[('no token cache', label)], 99), np.percentile(results[('token cache', label)], 99)
+        print(f"{label:16s} {before / after:6.2f}x")
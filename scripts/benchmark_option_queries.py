@@ -0,0 +1,173 @@
+# scripts/benchmark_option_queries.py
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge.models import OptionData
+from optionforge.backtester.datasource import ENGINE_COLUMNS
+
+TABLE = OptionData.__table__
+
+# Secondary indexes (name -> definition) of each layout per dialect; the
+# _unique_option_contract constraint is always present
+LAYOUTS = {
+    'before': {
+        'ix_option_data_underlying_ticker': '(underlying_ticker)',
+        'ix_option_data_data_date': '(data_date)',
+    },
+    'after': {
+        'ix_option_data_data_date': '(data_date)',
+    },
+}
+POSTGRES_AFTER = {
+    'ix_option_data_engine_covering': (
+        '(underlying_ticker, data_date, expiration_date, strike_price, option_type) '
+        'INCLUDE (bid, ask, last_price, implied_volatility, delta)'
+    ),
+}
+
+STRIKES_PER_EXPIRY = 50
+EXPIRIES_PER_DAY = 8
+
+
+def seed(engine, n_rows, n_tickers, batch_size=100000):
+    """Fills option_data with a synthetic chain of roughly `n_rows` contracts."""
+    rows_per_day = 2 * STRIKES_PER_EXPIRY * EXPIRIES_PER_DAY
+    n_days = max(1, n_rows // (n_tickers * rows_per_day))
+    days = pd.bdate_range('2015-01-02', periods=n_days)
+    tickers = [f'T{i:02d}' for i in range(n_tickers)]
+    rng = np.random.default_rng(7)
+    print(f"Seeding {n_tickers} tickers x {n_days} days x {rows_per_day} contracts = "
+          f"{n_tickers * n_days * rows_per_day:,} rows...")
+
+    strikes = np.tile(np.repeat(np.arange(STRIKES_PER_EXPIRY) * 5.0 + 300, 2), EXPIRIES_PER_DAY)
+    types = np.tile(['call', 'put'], STRIKES_PER_EXPIRY * EXPIRIES_PER_DAY)
+    expiry_offsets = np.repeat(np.arange(1, EXPIRIES_PER_DAY + 1) * 7, 2 * STRIKES_PER_EXPIRY)
+    days_per_batch = max(1, batch_size // rows_per_day)
+
+    with engine.begin() as connection:
+        for ticker in tickers:
+            for i in range(0, n_days, days_per_batch):
+                batch_days = days[i:i + days_per_batch]
+                n = len(batch_days) * rows_per_day
+                data_dates = np.repeat(batch_days.to_numpy(), rows_per_day)
+                df = pd.DataFrame({
+                    'underlying_ticker': ticker,
+                    'data_date': pd.to_datetime(data_dates).date,
+                    'expiration_date': (pd.to_datetime(data_dates) + pd.to_timedelta(np.tile(expiry_offsets, len(batch_days)), 'D')).date,
+                    'strike_price': np.tile(strikes, len(batch_days)),
+                    'option_type': np.tile(types, len(batch_days)),
+                    'last_price': rng.random(n) * 20,
+                    'bid': rng.random(n) * 20,
+                    'ask': rng.random(n) * 20,
+                    'implied_volatility': rng.random(n) * 0.5,
+                    'delta': rng.random(n) * 2 - 1,
+                })
+                connection.execute(TABLE.insert(), df.to_dict('records'))
+    return tickers, days
+
+
+def layout_indexes(engine, name):
+    if name == 'after' and engine.dialect.name == 'postgresql':
+        return {**LAYOUTS['after'], **POSTGRES_AFTER}
+    return LAYOUTS[name]
+
+
+def apply_layout(engine, name):
+    """Drops every secondary index, then creates the ones of the given layout."""
+    existing = {index['name'] for index in sa.inspect(engine).get_indexes(TABLE.name)}
+    with engine.begin() as connection:
+        for index_name in existing & {*LAYOUTS['before'], *LAYOUTS['after'], *POSTGRES_AFTER}:
+            connection.execute(sa.text(f'DROP INDEX {index_name}'))
+        for index_name, definition in layout_indexes(engine, name).items():
+            connection.execute(sa.text(f"CREATE INDEX {index_name} ON {TABLE.name} {definition}"))
+        connection.execute(sa.text('ANALYZE' if engine.dialect.name == 'sqlite' else f'ANALYZE {TABLE.name}'))
+
+
+def engine_range_query(ticker, day):
+    """The backtest engine's load: one year of ENGINE_COLUMNS within an expiry window."""
+    end = day + datetime.timedelta(days=365)
+    return sa.select(*(TABLE.c[c] for c in ENGINE_COLUMNS)).where(
+        TABLE.c.underlying_ticker == ticker,
+        TABLE.c.data_date >= day, TABLE.c.data_date <= end,
+        TABLE.c.expiration_date >= day, TABLE.c.expiration_date <= end + datetime.timedelta(days=90),
+    )
+
+
+def option_chain_query(ticker, day):
+    """The /data/option-chain lookup: one day's chain in expiry/strike order."""
+    return sa.select(TABLE).where(
+        TABLE.c.underlying_ticker == ticker, TABLE.c.data_date == day
+    ).order_by(TABLE.c.expiration_date, TABLE.c.strike_price)
+
+
+def explain(connection, query):
+    compiled = query.compile(connection, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN QUERY PLAN' if connection.dialect.name == 'sqlite' else 'EXPLAIN'
+    return [' '.join(str(v) for v in row[-1:]) for row in connection.execute(sa.text(f'{prefix} {compiled}'))]
+
+
+def time_queries(engine, build_query, tickers, days, repeats, rng):
+    """Runs a query `repeats` times for random tickers/dates; returns latencies in ms and the plan."""
+    latencies = []
+    with engine.connect() as connection:
+        plan = explain(connection, build_query(tickers[0], days[0].date()))
+        for _ in range(repeats):
+            ticker = tickers[rng.integers(len(tickers))]
+            day = days[rng.integers(max(1, len(days) - 260))].date()
+            started = time.perf_counter()
+            connection.execute(build_query(ticker, day)).fetchall()
+            latencies.append((time.perf_counter() - started) * 1000)
+    return np.array(latencies), plan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark option_data query latencies before and after the composite indexes.")
+    parser.add_argument('--database-url', default='sqlite:///benchmark_option_data.db',
+                        help="Scratch database; its option_data table is dropped and reseeded")
+    parser.add_argument('--rows', type=int, default=2000000, help="Approximate number of synthetic contracts")
+    parser.add_argument('--tickers', type=int, default=4, help="Number of synthetic underlyings")
+    parser.add_argument('--repeats', type=int, default=20, help="Timed executions per query and layout")
+    parser.add_argument('--reuse', action='store_true', help="Skip seeding and use the rows already there")
+    args = parser.parse_args()
+
+    engine = sa.create_engine(args.database_url)
+    if args.reuse:
+        with engine.connect() as connection:
+            tickers = [r[0] for r in connection.execute(sa.select(TABLE.c.underlying_ticker).distinct())]
+            days = pd.DatetimeIndex([r[0] for r in connection.execute(
+                sa.select(TABLE.c.data_date).distinct().order_by(TABLE.c.data_date))])
+    else:
+        TABLE.drop(engine, checkfirst=True)
+        TABLE.create(engine)
+        apply_layout(engine, 'before')
+        started = time.perf_counter()
+        tickers, days = seed(engine, args.rows, args.tickers)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s.")
+
+    queries = {'engine range (1y)': engine_range_query, 'option chain (1 day)': option_chain_query}
+    results = {}
+    for layout in ('before', 'after'):
+        started = time.perf_counter()
+        apply_layout(engine, layout)
+        print(f"\n=== {layout}: {', '.join(layout_indexes(engine, layout))} (built in {time.perf_counter() - started:.1f}s)")
+        for label, build_query in queries.items():
+            latencies, plan = time_queries(engine, build_query, tickers, days, args.repeats, np.random.default_rng(0))
+            results[(layout, label)] = latencies
+            print(f"{label:22s} p50 {np.percentile(latencies, 50):8.1f} ms   p95 {np.percentile(latencies, 95):8.1f} ms")
+            for line in plan:
+                print(f"    plan: {line}")
+
+    print("\nSpeedup (p50 before / after):")
+    for label in queries:
+        before, after = np.median(results[('before', label)]), np.median(results[('after', label)])
+        print(f"{label:22s} {before / after:6.2f}x")
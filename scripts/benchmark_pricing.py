@@ -0,0 +1,71 @@
+# scripts/benchmark_pricing.py
+
+import os
+import sys
+import time
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge.backtester.pricing import (
+    black_scholes, black_scholes_greeks,
+    black_scholes_vectorized, black_scholes_greeks_vectorized
+)
+
+# --- Configuration ---
+# Roughly the size of one day's SPY chain
+CHAIN_SIZE = 10000
+# Contracts priced through the scalar path (it is too slow to run the full chain repeatedly)
+SCALAR_SAMPLE = 2000
+REPEATS = 20
+
+
+def make_chain(n, seed=42):
+    """Builds a synthetic option chain around a 400 spot."""
+    rng = np.random.default_rng(seed)
+    S = np.full(n, 400.0)
+    K = np.round(rng.uniform(300, 500, n))
+    T = rng.integers(0, 365, n) / 365.0
+    sigma = rng.uniform(0.1, 0.6, n)
+    is_call = rng.random(n) < 0.5
+    return S, K, T, sigma, is_call
+
+
+def bench_scalar(S, K, T, sigma, is_call, r=0.02):
+    start = time.perf_counter()
+    for i in range(len(S)):
+        option_type = 'call' if is_call[i] else 'put'
+        black_scholes(S[i], K[i], T[i], r, sigma[i], option_type)
+        black_scholes_greeks(S[i], K[i], T[i], r, sigma[i])
+    return time.perf_counter() - start
+
+
+def bench_vectorized(S, K, T, sigma, is_call, r=0.02):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        black_scholes_greeks_vectorized(S, K, T, r, sigma, is_call)
+    return (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == "__main__":
+    S, K, T, sigma, is_call = make_chain(CHAIN_SIZE)
+
+    # Sanity check: both paths agree on price
+    sample = slice(0, SCALAR_SAMPLE)
+    scalar_prices = np.array([
+        black_scholes(S[i], K[i], T[i], 0.02, sigma[i], 'call' if is_call[i] else 'put')
+        for i in range(SCALAR_SAMPLE)
+    ])
+    vector_prices = black_scholes_vectorized(S[sample], K[sample], T[sample], 0.02, sigma[sample], is_call[sample])
+    print(f"Max abs price difference: {np.max(np.abs(scalar_prices - vector_prices)):.2e}")
+
+    scalar_time = bench_scalar(S[sample], K[sample], T[sample], sigma[sample], is_call[sample])
+    scalar_rate = SCALAR_SAMPLE / scalar_time
+    vector_time = bench_vectorized(S, K, T, sigma, is_call)
+    vector_rate = CHAIN_SIZE / vector_time
+
+    print(f"Scalar price + Greeks:     {scalar_rate:>14,.0f} contracts/s")
+    print(f"Vectorized price + Greeks: {vector_rate:>14,.0f} contracts/s")
+    print(f"Full {CHAIN_SIZE:,}-contract chain: {vector_time * 1000:.2f} ms vectorized, "
+          f"~{CHAIN_SIZE / scalar_rate * 1000:.0f} ms scalar ({vector_rate / scalar_rate:.0f}x speedup)")
@@ -0,0 +1,48 @@
+# scripts/build_iv_history.py
+
+import argparse
+import datetime
+import os
+import sys
+from contextlib import contextmanager
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge import create_app, db
+from optionforge.models import OptionData
+from optionforge.ingest import build_iv_history
+
+
+@contextmanager
+def app_context():
+    """Provides a Flask application context for the script."""
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Derive the daily ATM/30-day IV, IV rank and IV percentile of stored chains into iv_history.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to process (defaults to YFINANCE_TICKERS)")
+    parser.add_argument('--start', type=parse_date, help="First date (default: first stored day)")
+    parser.add_argument('--end', type=parse_date, help="Last date (default: last stored day)")
+    args = parser.parse_args()
+
+    with app_context() as app:
+        tickers = args.tickers or app.config['YFINANCE_TICKERS']
+        for ticker in tickers:
+            first, last = db.session.query(db.func.min(OptionData.data_date), db.func.max(OptionData.data_date)).filter(
+                OptionData.underlying_ticker == ticker
+            ).one()
+            if first is None:
+                print(f"{ticker}: no option data, skipped.")
+                continue
+            start, end = args.start or first, args.end or last
+            written = build_iv_history(ticker, start, end)
+            print(f"{ticker}: wrote {written} days of IV history ({start} to {end}).")
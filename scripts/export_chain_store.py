@@ -0,0 +1,62 @@
+# scripts/export_chain_store.py
+
+import argparse
+import datetime
+import os
+import sys
+import pandas as pd
+from contextlib import contextmanager
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge import create_app, db
+from optionforge.models import OptionData
+from optionforge.backtester.datasource import SQLChainSource, ParquetChainSource, CHAIN_SCHEMA
+
+
+@contextmanager
+def app_context():
+    """Provides a Flask application context for the script."""
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+def export_ticker(ticker, source, store):
+    """Copies all stored option data for a ticker into the Parquet store, one month at a time."""
+    first, last = db.session.query(
+        db.func.min(OptionData.data_date), db.func.max(OptionData.data_date)
+    ).filter(OptionData.underlying_ticker == ticker).one()
+    if first is None:
+        print(f"No option data stored for {ticker}. Skipping.")
+        return 0
+
+    columns = [f.name for f in CHAIN_SCHEMA]
+    exported = 0
+    for month in pd.period_range(first, last, freq='M'):
+        start = month.start_time.date()
+        end = month.end_time.date()
+        chain = source.load(ticker, start, end, columns=columns)
+        if chain.empty:
+            continue
+        store.write(ticker, chain)
+        exported += len(chain)
+        print(f"{ticker} {month}: exported {len(chain)} contracts.")
+    return exported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the option_data table into the Parquet chain store.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to export (defaults to YFINANCE_TICKERS)")
+    parser.add_argument('--path', help="Store location (defaults to CHAIN_STORE_PATH)")
+    args = parser.parse_args()
+
+    with app_context() as app:
+        store = ParquetChainSource(args.path or app.config['CHAIN_STORE_PATH'])
+        source = SQLChainSource()
+        tickers = args.tickers or app.config['YFINANCE_TICKERS']
+
+        started = datetime.datetime.now()
+        total = sum(export_ticker(ticker, source, store) for ticker in tickers)
+        print(f"\nExported {total} contracts to {store.root} in {datetime.datetime.now() - started}.")
@@ -0,0 +1,58 @@
+# scripts/ingest_options.py
+
+import argparse
+import datetime
+import os
+import sys
+from contextlib import contextmanager
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge import create_app
+from optionforge.ingest import IngestCheckpoint, find_chain_files, file_unit, run_ingestion
+from optionforge.providers import yfinance_unit
+
+
+@contextmanager
+def app_context():
+    """Provides a Flask application context for the script."""
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load option chain snapshots into the option_data table.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to ingest (defaults to YFINANCE_TICKERS)")
+    parser.add_argument('--path', help="Directory of CSV/Parquet chain dumps, e.g. SPY/2023-01-03.parquet")
+    parser.add_argument('--provider', action='store_true', help="Also ingest today's chain from yfinance")
+    parser.add_argument('--workers', type=int, default=4, help="Tickers loaded in parallel")
+    parser.add_argument('--checkpoint', default='ingest_checkpoint.json',
+                        help="File recording loaded snapshots; rerun with the same file to resume")
+    parser.add_argument('--batch-size', type=int, default=50000, help="Rows per executemany batch")
+    parser.add_argument('--skip-greeks', action='store_true', help="Do not solve IV and Greeks after loading")
+    args = parser.parse_args()
+    if not args.path and not args.provider:
+        parser.error("Give --path, --provider or both.")
+
+    with app_context() as app:
+        tickers = args.tickers or app.config['YFINANCE_TICKERS']
+        units_by_ticker = {}
+        for ticker in tickers:
+            units = [file_unit(path) for path in find_chain_files(args.path, ticker)] if args.path else []
+            if args.provider:
+                units.append(yfinance_unit(ticker))
+            units_by_ticker[ticker] = units
+            print(f"{ticker}: {len(units)} snapshot sources.")
+
+        started = datetime.datetime.now()
+        results = run_ingestion(app, units_by_ticker, workers=args.workers,
+                                checkpoint=IngestCheckpoint(args.checkpoint),
+                                backfill=not args.skip_greeks, batch_size=args.batch_size)
+        for ticker, outcome in sorted(results.items()):
+            if isinstance(outcome, Exception):
+                print(f"{ticker}: failed ({outcome}). Rerun to resume from the checkpoint.")
+            else:
+                print(f"{ticker}: wrote {outcome} contracts.")
+        print(f"\nIngestion finished in {datetime.datetime.now() - started}.")
@@ -0,0 +1,56 @@
+# scripts/ingest_prices.py
+
+import argparse
+import datetime
+import glob
+import os
+import sys
+from contextlib import contextmanager
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge import create_app
+from optionforge.ingest import ingest_underlying_prices, read_bars_file
+from optionforge.providers import fetch_yfinance_bars
+
+
+@contextmanager
+def app_context():
+    """Provides a Flask application context for the script."""
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load daily OHLCV bars of the underlyings into the underlying_prices table.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to ingest (defaults to YFINANCE_TICKERS)")
+    parser.add_argument('--path', help="Directory of CSV/Parquet bar files named after their ticker, e.g. SPY.csv")
+    parser.add_argument('--provider', action='store_true', help="Fetch the bars from yfinance")
+    parser.add_argument('--start', type=parse_date, help="First date to fetch from the provider (default: full history)")
+    parser.add_argument('--end', type=parse_date, help="Last date to fetch from the provider (default: today)")
+    parser.add_argument('--backfill-greeks', action='store_true',
+                        help="Re-solve IV and Greeks of the loaded dates against the new closes")
+    args = parser.parse_args()
+    if bool(args.path) == args.provider:
+        parser.error("Give exactly one of --path and --provider.")
+
+    with app_context() as app:
+        tickers = args.tickers or app.config['YFINANCE_TICKERS']
+        for ticker in tickers:
+            if args.provider:
+                bars = fetch_yfinance_bars(ticker, args.start, args.end)
+            else:
+                paths = sorted(glob.glob(os.path.join(args.path, f'{ticker}.*')))
+                if not paths:
+                    print(f"{ticker}: no bar file under {args.path}, skipped.")
+                    continue
+                bars = read_bars_file(paths[0], ticker=ticker)
+            written = ingest_underlying_prices(ticker, bars, backfill=args.backfill_greeks)
+            span = f" ({bars['data_date'].min()} to {bars['data_date'].max()})" if written else ""
+            print(f"{ticker}: wrote {written} daily bars{span}.")
@@ -0,0 +1,106 @@
+# scripts/load_test_auth.py
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import numpy as np
+
+
+def call(base_url, method, path, body=None, token=None):
+    """Sends one JSON request; returns (status code, decoded body or None, latency in ms)."""
+    request = urllib.request.Request(base_url + path, method=method,
+                                     data=json.dumps(body).encode() if body is not None else None)
+    request.add_header('Content-Type', 'application/json')
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            status, payload = response.status, response.read()
+    except urllib.error.HTTPError as e:
+        status, payload = e.code, e.read()
+    latency = (time.perf_counter() - started) * 1000
+    try:
+        return status, json.loads(payload), latency
+    except ValueError:
+        return status, None, latency
+
+
+def login_worker(base_url, credentials, deadline, retry_delay, results, lock):
+    while time.monotonic() < deadline:
+        try:
+            status, _, latency = call(base_url, 'POST', '/api/auth/login', credentials)
+        except OSError:
+            status, latency = 'error', 0.0
+        with lock:
+            results.append((status, latency))
+        if status == 503:
+            # Back off as the Retry-After header asks, rather than hammering the server
+            time.sleep(retry_delay)
+
+
+def probe_worker(base_url, token, deadline, interval, latencies):
+    """Polls a cheap authenticated endpoint, as a client watching a backtest would."""
+    while time.monotonic() < deadline:
+        status, _, latency = call(base_url, 'GET', '/api/strategies', token=token)
+        if status == 200:
+            latencies.append(latency)
+        time.sleep(interval)
+
+
+def summarize(label, latencies):
+    if not latencies:
+        print(f"{label:26s} no successful requests")
+        return
+    print(f"{label:26s} p50 {np.percentile(latencies, 50):8.1f} ms   p99 {np.percentile(latencies, 99):8.1f} ms   "
+          f"({len(latencies)} requests)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load-test /api/auth/login against a running server while probing another endpoint's latency.")
+    parser.add_argument('--base-url', default='http://localhost:5000', help="Server under test")
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent login clients")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of login load")
+    parser.add_argument('--probe-interval', type=float, default=0.05, help="Seconds between probe requests")
+    parser.add_argument('--retry-delay', type=float, default=0.5, help="Seconds a login client waits after a 503")
+    args = parser.parse_args()
+
+    # A dedicated user, so the test never needs real credentials
+    credentials = {'email': f'loadtest-{uuid.uuid4().hex[:12]}@example.com', 'password': uuid.uuid4().hex}
+    status, body, _ = call(args.base_url, 'POST', '/api/auth/register', credentials)
+    if status != 201:
+        raise SystemExit(f"Registering the load-test user failed ({status}): {body}")
+    token = body['auth_token']
+
+    print("Measuring the probe endpoint at rest...")
+    idle = []
+    probe_worker(args.base_url, token, time.monotonic() + 3, args.probe_interval, idle)
+
+    print(f"Running {args.concurrency} login clients for {args.duration:.0f}s...")
+    results, loaded, lock = [], [], threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=login_worker, args=(args.base_url, credentials, deadline, args.retry_delay, results, lock))
+               for _ in range(args.concurrency)]
+    threads.append(threading.Thread(target=probe_worker, args=(args.base_url, token, deadline, args.probe_interval, loaded)))
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    by_status = {}
+    for status, _ in results:
+        by_status[status] = by_status.get(status, 0) + 1
+    succeeded = [latency for status, latency in results if status == 200]
+    print(f"\nLogins: {len(results)} in {elapsed:.1f}s, {len(succeeded) / elapsed:.1f} successful/s; "
+          f"by status: {dict(sorted(by_status.items(), key=str))}")
+    summarize('login (200)', succeeded)
+    summarize('login (503 fast-fail)', [latency for status, latency in results if status == 503])
+    summarize('probe at rest', idle)
+    summarize('probe under login load', loaded)
@@ -0,0 +1,109 @@
+# scripts/partition_option_data.py
+
+import argparse
+import datetime
+import os
+import sys
+from contextlib import contextmanager
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from optionforge import create_app, db
+
+# Index definitions recreated on the partitioned table (propagated to every partition)
+INDEXES = {
+    'ix_option_data_data_date': '(data_date)',
+    'ix_option_data_engine_covering': (
+        '(underlying_ticker, data_date, expiration_date, strike_price, option_type) '
+        'INCLUDE (bid, ask, last_price, implied_volatility, delta)'
+    ),
+}
+
+
+@contextmanager
+def app_context():
+    """Provides a Flask application context for the script."""
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+def partition_statements(first_year, last_year, keep_old=True):
+    """
+    SQL that rebuilds option_data as a table range-partitioned by year of data_date.
+
+    The current table is renamed to option_data_unpartitioned (or dropped), and
+    its rows are copied into one partition per year plus a DEFAULT partition
+    for dates outside the created years. Queries with a data_date range then
+    only touch the partitions of the years they cover.
+
+    PostgreSQL requires the partition key in every unique constraint, so the
+    primary key becomes (id, data_date); ids still come from the same sequence.
+    """
+    statements = [
+        # Free the constraint and index names for the new table
+        "ALTER TABLE option_data RENAME CONSTRAINT _unique_option_contract TO _unique_option_contract_unpartitioned",
+        *(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_unpartitioned" for name in INDEXES),
+        "ALTER TABLE option_data RENAME TO option_data_unpartitioned",
+
+        "CREATE TABLE option_data (LIKE option_data_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (data_date)",
+        "ALTER TABLE option_data ADD PRIMARY KEY (id, data_date)",
+        "ALTER TABLE option_data ADD CONSTRAINT _unique_option_contract "
+        "UNIQUE (underlying_ticker, data_date, expiration_date, strike_price, option_type)",
+        *(f"CREATE INDEX {name} ON option_data {definition}" for name, definition in INDEXES.items()),
+    ]
+    for year in range(first_year, last_year + 1):
+        statements.append(
+            f"CREATE TABLE option_data_y{year} PARTITION OF option_data "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    statements += [
+        "CREATE TABLE option_data_default PARTITION OF option_data DEFAULT",
+        "INSERT INTO option_data SELECT * FROM option_data_unpartitioned",
+        "ALTER SEQUENCE option_data_id_seq OWNED BY option_data.id",
+    ]
+    if not keep_old:
+        statements.append("DROP TABLE option_data_unpartitioned")
+    statements.append("ANALYZE option_data")
+    return statements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert option_data into a yearly range-partitioned table (PostgreSQL only)."
+    )
+    parser.add_argument('--years-ahead', type=int, default=2, help="Empty partitions to create past the last stored year")
+    parser.add_argument('--drop-old', action='store_true', help="Drop the unpartitioned table after copying")
+    parser.add_argument('--dry-run', action='store_true', help="Print the SQL without running it")
+    args = parser.parse_args()
+
+    with app_context():
+        if db.engine.dialect.name != 'postgresql':
+            sys.exit("Partitioning is only supported on PostgreSQL.")
+
+        with db.engine.connect() as connection:
+            partitioned = connection.execute(db.text(
+                "SELECT count(*) FROM pg_partitioned_table WHERE partrelid = 'option_data'::regclass"
+            )).scalar()
+            if partitioned:
+                sys.exit("option_data is already partitioned.")
+            first, last = connection.execute(db.text(
+                "SELECT min(data_date), max(data_date) FROM option_data"
+            )).one()
+
+        this_year = datetime.date.today().year
+        first_year = first.year if first else this_year
+        last_year = max(last.year if last else this_year, this_year) + args.years_ahead
+        statements = partition_statements(first_year, last_year, keep_old=not args.drop_old)
+
+        if args.dry_run:
+            print(';\n'.join(statements) + ';')
+            sys.exit(0)
+
+        # One transaction: the table is either fully converted or untouched
+        with db.engine.begin() as connection:
+            for statement in statements:
+                print(statement)
+                connection.execute(db.text(statement))
+        print(f"\noption_data partitioned by year, {first_year}-{last_year} plus a default partition.")
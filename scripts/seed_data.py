@@ -1,9 +1,5 @@
 # scripts/seed_data.py
 
-import datetime
-import time
-import yfinance as yf
-import pandas as pd
 from contextlib import contextmanager
 
 # This is a standalone script. To run it, we need to set up the app context.
@@ -16,10 +12,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'b
 
 from optionforge import create_app, db
 from optionforge.models import User, Strategy, OptionData
+from optionforge.ingest import IngestCheckpoint, find_chain_files, file_unit, run_ingestion, ingest_underlying_prices
+from optionforge.providers import yfinance_unit, fetch_yfinance_bars
 
 # --- Configuration ---
-# How many years of data to fetch. Be careful, this can be very large.
-YEARS_OF_DATA = 2 
+# Directory of historical CSV/Parquet chain dumps to load, if present.
+CHAIN_DUMP_PATH = os.environ.get('CHAIN_DUMP_PATH', 'data/chains')
+# Records loaded snapshots so an interrupted seed resumes where it stopped.
+CHECKPOINT_PATH = os.environ.get('SEED_CHECKPOINT_PATH', 'seed_checkpoint.json')
 # Tickers to fetch data for. Should match the .env file.
 TICKERS = os.environ.get('YFINANCE_TICKERS', "SPY QQQ").split()
 # Default user credentials
@@ -32,7 +32,7 @@ def app_context():
     """Provides a Flask application context for the script."""
     app = create_app()
     with app.app_context():
-        yield
+        yield app
 
 def clear_data():
     """Clears existing data from the tables."""
@@ -121,97 +121,52 @@ def create_sample_strategies(user):
     print(f"{len(strategies)} sample strategies created/verified.")
 
 
-def fetch_and_store_options_data():
-    """Fetches historical options data from yfinance and stores it in the DB."""
+def fetch_and_store_underlying_prices():
+    """
+    Loads the daily bars of TICKERS from yfinance.
+
+    Price-signal entry rules (e.g. the sample bull call spread's moving average
+    cross) are computed over these closes, warmed up by the history before a
+    backtest's first day.
+    """
+    print(f"Fetching daily bars for tickers: {TICKERS}")
+    for ticker_symbol in TICKERS:
+        try:
+            written = ingest_underlying_prices(ticker_symbol, fetch_yfinance_bars(ticker_symbol))
+            print(f"Stored {written} daily bars for {ticker_symbol}.")
+        except Exception as e:
+            print(f"Could not load daily bars for {ticker_symbol}. Error: {e}")
+
+
+def fetch_and_store_options_data(app):
+    """
+    Loads option chains for TICKERS through the bulk ingestion pipeline.
+
+    Historical dumps under CHAIN_DUMP_PATH are loaded first, if that directory
+    exists, followed by today's yfinance snapshot. Tickers load in parallel, and
+    snapshots already recorded in the checkpoint file are skipped on rerun.
+    """
     print(f"Starting data fetch for tickers: {TICKERS}")
-    end_date = datetime.date.today()
-    start_date = end_date - datetime.timedelta(days=365 * YEARS_OF_DATA)
-    
+    units_by_ticker = {}
     for ticker_symbol in TICKERS:
-        print(f"\n--- Processing {ticker_symbol} ---")
-        ticker = yf.Ticker(ticker_symbol)
-        
-        # Get historical data to iterate through trading days
-        hist = ticker.history(start=start_date, end=end_date)
-        if hist.empty:
-            print(f"Could not get history for {ticker_symbol}. Skipping.")
-            continue
-            
-        print(f"Found {len(hist)} trading days between {start_date} and {end_date}.")
-
-        for trading_date in hist.index.date:
-            date_str = trading_date.strftime('%Y-%m-%d')
-            print(f"Fetching options for {date_str}...")
-            
-            # Check if we already have data for this day
-            if OptionData.query.filter_by(underlying_ticker=ticker_symbol, data_date=trading_date).first():
-                print(f"Data for {date_str} already exists. Skipping.")
-                continue
-
-            try:
-                # yfinance fetches options per expiration date
-                expirations = ticker.options
-                if not expirations:
-                    print(f"No expirations found for {date_str}. Skipping.")
-                    continue
-                
-                all_options = []
-                for exp in expirations:
-                    opt_chain = ticker.option_chain(exp)
-                    
-                    # Combine calls and puts
-                    df = pd.concat([opt_chain.calls, opt_chain.puts])
-                    df['optionType'] = df['contractSymbol'].str.extract(r'\d([CP])')
-                    df['optionType'] = df['optionType'].map({'C': 'call', 'P': 'put'})
-                    
-                    # Add necessary columns
-                    df['underlyingTicker'] = ticker_symbol
-                    df['dataDate'] = trading_date
-                    df['expirationDate'] = pd.to_datetime(exp).date()
-                    
-                    all_options.append(df)
-                
-                if not all_options:
-                    continue
-
-                full_chain = pd.concat(all_options)
-                
-                # Clean and format data for DB insertion
-                records_to_insert = []
-                for _, row in full_chain.iterrows():
-                    records_to_insert.append(OptionData(
-                        underlying_ticker=row['underlyingTicker'],
-                        data_date=row['dataDate'],
-                        expiration_date=row['expirationDate'],
-                        strike_price=row['strike'],
-                        option_type=row['optionType'],
-                        last_price=row.get('lastPrice'),
-                        bid=row.get('bid'),
-                        ask=row.get('ask'),
-                        volume=row.get('volume'),
-                        open_interest=row.get('openInterest'),
-                        implied_volatility=row.get('impliedVolatility')
-                        # Greeks are not reliably provided by yfinance for historical data
-                    ))
-                
-                # Bulk insert for efficiency
-                db.session.bulk_save_objects(records_to_insert)
-                db.session.commit()
-                print(f"Successfully stored {len(records_to_insert)} option contracts for {date_str}.")
-                
-                # yfinance can be sensitive to rapid requests
-                time.sleep(2)
-
-            except Exception as e:
-                print(f"Could not fetch options for {date_str}. Error: {e}")
-                db.session.rollback()
-                time.sleep(5) # Wait longer after an error
+        units = [file_unit(path) for path in find_chain_files(CHAIN_DUMP_PATH, ticker_symbol)] \
+            if os.path.isdir(CHAIN_DUMP_PATH) else []
+        units.append(yfinance_unit(ticker_symbol))
+        units_by_ticker[ticker_symbol] = units
+        print(f"{ticker_symbol}: {len(units)} snapshot sources.")
+
+    results = run_ingestion(app, units_by_ticker, checkpoint=IngestCheckpoint(CHECKPOINT_PATH))
+    for ticker_symbol, outcome in sorted(results.items()):
+        if isinstance(outcome, Exception):
+            print(f"Could not load options for {ticker_symbol}. Error: {outcome}")
+        else:
+            print(f"Stored {outcome} option contracts for {ticker_symbol}.")
 
     print("\nData fetching complete.")
 
 
 if __name__ == "__main__":
-    with app_context():
+    with app_context() as app:
         # The order of operations is important
         # 1. Clear old data (optional, for clean slate)
         # clear_data() # Uncomment to wipe the DB before seeding
@@ -222,7 +177,10 @@ if __name__ == "__main__":
         # 3. Create sample strategies
         create_sample_strategies(user)
         
-        # 4. Fetch and store historical market data
-        fetch_and_store_options_data()
+        # 4. Fetch and store the underlyings' daily bars
+        fetch_and_store_underlying_prices()
+
+        # 5. Fetch and store historical market data
+        fetch_and_store_options_data(app)
         
         print("\nDatabase seeding finished successfully!")